@@ -5,7 +5,8 @@ from model.episode_names import EPISODE_NAMES
 from model.read_data import *
 
 from view.create_tables import *
-from view.centrality_progression_plotter import MetricsProgressionPlotter
+from view.centrality_progression_plotter import MetricsProgressionPlotter, small_multiples_spec
+from view.render_pool import render_figures
 
 def _get_characters_sorted_by_centrality_scores(centrality_dict: dict):
     return sorted(centrality_dict.items(), key=lambda x: x[1], reverse=True)
@@ -36,10 +37,18 @@ def _save_centralities_to_csv_for_section(centralities: CentralityScores, sectio
     in_degree = _get_top_centrality(centralities.in_degree, take_first=10)
     eigenvector = _get_top_centrality(centralities.eigenvector, take_first=10)
     betweenness = _get_top_centrality(centralities.betweenness, take_first=10)
+    katz = _get_top_centrality(centralities.katz, take_first=10)
+    harmonic = _get_top_centrality(centralities.harmonic, take_first=10)
+    pagerank = _get_top_centrality(centralities.pagerank, take_first=10)
+    subgraph = _get_top_centrality(centralities.subgraph, take_first=10)
 
     save_centrality_to_csv(in_degree, "in-degree", heading)
     save_centrality_to_csv(eigenvector, "eigenvector", heading)
     save_centrality_to_csv(betweenness, "betweenness", heading)
+    save_centrality_to_csv(katz, "katz", heading)
+    save_centrality_to_csv(harmonic, "harmonic", heading)
+    save_centrality_to_csv(pagerank, "pagerank", heading)
+    save_centrality_to_csv(subgraph, "subgraph", heading)
 
 def analyze_full_script_centralities():
     full_script_data = get_x_mentions_y()
@@ -50,10 +59,18 @@ def analyze_full_script_centralities():
     in_degree = _get_top_centrality(centralities.in_degree, take_first=10)
     eigenvector = _get_top_centrality(centralities.eigenvector, take_first=10)
     betweenness = _get_top_centrality(centralities.betweenness, take_first=10)
+    katz = _get_top_centrality(centralities.katz, take_first=10)
+    harmonic = _get_top_centrality(centralities.harmonic, take_first=10)
+    pagerank = _get_top_centrality(centralities.pagerank, take_first=10)
+    subgraph = _get_top_centrality(centralities.subgraph, take_first=10)
 
     save_centrality_to_csv(in_degree, "in-degree", heading)
     save_centrality_to_csv(eigenvector, "eigenvector", heading)
     save_centrality_to_csv(betweenness, "betweenness", heading)
+    save_centrality_to_csv(katz, "katz", heading)
+    save_centrality_to_csv(harmonic, "harmonic", heading)
+    save_centrality_to_csv(pagerank, "pagerank", heading)
+    save_centrality_to_csv(subgraph, "subgraph", heading)
 
 def analyze_each_book_centralities():
     all_books = get_x_mentions_y_per_book()
@@ -69,9 +86,9 @@ def analyze_each_book_centralities():
         in_degree_plotter.add_data_point(centralities.in_degree)
         eigenvector_plotter.add_data_point(centralities.eigenvector)
         betweenness_plotter.add_data_point(centralities.betweenness)
-    in_degree_plotter.draw()
-    eigenvector_plotter.draw()
-    betweenness_plotter.draw()
+    plotters = [in_degree_plotter, eigenvector_plotter, betweenness_plotter]
+    render_figures([plotter.figure_spec() for plotter in plotters] + [small_multiples_spec(plotters)],
+                   cache_name="centralities_per_book")
 
 def analyze_each_episode_centralities():
     all_episodes = get_x_mentions_y_per_episode()
@@ -88,9 +105,10 @@ def analyze_each_episode_centralities():
         eigenvector_plotter.add_data_point(centralities.eigenvector)
         betweenness_plotter.add_data_point(centralities.betweenness)
     characters = ["zuko", "aang"]
-    in_degree_plotter.draw(key_filter=characters, trend_lines=characters)
-    eigenvector_plotter.draw(key_filter=characters, trend_lines=characters)
-    betweenness_plotter.draw(key_filter=characters, trend_lines=characters)
+    plotters = [in_degree_plotter, eigenvector_plotter, betweenness_plotter]
+    render_figures([plotter.figure_spec(key_filter=characters, trend_lines=characters) for plotter in plotters]
+                   + [small_multiples_spec(plotters, key_filter=characters, trend_lines=characters)],
+                   cache_name="centralities_per_episode")
 
 def analyze_clustering_full_script():
     full_script_data = get_x_mentions_y()
@@ -114,7 +132,8 @@ def analyze_clustering_per_book():
         average_clustering = analyzer.get_average_clustering()
         transitivity = analyzer.get_transitivity()
         clustering_plotter.add_data_point_with_kwargs(average_clustering=average_clustering, transitivity=transitivity)
-    clustering_plotter.draw(trend_lines=["average_clustering", "transitivity"])
+    render_figures([clustering_plotter.figure_spec(trend_lines=["average_clustering", "transitivity"])],
+                   n_jobs=1, cache_name="clustering_per_book")
 
 def analyze_clustering_per_episode():
     all_episodes = get_x_mentions_y_per_episode()
@@ -131,7 +150,8 @@ def analyze_clustering_per_episode():
         clustering_plotter.add_data_point_with_kwargs(average_clustering=average_clustering, transitivity=transitivity)
         episode_to_average_clustering[episode_number] = average_clustering
         episode_to_transitivity[episode_number] = transitivity
-    clustering_plotter.draw(trend_lines=["average_clustering", "transitivity"])
+    render_figures([clustering_plotter.figure_spec(trend_lines=["average_clustering", "transitivity"])],
+                   n_jobs=1, cache_name="clustering_per_episode")
     
     max_avg_clustering = max(episode_to_average_clustering.values())
     min_avg_clustering = min(episode_to_average_clustering.values())
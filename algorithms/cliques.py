@@ -0,0 +1,136 @@
+import heapq
+from collections import Counter
+
+import networkx as nx
+
+
+def _degeneracy_order(graph: nx.Graph) -> list:
+    """
+    Smallest-last ordering: every node has at most `degeneracy` neighbours later in the order.
+    """
+    degrees = {n: len(graph[n]) - (n in graph[n]) for n in graph.nodes()}
+    buckets = {}
+    for n, d in degrees.items():
+        buckets.setdefault(d, set()).add(n)
+    order = []
+    removed = set()
+    current = 0
+    while len(order) < len(degrees):
+        current = max(0, current - 1)
+        while not buckets.get(current):
+            current += 1
+        n = buckets[current].pop()
+        order.append(n)
+        removed.add(n)
+        for neighbour in graph[n]:
+            if neighbour in removed or neighbour == n:
+                continue
+            d = degrees[neighbour]
+            buckets[d].discard(neighbour)
+            degrees[neighbour] = d - 1
+            buckets.setdefault(d - 1, set()).add(neighbour)
+    return order
+
+
+def _later_neighbours(graph: nx.Graph, order: list) -> dict:
+    position = {n: i for i, n in enumerate(order)}
+    return {n: {m for m in graph[n] if position[m] > position[n]} for n in order}
+
+
+def _greedy_coloring(candidates: list, adjacency: dict) -> list[tuple]:
+    """
+    Sequential greedy coloring, returns (node, color) pairs sorted by ascending color.
+    The color of a node bounds the size of a clique within the nodes up to and including it.
+    """
+    color_classes = []
+    for n in candidates:
+        for color_class in color_classes:
+            if not adjacency[n] & color_class:
+                color_class.add(n)
+                break
+        else:
+            color_classes.append({n})
+    return [(n, color) for color, color_class in enumerate(color_classes, start=1) for n in color_class]
+
+
+def maximum_cliques(graph: nx.Graph, all_maximum: bool = True) -> tuple[int, list[list]]:
+    """
+    Branch and bound search for the maximum clique(s), does not use weights nor direction.
+
+    Nodes are processed in degeneracy order, so every search starts from at most `degeneracy` candidates,
+    and branches are pruned with a greedy coloring bound (Tomita's MCQ). Only the best cliques are kept.
+
+    Returns
+    -------
+    size of the largest clique, list of the largest cliques (only one of them if all_maximum is False)
+    """
+    adjacency = {n: set(graph[n]) - {n} for n in graph.nodes()}
+    order = _degeneracy_order(graph)
+    later = _later_neighbours(graph, order)
+    best_size = 0
+    best = []
+
+    def expand(clique: list, candidates: set):
+        nonlocal best_size, best
+        if len(clique) > best_size:
+            best_size, best = len(clique), [list(clique)]
+        elif len(clique) == best_size and all_maximum:
+            best.append(list(clique))
+
+        colored = _greedy_coloring(list(candidates), adjacency)
+        candidates = set(candidates)
+        for n, color in reversed(colored):
+            bound = len(clique) + color
+            if bound < best_size or (bound == best_size and not all_maximum):
+                return
+            clique.append(n)
+            expand(clique, candidates & adjacency[n])
+            clique.pop()
+            candidates.discard(n)
+
+    for n in order:
+        bound = 1 + len(later[n])
+        if bound < best_size or (bound == best_size and not all_maximum):
+            continue
+        expand([n], later[n])
+    return best_size, best
+
+
+def clique_size_histogram(graph: nx.Graph, maximal: bool = False) -> dict[int, int]:
+    """
+    Number of cliques of every size, counted while streaming so no clique is kept in memory.
+
+    With maximal=False all cliques are counted (as in enumerate_all_cliques), every clique is visited once
+    from its first node in degeneracy order. With maximal=True only the maximal cliques are counted.
+    """
+    histogram = Counter()
+    if maximal:
+        for found in nx.find_cliques(graph):
+            histogram[len(found)] += 1
+        return dict(sorted(histogram.items()))
+
+    order = _degeneracy_order(graph)
+    later = _later_neighbours(graph, order)
+
+    def count(size: int, candidates: set):
+        histogram[size] += 1
+        for n in candidates:
+            count(size + 1, candidates & later[n])
+
+    for n in order:
+        count(1, later[n])
+    return dict(sorted(histogram.items()))
+
+
+def top_k_largest_cliques(graph: nx.Graph, k: int = 10) -> list[list]:
+    """
+    The k largest maximal cliques, largest first. The maximal cliques are streamed through a heap of size k.
+    """
+    heap = []
+    for i, found in enumerate(nx.find_cliques(graph)):
+        item = (len(found), -i, found)
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+    return [found for _, _, found in sorted(heap, reverse=True)]
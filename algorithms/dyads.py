@@ -0,0 +1,100 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from model.constants import *
+
+DYAD_COLUMNS = ["u", "v", "weight_uv", "weight_vu", "total", "reciprocal", "reciprocity"]
+
+
+def node_order(data: pd.DataFrame) -> pd.Index:
+    """Characters in order of first appearance, x before y on every row, as nx.DiGraph adds them."""
+    return pd.Index(pd.unique(np.column_stack([data[COL_X].to_numpy(), data[COL_Y].to_numpy()]).ravel()))
+
+
+def build_dyad_table(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per unordered pair of characters with a mention in at least one direction.
+
+    The table is built by joining the mention edges with themselves reversed, so w(v -> u) is looked up
+    for every edge u -> v at once. Every pair is kept once, in the direction that a DiGraph of the section
+    lists first (by node, then by edge), so graphs built from the table keep the order of the section graph.
+    Self-mentions are kept as the pair (u, u), with weight_vu 0.
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        DataFrame with columns ["x", "y"] or ["x", "y", "weight"], repeated pairs are summed
+
+    Returns:
+    --------
+    dyads : pd.DataFrame
+        Columns u, v, weight_uv = w(u -> v), weight_vu = w(v -> u) (0 if v never mentions u),
+        total = weight_uv + weight_vu, reciprocal (mentions in both directions)
+        and reciprocity = min / max of the two weights (1 for balanced pairs, 0 for one-way pairs)
+    """
+    weights = data[WEIGHT] if WEIGHT in data.columns else pd.Series(1, index=data.index)
+    edges = weights.groupby([data[COL_X], data[COL_Y]], sort=False).sum().rename("weight_uv").reset_index()
+    edges.columns = ["u", "v", "weight_uv"]
+
+    # position of every directed edge in the edge order of the section DiGraph
+    node_codes = node_order(data).get_indexer(edges["u"])
+    edges["position"] = np.argsort(np.lexsort((np.arange(len(edges)), node_codes)))
+
+    reverse = edges.rename(columns={"u": "v", "v": "u", "weight_uv": "weight_vu", "position": "reverse_position"})
+    dyads = edges.merge(reverse, on=["u", "v"], how="left", sort=False)
+    one_way = dyads["reverse_position"].isna() | (dyads["u"] == dyads["v"])
+    first = one_way | (dyads["position"] < dyads["reverse_position"])
+    dyads["weight_vu"] = dyads["weight_vu"].where(~one_way, 0).astype(dyads["weight_uv"].dtype)
+    dyads = dyads[first].copy()
+
+    dyads["total"] = dyads["weight_uv"] + dyads["weight_vu"]
+    dyads["reciprocal"] = dyads["weight_vu"] > 0
+    dyads["reciprocity"] = np.minimum(dyads["weight_uv"], dyads["weight_vu"]) \
+        / np.maximum(dyads["weight_uv"], dyads["weight_vu"])
+    return dyads.sort_values("position")[DYAD_COLUMNS].reset_index(drop=True)
+
+
+def dyads_of(dyads: pd.DataFrame, character: str) -> pd.DataFrame:
+    """
+    The pairs of one character, oriented from its point of view.
+
+    Returns
+    -------
+    partners : pd.DataFrame
+        Columns partner, weight_out (character -> partner), weight_in (partner -> character),
+        total, reciprocal and reciprocity
+    """
+    forward = dyads[dyads["u"] == character]
+    backward = dyads[(dyads["v"] == character) & (dyads["u"] != character)]
+    columns = ["partner", "weight_out", "weight_in", "total", "reciprocal", "reciprocity"]
+    forward = forward[["v", "weight_uv", "weight_vu", "total", "reciprocal", "reciprocity"]].set_axis(columns, axis=1)
+    backward = backward[["u", "weight_vu", "weight_uv", "total", "reciprocal", "reciprocity"]].set_axis(columns, axis=1)
+    return pd.concat([forward, backward], ignore_index=True)
+
+
+def dyads_to_graph(dyads: pd.DataFrame, nodes: list = None, reciprocal_only: bool = False,
+                   weight: str | None = "weight") -> nx.Graph:
+    """
+    Undirected graph of the pairs, weighted by the total mentions in both directions.
+
+    Parameters:
+    -----------
+    dyads : pd.DataFrame
+        See build_dyad_table
+    nodes : list
+        Nodes to add first (e.g. to keep characters without a reciprocal pair), defaults to the pairs' nodes
+    reciprocal_only : bool
+        Only keep pairs that mention each other (and self-mentions), like DiGraph.to_undirected(reciprocal=True)
+    weight : str | None
+        Edge attribute for the total weight, None for an unweighted graph
+    """
+    if reciprocal_only:
+        dyads = dyads[dyads["reciprocal"] | (dyads["u"] == dyads["v"])]
+    graph = nx.Graph()
+    graph.add_nodes_from(nodes if nodes is not None else pd.unique(dyads[["u", "v"]].to_numpy().ravel()))
+    if weight is None:
+        graph.add_edges_from(zip(dyads["u"], dyads["v"]))
+    else:
+        graph.add_weighted_edges_from(zip(dyads["u"], dyads["v"], dyads["total"].tolist()), weight=weight)
+    return graph
@@ -0,0 +1,175 @@
+from functools import cached_property
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from algorithms.dyads import build_dyad_table
+from model.constants import *
+
+
+def _compressed(rows: np.ndarray, columns: np.ndarray, n_nodes: int):
+    """Row pointers and column codes of a compressed sparse row structure, columns sorted within each row."""
+    order = np.lexsort((columns, rows))
+    pointers = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_nodes), out=pointers[1:])
+    return pointers, order
+
+
+def _gather(pointers: np.ndarray, codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Positions of all entries of the rows `codes`, and the row every position belongs to."""
+    starts = pointers[codes]
+    lengths = pointers[codes + 1] - starts
+    offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    return offsets + np.arange(lengths.sum()), np.repeat(codes, lengths)
+
+
+class EgoIndex:
+    """
+    Adjacency index of one section for fast ego network extraction.
+
+    The mention edges are stored once as sorted out-, in- and undirected neighbour arrays (compressed
+    sparse rows over integer node codes). An ego network is then found by a breadth-first search over
+    the neighbour arrays of the ego and its neighbours only, so extraction costs time proportional to
+    the ego's neighbourhood instead of rebuilding the section graph.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+        codes, self.names = pd.factorize(pd.concat([data[COL_X], data[COL_Y]], ignore_index=True))
+        self.names = np.asarray(self.names, dtype=object)
+        self.codes = {name: code for code, name in enumerate(self.names)}
+        n_nodes = len(self.names)
+        sources, targets = codes[:len(data)], codes[len(data):]
+        weights = data[WEIGHT].to_numpy() if WEIGHT in data.columns else np.ones(len(data), dtype=int)
+
+        self.out_pointers, order = _compressed(sources, targets, n_nodes)
+        self.out_neighbours, self.out_weights = targets[order], weights[order]
+        self.in_pointers, order = _compressed(targets, sources, n_nodes)
+        self.in_neighbours, self.in_weights = sources[order], weights[order]
+
+        both = np.unique(np.concatenate([np.stack([sources, targets], axis=1),
+                                         np.stack([targets, sources], axis=1)]), axis=0)
+        self.pointers, order = _compressed(both[:, 0], both[:, 1], n_nodes)
+        self.neighbours = both[order, 1]
+
+        # scratch arrays of the current query, reset after every query so it stays O(neighbourhood)
+        self._distance = np.full(n_nodes, -1, dtype=np.int64)
+        self._inside = np.zeros(n_nodes, dtype=bool)
+
+    def __contains__(self, character) -> bool:
+        return character in self.codes
+
+    @cached_property
+    def dyads(self) -> pd.DataFrame:
+        """Dyad table of the whole section (see build_dyad_table), built on first use and shared by all egos."""
+        return build_dyad_table(self.data)
+
+    def neighbours_of(self, character, direction: str = "out") -> pd.Series:
+        """
+        Out- or in-neighbours of a character with the edge weights, sorted by weight (descending).
+        """
+        pointers, neighbours, weights = {
+            "out": (self.out_pointers, self.out_neighbours, self.out_weights),
+            "in": (self.in_pointers, self.in_neighbours, self.in_weights),
+        }[direction]
+        code = self.codes[character]
+        span = slice(pointers[code], pointers[code + 1])
+        result = pd.Series(weights[span], index=self.names[neighbours[span]], name=WEIGHT)
+        return result.sort_values(ascending=False, kind="stable")
+
+    def _search(self, ego_code: int, max_radius: int) -> list[np.ndarray]:
+        """Breadth-first search up to max_radius, the nodes found at every hop distance (hop 0 is the ego)."""
+        self._distance[ego_code] = 0
+        levels = [np.array([ego_code])]
+        for hop in range(1, max_radius + 1):
+            positions, _ = _gather(self.pointers, levels[-1])
+            candidates = np.unique(self.neighbours[positions])
+            found = candidates[self._distance[candidates] < 0]
+            if len(found) == 0:
+                break
+            self._distance[found] = hop
+            levels.append(found)
+        for level in levels:
+            self._distance[level] = -1
+        return levels
+
+    def ego_nodes_by_radius(self, ego, radii: list[int]) -> dict[int, list]:
+        """
+        Nodes within every radius of the ego, from a single search up to the largest radius.
+        """
+        levels = self._search(self.codes[ego], max(radii))
+        return {radius: self.names[np.concatenate(levels[:radius + 1])].tolist() for radius in radii}
+
+    def _edges_within(self, codes: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        self._inside[codes] = True
+        positions, sources = _gather(self.out_pointers, np.sort(codes))
+        targets = self.out_neighbours[positions]
+        keep = self._inside[targets]
+        self._inside[codes] = False
+        return sources[keep], targets[keep], self.out_weights[positions][keep]
+
+    def _edges_of_ego(self, ego_code: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        out_span = slice(self.out_pointers[ego_code], self.out_pointers[ego_code + 1])
+        in_span = slice(self.in_pointers[ego_code], self.in_pointers[ego_code + 1])
+        in_sources = self.in_neighbours[in_span]
+        not_loop = in_sources != ego_code
+        sources = np.concatenate([np.full(out_span.stop - out_span.start, ego_code), in_sources[not_loop]])
+        targets = np.concatenate([self.out_neighbours[out_span], np.full(not_loop.sum(), ego_code)])
+        weights = np.concatenate([self.out_weights[out_span], self.in_weights[in_span][not_loop]])
+        return sources, targets, weights
+
+    def _to_network(self, node_codes: np.ndarray, edges, as_graph: bool):
+        sources, targets, weights = edges
+        ego_data = pd.DataFrame({COL_X: self.names[sources], COL_Y: self.names[targets], WEIGHT: weights})
+        if not as_graph:
+            return ego_data
+        ego_graph = nx.DiGraph()
+        ego_graph.add_nodes_from(self.names[node_codes].tolist())
+        ego_graph.add_weighted_edges_from(ego_data.itertuples(index=False, name=None))
+        return ego_data, ego_graph
+
+    def ego_networks(self, ego, radii: list[int] = (1,), degrees: list[float] = (1.0, 1.5),
+                     as_graph: bool = True) -> dict:
+        """
+        Ego networks for every combination of radius and degree, from a single search.
+
+        Parameters:
+        -----------
+        ego : str
+            The character to center the ego networks around
+        radii : list[int]
+            How many hops away from ego to include, ignoring edge direction
+        degrees : list[float]
+            - 1.0: Only direct connections (ego ↔ others)
+            - 1.5: All connections between the nodes within the radius
+        as_graph : bool
+            Also build the networkx graph, otherwise only the edge frame is returned
+
+        Returns:
+        --------
+        networks : dict
+            (radius, degree) -> (ego_data, ego_graph) as _extract_ego_network, or only ego_data
+        """
+        if ego not in self.codes:
+            print(f"Warning: {ego} not found in this book's network")
+            empty_data = pd.DataFrame(columns=[COL_X, COL_Y, WEIGHT])
+            empty = (empty_data, nx.DiGraph()) if as_graph else empty_data
+            return {(radius, degree): empty for radius in radii for degree in degrees}
+
+        ego_code = self.codes[ego]
+        levels = self._search(ego_code, max(radii))
+        ego_edges = self._edges_of_ego(ego_code) if 1.0 in degrees else None
+        networks = {}
+        for radius in radii:
+            node_codes = np.concatenate(levels[:radius + 1])
+            for degree in degrees:
+                edges = ego_edges if degree == 1.0 else self._edges_within(node_codes)
+                networks[(radius, degree)] = self._to_network(node_codes, edges, as_graph)
+        return networks
+
+    def ego_network(self, ego, radius: int = 1, degree: float = 1.5) -> tuple[pd.DataFrame, nx.DiGraph]:
+        """
+        A single ego network, see ego_networks.
+        """
+        return self.ego_networks(ego, radii=[radius], degrees=[degree])[(radius, degree)]
@@ -0,0 +1,136 @@
+from collections import Counter, defaultdict, deque
+
+import numpy as np
+import pandas as pd
+
+from model.constants import *
+
+
+class EgoTimeline:
+    """
+    The ego network of one character over consecutive sections, updated incrementally.
+
+    The mention weights of the sections in the window are kept as one running sum: a new section adds its
+    edges and the section leaving the window subtracts its own, so every step costs time proportional to
+    the edges of these two sections plus the ego's neighbourhood, never a re-extraction of the network.
+    Self-mentions are ignored.
+    """
+
+    def __init__(self, ego: str, window: int | None = 1):
+        """
+        Parameters:
+        -----------
+        ego : str
+            The character to follow
+        window : int | None
+            Number of most recent sections in the network, None accumulates all sections so far
+        """
+        self.ego = ego
+        self.window = window
+        self._sections = deque()
+        self._weights = Counter()
+        # character -> {neighbour: number of directions with mentions in the window}
+        self._adjacency = defaultdict(Counter)
+        self._alters = set()
+
+    def _add(self, edges: list[tuple], sign: int):
+        for u, v, w in edges:
+            before = self._weights[(u, v)]
+            after = before + sign * w
+            if after:
+                self._weights[(u, v)] = after
+            else:
+                self._weights.pop((u, v), None)
+            if (before > 0) == (after > 0):
+                continue
+            for a, b in [(u, v), (v, u)]:
+                self._adjacency[a][b] += 1 if after > 0 else -1
+                if not self._adjacency[a][b]:
+                    del self._adjacency[a][b]
+
+    def step(self, data: pd.DataFrame) -> tuple[dict, dict]:
+        """
+        Move the window to the next section.
+
+        Returns:
+        --------
+        metrics : dict
+            Ego network metrics of the window, see run_ego_timeline
+        partners : dict
+            partner -> mentions between the ego and the partner (both directions) in the window
+        """
+        edges = data[data[COL_X] != data[COL_Y]]
+        weights = edges[WEIGHT] if WEIGHT in edges.columns else pd.Series(1, index=edges.index)
+        edges = [(u, v, w) for (u, v), w in weights.groupby([edges[COL_X], edges[COL_Y]], sort=False).sum().items()]
+        self._add(edges, 1)
+        self._sections.append(edges)
+        if self.window is not None and len(self._sections) > self.window:
+            self._add(self._sections.popleft(), -1)
+
+        alters = set(self._adjacency.get(self.ego, ()))
+        new_alters, lost_alters = len(alters - self._alters), len(self._alters - alters)
+        self._alters = alters
+
+        out_weights = {a: self._weights.get((self.ego, a), 0) for a in alters}
+        in_weights = {a: self._weights.get((a, self.ego), 0) for a in alters}
+        partners = {a: out_weights[a] + in_weights[a] for a in alters}
+        ties_between_alters = sum(len(alters.intersection(self._adjacency[a])) for a in alters) // 2
+        possible = len(alters) * (len(alters) - 1) // 2
+        top_partner = max(partners, key=lambda a: (partners[a], a)) if partners else None
+
+        metrics = {
+            "ego_size": len(alters),
+            "new_alters": new_alters,
+            "lost_alters": lost_alters,
+            "in_degree": sum(w > 0 for w in in_weights.values()),
+            "out_degree": sum(w > 0 for w in out_weights.values()),
+            "in_strength": sum(in_weights.values()),
+            "out_strength": sum(out_weights.values()),
+            "reciprocity": sum(out_weights[a] > 0 and in_weights[a] > 0 for a in alters) / len(alters)
+            if alters else np.nan,
+            "ties_between_alters": ties_between_alters,
+            "density": ties_between_alters / possible if possible else np.nan,
+            "brokerage": possible - ties_between_alters,
+            "top_partner": top_partner,
+            "top_partner_weight": partners.get(top_partner, 0),
+        }
+        return metrics, partners
+
+
+def run_ego_timeline(sections: list[pd.DataFrame], ego: str, window: int | None = 1,
+                     section_type: str = "episode") -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Time series of an ego network over consecutive sections, e.g. the episodes.
+
+    Parameters:
+    -----------
+    sections : list[pd.DataFrame]
+        Sections in order, numbered from 1
+    ego : str
+        The character to follow
+    window : int | None
+        1 for every section on its own, k for a sliding window over the last k sections,
+        None for all sections up to the current one
+    section_type : str
+        Name of the index
+
+    Returns:
+    --------
+    metrics : pd.DataFrame
+        One row per section: ego_size, new_alters and lost_alters (compared to the previous section),
+        in/out degree and strength, reciprocity, ties_between_alters, density, brokerage
+        and the top_partner with its top_partner_weight (mentions in both directions)
+    partner_weights : pd.DataFrame
+        sections x partners, the mentions between the ego and every partner (0 when not connected)
+    """
+    timeline = EgoTimeline(ego, window=window)
+    rows, partner_rows = [], []
+    for data in sections:
+        metrics, partners = timeline.step(data)
+        rows.append(metrics)
+        partner_rows.append(partners)
+
+    index = pd.RangeIndex(1, len(sections) + 1, name=section_type)
+    metrics = pd.DataFrame(rows, index=index)
+    partner_weights = pd.DataFrame(partner_rows, index=index).fillna(0)
+    return metrics, partner_weights
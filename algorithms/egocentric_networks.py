@@ -1,12 +1,18 @@
 from matplotlib import pyplot as plt
 import matplotlib.patheffects as path_effects
 
+from algorithms.dyads import build_dyad_table, dyads_of
+from algorithms.ego_index import EgoIndex
 from algorithms.graph_algorithms import *
 from model.book_names import BOOK_NAMES
 from model.read_data import *
+from view.batched_drawing import draw_edges, draw_labels, draw_node_labels, draw_nodes
+from view.render_pool import FigureSpec
+from view.render_quality import save_figure
 
 
-def _extract_ego_network(data: pd.DataFrame, ego_character: str, radius: int = 1, degree: float = 1.5):
+def _extract_ego_network(data: pd.DataFrame, ego_character: str, radius: int = 1, degree: float = 1.5,
+                         index: EgoIndex = None):
     """
     Extract an egocentric network centered on a specific character.
 
@@ -22,6 +28,8 @@ def _extract_ego_network(data: pd.DataFrame, ego_character: str, radius: int = 1
         Type of ego network to extract:
         - 1.0: Only direct connections (ego ↔ others)
         - 1.5: Direct connections + connections between those others
+    index : EgoIndex
+        Index of `data`, pass it when extracting several ego networks from the same data
 
     Returns:
     --------
@@ -30,51 +38,20 @@ def _extract_ego_network(data: pd.DataFrame, ego_character: str, radius: int = 1
     ego_graph : nx.DiGraph
         NetworkX graph of the ego network
     """
-    # Build full graph using existing function
-    G = build_graph(data, use_weights=True)
+    index = EgoIndex(data) if index is None else index
+    return index.ego_network(ego_character, radius=radius, degree=degree)
 
-    # Check if ego character exists in the graph
-    if ego_character not in G.nodes():
-        print(f"Warning: {ego_character} not found in this book's network")
-        return pd.DataFrame(columns=["x", "y", "weight"]), nx.DiGraph()
 
-    # Extract ego network (undirected for radius calculation)
-    G_undirected = G.to_undirected()
-    ego_nodes = nx.ego_graph(G_undirected, ego_character, radius=radius).nodes()
-
-    # Create subgraph maintaining directionality
-    ego_graph = G.subgraph(ego_nodes).copy()
-
-    # If degree is 1.0, filter to only edges involving the ego character
-    if degree == 1.0:
-        edges_to_keep = []
-        for u, v, data_dict in ego_graph.edges(data=True):
-            if u == ego_character or v == ego_character:
-                edges_to_keep.append((u, v, data_dict))
-
-        # Create new graph with only ego-connected edges
-        ego_graph = nx.DiGraph()
-        ego_graph.add_nodes_from(ego_nodes)
-        for u, v, data_dict in edges_to_keep:
-            ego_graph.add_edge(u, v, **data_dict)
-
-    # Convert back to DataFrame
-    ego_edges = []
-    for u, v, data_dict in ego_graph.edges(data=True):
-        ego_edges.append({
-            "x": u,
-            "y": v,
-            "weight": data_dict.get("weight", 1)
-        })
-
-    ego_data = pd.DataFrame(ego_edges)
-
-    return ego_data, ego_graph
-
-
-def _analyze_ego_network_stats(ego_character: str, ego_data: pd.DataFrame, book_name: str):
+def _analyze_ego_network_stats(ego_character: str, ego_data: pd.DataFrame, book_name: str,
+                               dyads: pd.DataFrame = None):
     """
     Analyze and print statistics for an ego network.
+
+    dyads is the dyad table of the section (EgoIndex.dyads), it holds every pair of the ego, so it is not
+    rebuilt from ego_data for every ego. Repeated (x, y) rows are summed in the reciprocal relationships,
+    as in build_dyad_table, while the incoming and outgoing lists keep the weight of the last row.
+    A self-mention of the ego is a reciprocal relationship with its weight as both out and in.
+    Equal totals are listed by name.
     """
     if ego_data.empty:
         print(f"\n{book_name}: No network data for {ego_character}")
@@ -109,20 +86,24 @@ def _analyze_ego_network_stats(ego_character: str, ego_data: pd.DataFrame, book_
         print(f"    {char}: {weight}")
 
     # Reciprocal relationships
-    reciprocal = []
-    for v, out_weight in out_edges:
-        in_weight = next((w for u, w in in_edges if u == v), 0)
-        if in_weight > 0:
-            reciprocal.append((v, out_weight, in_weight, out_weight + in_weight))
-
-    reciprocal_sorted = sorted(reciprocal, key=lambda x: x[3], reverse=True)
+    partners = dyads_of(build_dyad_table(ego_data) if dyads is None else dyads, ego_character)
+    # a self-mention answers itself: listed with its weight as both out and in, as the ego graph has it
+    self_mention = partners["partner"] == ego_character
+    partners.loc[self_mention, "weight_in"] = partners.loc[self_mention, "weight_out"]
+    partners.loc[self_mention, "total"] = 2 * partners.loc[self_mention, "weight_out"]
+    partners.loc[self_mention, "reciprocal"] = True
+    # equal totals by name, so the order does not depend on the orientation of the pairs in the table
+    reciprocal = partners[partners["reciprocal"]].sort_values(["total", "partner"], ascending=[False, True],
+                                                              kind="stable")
 
     print(f"\n  Reciprocal relationships (total mentions):")
-    for char, out_w, in_w, total in reciprocal_sorted[:10]:
+    for char, out_w, in_w, total in reciprocal[["partner", "weight_out", "weight_in", "total"]].head(10).itertuples(
+            index=False, name=None):
         print(f"    {char}: {total} (out: {out_w}, in: {in_w})")
 
 
-def analyze_character_ego_network_per_book(character_name: str, degree: float = 1.5):
+def analyze_character_ego_network_per_book(character_name: str, degree: float = 1.5,
+                                           indexes: list[EgoIndex] = None):
     """
     Analyze any character's ego network for each book to track relationship evolution.
 
@@ -132,8 +113,10 @@ def analyze_character_ego_network_per_book(character_name: str, degree: float =
         Name of the character to analyze (will be converted to lowercase)
     degree : float
         1.0 for 1-degree (direct only), 1.5 for 1.5-degree (direct + inter-connections)
+    indexes : list[EgoIndex]
+        Ego index of every book, built from get_x_mentions_y_per_book if not given
     """
-    all_books = get_x_mentions_y_per_book()
+    indexes = indexes or [EgoIndex(book_data) for book_data in get_x_mentions_y_per_book()]
     character_lower = character_name.lower()
 
     degree_str = "1-DEGREE" if degree == 1.0 else "1.5-DEGREE"
@@ -141,14 +124,14 @@ def analyze_character_ego_network_per_book(character_name: str, degree: float =
     print(f"{character_name.upper()}'S {degree_str} EGO NETWORK ANALYSIS ACROSS BOOKS")
     print("=" * 70)
 
-    for book_number, book_data in enumerate(all_books, start=1):
+    for book_number, index in enumerate(indexes, start=1):
         book_name = f"Book {book_number}: {BOOK_NAMES[book_number]}"
 
         # Extract ego network (radius=1 means direct connections only)
-        ego_data, ego_graph = _extract_ego_network(book_data, character_lower, radius=1, degree=degree)
+        ego_data = index.ego_network(character_lower, radius=1, degree=degree)[0]
 
         # Analyze and print statistics
-        _analyze_ego_network_stats(character_lower, ego_data, book_name)
+        _analyze_ego_network_stats(character_lower, ego_data, book_name, dyads=index.dyads)
 
     print("\n" + "=" * 70)
 
@@ -173,21 +156,25 @@ def _save_centrality_table(centrality: dict, ego_character: str, book_name: str,
         return
 
     # Sort by centrality (descending)
-    sorted_centrality = sorted(centrality.items(), key=lambda x: x[1], reverse=True)
+    centrality = pd.Series(centrality, dtype=float).sort_values(ascending=False, kind='stable')
 
-    # Prepare data for table
-    characters = [char.capitalize() for char, _ in sorted_centrality]
-    centrality_values = [f"{cent:.4f}" for _, cent in sorted_centrality]
+    # Prepare data for table, with the colors of all cells at once
+    table_data = np.column_stack([centrality.index.str.capitalize(), centrality.map('{:.4f}'.format)])
+    rows = np.arange(1, len(centrality) + 1)
+    row_colors = np.where(centrality.index == ego_character, '#FFE6E6',  # Highlight ego character
+                          np.where(rows % 2 == 0, '#F0F0F0', 'white'))  # Alternate row colors
+    cell_colors = np.repeat(row_colors[:, None], 2, axis=1)
 
     # Create figure
-    fig, ax = plt.subplots(figsize=(8, max(6, len(characters) * 0.4)))
+    fig, ax = plt.subplots(figsize=(8, max(6, len(centrality) * 0.4)))
     ax.axis('tight')
     ax.axis('off')
 
     # Create table
-    table_data = [[char, cent] for char, cent in zip(characters, centrality_values)]
-    table = ax.table(cellText=table_data,
+    table = ax.table(cellText=table_data.tolist(),
+                     cellColours=cell_colors.tolist(),
                      colLabels=['Character', 'Eigenvector Centrality'],
+                     colColours=['#3498DB'] * 2,
                      cellLoc='left',
                      loc='center',
                      colWidths=[0.6, 0.4])
@@ -199,33 +186,23 @@ def _save_centrality_table(centrality: dict, ego_character: str, book_name: str,
 
     # Header styling
     for i in range(2):
-        cell = table[(0, i)]
-        cell.set_facecolor('#3498DB')
-        cell.set_text_props(weight='bold', color='white')
-
-    # Highlight ego character
-    for i, (char, _) in enumerate(sorted_centrality, start=1):
-        if char == ego_character:
-            table[(i, 0)].set_facecolor('#FFE6E6')
-            table[(i, 1)].set_facecolor('#FFE6E6')
-
-    # Alternate row colors
-    for i in range(1, len(characters) + 1):
-        if sorted_centrality[i - 1][0] != ego_character:
-            if i % 2 == 0:
-                table[(i, 0)].set_facecolor('#F0F0F0')
-                table[(i, 1)].set_facecolor('#F0F0F0')
+        table[(0, i)].set_text_props(weight='bold', color='white')
 
     # Title
     plt.title(f"{book_name}\nEigenvector Centrality in {ego_character.capitalize()}'s Network",
               fontsize=14, fontweight='bold', pad=20)
 
     plt.tight_layout()
-    plt.savefig(save_path, dpi=300, bbox_inches='tight', facecolor='white')
+    save_path = save_figure(fig, save_path, vector=True, print_dpi=300, bbox_inches='tight', facecolor='white')
     print(f"Saved centrality table to {save_path}")
     plt.close()
 
 
+def _edges_to_draw(ego_graph: nx.DiGraph, min_weight: int) -> list[tuple]:
+    """Edges of an ego network drawn by visualize_ego_network, nothing is drawn if there are none."""
+    return [(u, v) for u, v, d in ego_graph.edges(data=True) if d.get('weight', 1) >= min_weight]
+
+
 def visualize_ego_network(ego_graph: nx.DiGraph, ego_character: str, book_name: str,
                           min_weight: int = 1, save_path: str = None, degree: float = 1.5):
     """
@@ -251,8 +228,7 @@ def visualize_ego_network(ego_graph: nx.DiGraph, ego_character: str, book_name:
         return
 
     # Filter edges by minimum weight
-    edges_to_draw = [(u, v) for u, v, d in ego_graph.edges(data=True)
-                     if d.get('weight', 1) >= min_weight]
+    edges_to_draw = _edges_to_draw(ego_graph, min_weight)
     filtered_graph = ego_graph.edge_subgraph(edges_to_draw).copy()
 
     if filtered_graph.number_of_nodes() == 0:
@@ -334,76 +310,57 @@ def visualize_ego_network(ego_graph: nx.DiGraph, ego_character: str, book_name:
             size = 500 + (interaction / max_interaction) * 2000
             node_sizes.append(size)
 
+    # Title with degree information, the axes are final before the edges are drawn
+    degree_str = "1-Degree" if degree == 1.0 else "1.5-Degree"
+    title = f"{book_name}\n{ego_character.capitalize()}'s {degree_str} Ego Network"
+    ax.set_title(title, fontsize=30, fontweight='bold', pad=20)
+    ax.axis('off')
+    ax.set_xlim(-1.5, 1.5)
+    ax.set_ylim(-1.5, 1.5)
+    plt.tight_layout()
+
     # Draw nodes
-    nx.draw_networkx_nodes(filtered_graph, pos,
-                           node_color=node_colors,
-                           node_size=node_sizes,
-                           alpha=0.9,
-                           ax=ax)
+    draw_nodes(ax, pos, list(filtered_graph.nodes()), node_size=node_sizes, node_color=node_colors, alpha=0.9)
 
     # Get edge weights for width scaling
-    edges = list(filtered_graph.edges(data=True))
-    weights = [d['weight'] for u, v, d in edges]
-    max_weight = max(weights) if weights else 1
+    edges = list(filtered_graph.edges(data='weight'))
+    weights = np.asarray([w for u, v, w in edges], dtype=float)
+    max_weight = weights.max() if len(weights) else 1
 
     # Draw edges with width proportional to weight
-    edge_widths = [1 + 4 * w / max_weight for w in weights]
-    nx.draw_networkx_edges(filtered_graph, pos,
-                           width=edge_widths,
-                           alpha=0.8,
-                           edge_color='#000129',
-                           arrows=True,
-                           arrowsize=25,
-                           arrowstyle='->',
-                           connectionstyle='arc3,rad=0.1',
-                           ax=ax)
+    node_size_of = dict(zip(filtered_graph.nodes(), node_sizes))
+    draw_edges(ax, pos, [(u, v) for u, v, w in edges],
+               width=1 + 4 * weights / max_weight,
+               alpha=0.8,
+               edge_color='#000129',
+               arrows=True,
+               arrowsize=25,
+               arrowstyle='->',
+               rad=0.1,
+               node_size=node_size_of)
 
     # Draw labels
-    labels = nx.draw_networkx_labels(filtered_graph, pos,
-                                     font_size=30,
-                                     font_weight='bold',
-                                     font_color='black',
-                                     ax=ax)
+    draw_node_labels(ax, pos, fontsize=30, fontweight='bold', color='black')
 
     # Add edge weight labels for the top 5 highest-weight edges
-    top_edges = sorted(filtered_graph.edges(data=True),
-                       key=lambda x: x[2]['weight'], reverse=True)[:5]
-
-    # Plot labels manually (supports bidirectional edges)
-    for u, v, d in top_edges:
-        weight = d['weight']
-
-        # midpoint
-        x1, y1 = pos[u]
-        x2, y2 = pos[v]
-        mx, my = (x1 + x2) / 2, (y1 + y2) / 2
-
-        # offset if bidirectional
-        if filtered_graph.has_edge(v, u):
-            dx = y2 - y1
-            dy = x1 - x2
-            norm = (dx ** 2 + dy ** 2) ** 0.5
-            offset = 0.08 / norm if norm != 0 else 0
-            mx += dx * offset
-            my += dy * offset
-
-        ax.text(mx, my, f"{weight}",
+    top_edges = [edges[i] for i in np.argsort(-weights, kind='stable')[:5]]
+
+    # midpoints, offset if bidirectional (supports bidirectional edges)
+    ends = np.asarray([[pos[u], pos[v]] for u, v, w in top_edges], dtype=float).reshape(-1, 2, 2)
+    midpoints = ends.mean(axis=1)
+    normal = np.column_stack([ends[:, 1, 1] - ends[:, 0, 1], ends[:, 0, 0] - ends[:, 1, 0]])
+    norm = np.hypot(normal[:, 0], normal[:, 1])
+    bidirectional = np.asarray([filtered_graph.has_edge(v, u) for u, v, w in top_edges], dtype=bool)
+    offset = np.where(bidirectional & (norm != 0), 0.08 / np.where(norm != 0, norm, 1), 0)
+    midpoints += normal * offset[:, None]
+
+    draw_labels(ax, midpoints, [f"{w}" for u, v, w in top_edges],
                 fontsize=24, fontweight='bold', color='black',
-                ha='center', va='center',
                 path_effects=[path_effects.withStroke(linewidth=2, foreground='white')])
 
-    # Title with degree information
-    degree_str = "1-Degree" if degree == 1.0 else "1.5-Degree"
-    title = f"{book_name}\n{ego_character.capitalize()}'s {degree_str} Ego Network"
-    ax.set_title(title, fontsize=30, fontweight='bold', pad=20)
-    ax.axis('off')
-    ax.set_xlim(-1.5, 1.5)
-    ax.set_ylim(-1.5, 1.5)
-    plt.tight_layout()
-
     # Save or show
     if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight', facecolor='white')
+        save_path = save_figure(fig, save_path, print_dpi=300, bbox_inches='tight', facecolor='white')
         print(f"Saved visualization to {save_path}")
     else:
         plt.show()
@@ -412,7 +369,8 @@ def visualize_ego_network(ego_graph: nx.DiGraph, ego_character: str, book_name:
 
 
 def visualize_character_ego_networks_per_book(character_name: str, min_weight: int = 1,
-                                              degree: float = 1.5, save: bool = True):
+                                              degree: float = 1.5, save: bool = True,
+                                              indexes: list[EgoIndex] = None):
     """
     Create visualizations of any character's ego network for each book.
 
@@ -427,15 +385,17 @@ def visualize_character_ego_networks_per_book(character_name: str, min_weight: i
         1.5 for 1.5-degree ego network (direct + inter-connections)
     save : bool
         If True, saves figures to files; if False, displays them
+    indexes : list[EgoIndex]
+        Ego index of every book, built from get_x_mentions_y_per_book if not given
     """
-    all_books = get_x_mentions_y_per_book()
+    indexes = indexes or [EgoIndex(book_data) for book_data in get_x_mentions_y_per_book()]
     character_lower = character_name.lower()
 
-    for book_number, book_data in enumerate(all_books, start=1):
+    for book_number, index in enumerate(indexes, start=1):
         book_name = f"Book {book_number}: {BOOK_NAMES[book_number]}"
 
         # Extract ego network
-        ego_data, ego_graph = _extract_ego_network(book_data, character_lower, radius=1, degree=degree)
+        ego_data, ego_graph = index.ego_network(character_lower, radius=1, degree=degree)
 
         # Create save path if saving
         save_path = None
@@ -448,4 +408,42 @@ def visualize_character_ego_networks_per_book(character_name: str, min_weight: i
 
         # Visualize (this will also create centrality table for 1.5-degree networks)
         visualize_ego_network(ego_graph, character_lower, book_name,
-                              min_weight=min_weight, save_path=save_path, degree=degree)
\ No newline at end of file
+                              min_weight=min_weight, save_path=save_path, degree=degree)
+
+def analyze_character_ego_networks_per_book(character_name: str, min_weight: int = 1,
+                                            degrees: list[float] = (1.0, 1.5), save: bool = True,
+                                            indexes: list[EgoIndex] = None, specs: list[FigureSpec] = None):
+    """
+    Print the statistics of and visualize a character's ego networks for each book.
+
+    Every ego network is extracted once per book for all degrees, and used for both the statistics
+    and the visualization (see analyze_character_ego_network_per_book and
+    visualize_character_ego_networks_per_book for the separate steps).
+    If specs is given (and save is True), the figures are not drawn but appended to it as FigureSpecs,
+    to be rendered later with render_figures. Ego networks without edges of at least min_weight get no spec.
+    """
+    indexes = indexes or [EgoIndex(book_data) for book_data in get_x_mentions_y_per_book()]
+    character_lower = character_name.lower()
+    saving_path = "results/ego"
+    if save:
+        os.makedirs(saving_path, exist_ok=True)
+
+    for book_number, index in enumerate(indexes, start=1):
+        book_name = f"Book {book_number}: {BOOK_NAMES[book_number]}"
+        networks = index.ego_networks(character_lower, radii=[1], degrees=degrees)
+        for degree in degrees:
+            ego_data, ego_graph = networks[(1, degree)]
+            _analyze_ego_network_stats(character_lower, ego_data, book_name, dyads=index.dyads)
+
+            save_path = None
+            if save:
+                degree_suffix = "1deg" if degree == 1.0 else "1.5deg"
+                save_path = f"{saving_path}/{character_lower}_ego_{degree_suffix}_book_{book_number}.png"
+            # a network without edges to draw writes no figure, it is left to visualize_ego_network to report it
+            if specs is not None and save_path and _edges_to_draw(ego_graph, min_weight):
+                specs.append(FigureSpec(visualize_ego_network, save_path, path_argument="save_path", kwargs=dict(
+                    ego_graph=ego_graph, ego_character=character_lower, book_name=book_name,
+                    min_weight=min_weight, degree=degree)))
+                continue
+            visualize_ego_network(ego_graph, character_lower, book_name,
+                                  min_weight=min_weight, save_path=save_path, degree=degree)
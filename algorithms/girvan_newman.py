@@ -0,0 +1,274 @@
+import os
+
+import igraph as ig
+import networkx as nx
+import numpy as np
+from networkx.algorithms.community.quality import modularity
+
+from model.utils.cache_utils import cache_path, graph_fingerprint
+
+
+# part of the dendrogram cache key, bump it whenever the levels or the file format change
+DENDROGRAM_VERSION = 2
+
+# relative difference below which igraph's and networkx's edge betweenness cannot tell two values apart
+TIE_TOLERANCE = 1e-9
+
+
+def _view(graph: nx.Graph, nodes: set) -> nx.Graph:
+    """
+    View of graph on nodes in the node order of graph. graph.subgraph(nodes) iterates small node sets
+    in set order instead, which changes the order of the betweenness sums.
+    """
+    return nx.subgraph_view(graph, filter_node=nodes.__contains__)
+
+
+def _exact_betweenness(component: nx.Graph, edge_rank: dict, scale: float):
+    """
+    Highest edge betweenness within one connected component (a view of the working graph) as (value, rank,
+    edge), bit for bit the value networkx girvan_newman computes on the whole graph.
+
+    No shortest path crosses components, so the Brandes sums of an edge only depend on its component, which
+    the view visits in the same node and edge order. networkx halves unnormalized undirected values, which is
+    exact, and the whole graph rescales them with `scale`. Ties go to the edge with the lowest rank, as
+    max(betweenness, key=betweenness.get) does in networkx.
+    """
+    betweenness = nx.edge_betweenness_centrality(component, normalized=False)
+    values = {edge: 2 * value * scale for edge, value in betweenness.items()}
+    best = max(values, key=values.get)
+    return values[best], edge_rank[best], best
+
+
+def _component_betweenness(component: nx.Graph, edge_rank: dict, scale: float):
+    """
+    Highest edge betweenness within one connected component, as (value, rank, edge, exact).
+
+    igraph computes the same (Brandes) edge betweenness as networkx, but in C and summed in another order.
+    Its result is used when one edge is clearly the highest, near-ties are recomputed exactly with networkx
+    (exact=True), whose rounding decides ties between edges of equal betweenness.
+    """
+    edges = list(component.edges())
+    if not edges:
+        return None
+    node_index = {n: i for i, n in enumerate(component.nodes())}
+    ig_graph = ig.Graph(n=len(node_index), edges=[(node_index[u], node_index[v]) for u, v in edges])
+    # igraph counts every unordered pair once, networkx twice before halving
+    betweenness = 2 * np.asarray(ig_graph.edge_betweenness(directed=False)) * scale
+    top = betweenness.max()
+    tied = np.flatnonzero(betweenness >= top * (1 - TIE_TOLERANCE))
+    if len(tied) > 1:
+        return *_exact_betweenness(component, edge_rank, scale), True
+    return top, edge_rank[edges[tied[0]]], edges[tied[0]], False
+
+
+def _cut_weight(graph: nx.Graph, side: set, other_side: set, weight: str | None) -> float:
+    if len(side) > len(other_side):
+        side, other_side = other_side, side
+    return sum(d.get(weight, 1) if weight else 1
+               for n in side for neighbour, d in graph[n].items() if neighbour in other_side)
+
+
+def girvan_newman_levels(graph: nx.Graph, weight: str | None = "weight", patience: int | None = None):
+    """
+    Girvan–Newman divisive levels with localized edge betweenness recomputation.
+
+    After an edge is removed, betweenness is only recomputed inside the component the edge belonged to
+    (or the two components it fell apart into), all other components keep their cached values.
+    Modularity is updated incrementally when a community C splits into A and B:
+        dQ = -cut(A, B) / m - (D_A^2 + D_B^2 - D_C^2) / (2m)^2
+    with m the total edge weight and D the summed (weighted) degree of the original graph.
+    Edge betweenness is unweighted, as in networkx girvan_newman; `weight` is used for the modularity.
+    The levels are those of networkx girvan_newman, including the edge removed among equal betweenness:
+    near-ties are compared with networkx's own values and then go to the first edge in its edge order.
+
+    Parameters
+    ----------
+    graph : nx.Graph
+    weight : str | None
+        Edge attribute used for the modularity
+    patience : int | None
+        Stop once the modularity has stayed below the best level for this many levels
+
+    Yields
+    ------
+    communities : list[set], modularity : float
+        One item per split, like networkx girvan_newman (communities ordered by their first node)
+    """
+    # the same working copy as networkx girvan_newman, its node and edge order decide ties
+    working = graph.copy().to_undirected()
+    working.remove_edges_from(list(nx.selfloop_edges(working)))
+    if working.number_of_edges() == 0:
+        return
+    edge_rank = {}
+    for rank, (u, v) in enumerate(working.edges()):
+        edge_rank[(u, v)] = edge_rank[(v, u)] = rank
+    n_nodes = working.number_of_nodes()
+    scale = 1 / (n_nodes * (n_nodes - 1))
+
+    position = {n: i for i, n in enumerate(working.nodes())}
+    strength = dict(graph.degree(weight=weight))
+    two_m = sum(strength.values())
+
+    # every component is kept as its node set, keyed by the position of its first node,
+    # and its betweenness is computed on a view of the working graph, which keeps networkx's order
+    components = {}
+    for component in nx.connected_components(working):
+        components[min(position[n] for n in component)] = component
+    q = modularity(graph, list(components.values()), weight=weight)
+    top_edges = {cid: _component_betweenness(_view(working, c), edge_rank, scale) for cid, c in components.items()}
+
+    best_q = float("-inf")
+    levels_below_best = 0
+    while True:
+        candidates = {cid: top for cid, top in top_edges.items() if top is not None}
+        if not candidates:
+            return
+        # highest betweenness over all components, near-ties are compared with networkx's exact values
+        top = max(candidate[0] for candidate in candidates.values())
+        tied = [c for c, candidate in candidates.items() if candidate[0] >= top * (1 - TIE_TOLERANCE)]
+        if len(tied) > 1:
+            for c in tied:
+                if not candidates[c][3]:
+                    candidates[c] = top_edges[c] = (*_exact_betweenness(_view(working, components[c]),
+                                                                        edge_rank, scale), True)
+            top = max(candidates[c][0] for c in tied)
+            tied = [c for c in tied if candidates[c][0] == top]
+        cid = min(tied, key=lambda c: candidates[c][1])
+        u, v = candidates[cid][2]
+        working.remove_edge(u, v)
+
+        side_u = nx.node_connected_component(working, u)
+        if v in side_u:
+            top_edges[cid] = _component_betweenness(_view(working, components[cid]), edge_rank, scale)
+            continue
+
+        side_v = components[cid] - side_u
+        del components[cid], top_edges[cid]
+        for side in (side_u, side_v):
+            side_id = min(position[n] for n in side)
+            components[side_id] = side
+            top_edges[side_id] = _component_betweenness(_view(working, side), edge_rank, scale)
+
+        strength_u = sum(strength[n] for n in side_u)
+        strength_v = sum(strength[n] for n in side_v)
+        q += (-2 * _cut_weight(graph, side_u, side_v, weight) / two_m
+              - (strength_u ** 2 + strength_v ** 2 - (strength_u + strength_v) ** 2) / two_m ** 2)
+
+        yield [set(components[c]) for c in sorted(components)], q
+
+        if q > best_q:
+            best_q, levels_below_best = q, 0
+        else:
+            levels_below_best += 1
+            if patience is not None and levels_below_best >= patience:
+                return
+
+
+class GirvanNewmanDendrogram:
+    """
+    Every level of the Girvan–Newman process of one graph, as a (levels x nodes) label matrix.
+
+    Row 0 holds the connected components of the graph, row i the communities after the i-th split.
+    The modularity and number of communities of every row are kept alongside, so the partition after
+    k splits, the first partition with at least n communities and the highest modularity partition
+    are row lookups instead of new runs.
+    """
+
+    def __init__(self, nodes: list, labels: np.ndarray, modularity: np.ndarray):
+        self.nodes = nodes
+        self.labels = labels
+        self.modularity = modularity
+        self.n_communities = labels.max(axis=1) + 1 if len(nodes) else np.zeros(len(labels), dtype=int)
+        # the best level is searched among the splits, row 0 is only used when the graph cannot be split
+        self.best_level = int(np.argmax(modularity[1:])) + 1 if self.n_levels else 0
+
+    @property
+    def n_levels(self) -> int:
+        """Number of splits."""
+        return len(self.labels) - 1
+
+    @classmethod
+    def from_graph(cls, graph: nx.Graph, weight: str | None = "weight"):
+        nodes = sorted(graph.nodes(), key=repr)
+        index = {n: i for i, n in enumerate(nodes)}
+
+        def to_row(communities):
+            row = np.empty(len(nodes), dtype=np.int32)
+            for cid, community in enumerate(communities):
+                row[[index[n] for n in community]] = cid
+            return row
+
+        components = sorted((set(c) for c in nx.connected_components(graph)), key=lambda c: min(map(index.get, c)))
+        rows = [to_row(components)]
+        q = [modularity(graph, components, weight=weight) if graph.number_of_edges() else 0.0]
+        for communities, level_q in girvan_newman_levels(graph, weight=weight):
+            rows.append(to_row(communities))
+            q.append(level_q)
+        return cls(nodes, np.vstack(rows), np.asarray(q))
+
+    def communities_at(self, level: int) -> list[set]:
+        row = self.labels[level]
+        communities = [set() for _ in range(self.n_communities[level])]
+        for n, cid in zip(self.nodes, row):
+            communities[cid].add(n)
+        return communities
+
+    def best_level_within(self, patience: int | None = None) -> int:
+        """
+        Highest modularity split of a scan that stops once the modularity has stayed below the best level
+        for `patience` splits, as girvan_newman_levels with patience. None scans all levels (best_level).
+        """
+        if patience is None or not self.n_levels:
+            return self.best_level
+        best, levels_below_best = 1, 0
+        for level in range(2, self.n_levels + 1):
+            if self.modularity[level] > self.modularity[best]:
+                best, levels_below_best = level, 0
+            else:
+                levels_below_best += 1
+                if levels_below_best >= patience:
+                    break
+        return best
+
+    def level_after_splits(self, k: int) -> int:
+        """Level after k + 1 splits (as the k-th item of girvan_newman), the last level if there are fewer."""
+        return min(k + 1, self.n_levels)
+
+    def level_with_at_least(self, n_communities: int) -> int:
+        """First split with at least `n_communities` communities, the last level if there is none."""
+        level = int(np.searchsorted(self.n_communities[1:], n_communities, side="left")) + 1
+        return min(level, self.n_levels)
+
+    def save(self, path: str):
+        np.savez_compressed(path, labels=self.labels, modularity=self.modularity)
+
+    @classmethod
+    def load(cls, path: str, graph: nx.Graph):
+        with np.load(path) as cached:
+            return cls(sorted(graph.nodes(), key=repr), cached["labels"], cached["modularity"])
+
+
+_dendrograms = {}
+
+
+def get_dendrogram(graph: nx.Graph, weight: str | None = "weight", use_cache: bool = True) -> GirvanNewmanDendrogram:
+    """
+    Girvan–Newman dendrogram of a graph, computed once per graph fingerprint.
+
+    Dendrograms are kept in memory for the lifetime of the process and stored under
+    results/cache/girvan_newman, so later runs on the same graph skip the computation. The key holds the
+    DENDROGRAM_VERSION, the graph fingerprint and the weight attribute. Dendrograms always hold every level,
+    early stopping is applied when a level is read (see best_level_within). With use_cache=False the dendrogram is always recomputed and not stored.
+    """
+    if not use_cache:
+        return GirvanNewmanDendrogram.from_graph(graph, weight=weight)
+
+    key = f"v{DENDROGRAM_VERSION}_{graph_fingerprint(graph, weight)}_{weight}"
+    if key not in _dendrograms:
+        path = cache_path("girvan_newman", key, "npz")
+        if os.path.exists(path):
+            _dendrograms[key] = GirvanNewmanDendrogram.load(path, graph)
+        else:
+            _dendrograms[key] = GirvanNewmanDendrogram.from_graph(graph, weight=weight)
+            _dendrograms[key].save(path)
+    return _dendrograms[key]
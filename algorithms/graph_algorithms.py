@@ -1,18 +1,18 @@
-import random
 import pandas as pd
 import networkx as nx
 from itertools import combinations
 import numpy as np
-from sklearn.metrics import adjusted_rand_score, normalized_mutual_info_score
-from networkx.algorithms import clique, assortativity
-from networkx.algorithms.community import girvan_newman
-from networkx.algorithms.community.quality import modularity
+from networkx.algorithms import clique
 import community as community_louvain
 import igraph as ig
 import leidenalg as la
 import os
 
+from algorithms.dyads import build_dyad_table, dyads_to_graph, node_order
+from algorithms.cliques import clique_size_histogram, maximum_cliques, top_k_largest_cliques
+from algorithms.girvan_newman import get_dendrogram
 from algorithms.network_statistics import NetworkStatisticsAnalyzer, build_graph
+from algorithms.partition_comparison import compare_partitions
 
 # Base path to the data folder (relative to algorithms/)
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "model", "data")
@@ -31,18 +31,7 @@ def build_undirected_weighted(data: pd.DataFrame) -> nx.Graph:
     """
    Create an undirected weighted graph summing reciprocal weights.
    """
-    directed_graph = nx.DiGraph()
-    directed_graph.add_weighted_edges_from(data[["x", "y", "weight"]].itertuples(index=False, name=None))
-
-    undirected_graph = nx.Graph()
-    undirected_graph.add_nodes_from(directed_graph.nodes(data=True))
-    for u, v, d in directed_graph.edges(data=True):
-        w = d.get("weight", 1.0) if "weight" else 1.0
-        if undirected_graph.has_edge(u, v):
-            undirected_graph[u][v]["weight"] += w
-        else:
-            undirected_graph.add_edge(u, v, weight=w)
-    return undirected_graph
+    return dyads_to_graph(build_dyad_table(data), nodes=node_order(data))
 
 def run_hits(graph: nx.DiGraph, max_iter: int = 1000, tol: float = 1e-8):
     """
@@ -55,19 +44,36 @@ def run_hits(graph: nx.DiGraph, max_iter: int = 1000, tol: float = 1e-8):
 def run_pagerank(graph: nx.DiGraph, alpha: float = 0.85, max_iter: int = 1000, tol: float = 1e-8,
                  weight: str = "weight"):
     """
-    Run PageRank on a graph, using weights if available.
+    Run PageRank on a graph, using weights if any edge has them (edges without a weight count as 1).
     Returns a dict {node: pagerank_score}.
     """
-    pr = nx.pagerank(graph, alpha=alpha, max_iter=max_iter, tol=tol,
-                     weight=weight if weight in graph.edges[list(graph.edges)[0]] else None)
+    weighted = any(weight in d for _, _, d in graph.edges(data=True))
+    pr = nx.pagerank(graph, alpha=alpha, max_iter=max_iter, tol=tol, weight=weight if weighted else None)
     return pr
 
-def run_cliques(graph: nx.Graph):
+def run_cliques(graph: nx.Graph, mode: str = "all", k: int = 10):
     """
     Run Cliques algorithm on a graph, does not use weights nor direction
     :param graph: The graph to run cliques on.
-    :return: size of largest clique, list of all cliques
+    :param mode: what to return next to the size of the largest clique
+        "all": list of all cliques (keeps every clique of every size in memory)
+        "maximum": list of the largest cliques, found by branch and bound
+        "histogram": dict {clique size: number of cliques}, counted while streaming
+        "top_k": list of the k largest maximal cliques
+    :param k: number of cliques returned in "top_k" mode
+    :return: size of largest clique, cliques (see mode)
     """
+    if mode == "maximum":
+        return maximum_cliques(graph)
+    if mode == "histogram":
+        histogram = clique_size_histogram(graph)
+        return max(histogram, default=0), histogram
+    if mode == "top_k":
+        largest = top_k_largest_cliques(graph, k=k)
+        return (len(largest[0]) if largest else 0), largest
+    if mode != "all":
+        raise ValueError(f"Unknown clique mode {mode!r}")
+
     # enumerate ALL cliques
     all_cliques = list(clique.enumerate_all_cliques(graph))
     # size of the largest clique
@@ -78,44 +84,80 @@ def run_cliques(graph: nx.Graph):
             n_biggest = lc
     return n_biggest, all_cliques
 
-def run_homophily(graph: nx.DiGraph, attr: str, permutations: int = 0):
-    n_nodes, n_edges = graph.number_of_nodes(), graph.number_of_edges()
+def _encode_attribute(graph: nx.DiGraph, attr: str):
+    """
+    Encode a categorical node attribute as integer codes over a fixed edge array.
 
-    # 1) Assortativity (categorical) on directed graph
-    r = assortativity.attribute_assortativity_coefficient(graph, attr)
+    Returns the sorted categories, the code of every node and the source/target node index of every edge.
+    Missing values (NaN) form one category of their own, for the mixing matrix and the assortativity.
+    """
+    node_index = {n: i for i, n in enumerate(graph.nodes())}
+    values = pd.Series([graph.nodes[n][attr] for n in graph.nodes()], dtype=object)
+    codes, categories = pd.factorize(values, sort=True, use_na_sentinel=False)
+    edges = np.array([(node_index[u], node_index[v]) for u, v in graph.edges()], dtype=np.int64).reshape(-1, 2)
+    return list(categories), codes.astype(np.int64), edges[:, 0], edges[:, 1]
+
+def _mixing_matrices(codes: np.ndarray, source: np.ndarray, target: np.ndarray, n_categories: int) -> np.ndarray:
+    """
+    Attribute mixing matrices (edge counts per category pair) for a batch of node codings.
+    codes has shape (batch, n_nodes), the result has shape (batch, n_categories, n_categories).
+    """
+    batch = codes.shape[0]
+    cells = codes[:, source] * n_categories + codes[:, target]
+    cells += (np.arange(batch) * n_categories * n_categories)[:, None]
+    counts = np.bincount(cells.ravel(), minlength=batch * n_categories * n_categories)
+    return counts.reshape(batch, n_categories, n_categories)
 
+def _assortativity_from_mixing(mixing: np.ndarray) -> np.ndarray:
+    """
+    Newman's attribute assortativity r = (tr(e) - sum(a*b)) / (1 - sum(a*b)) for a batch of mixing matrices,
+    the same coefficient as networkx attribute_assortativity_coefficient.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        e = mixing / mixing.sum(axis=(1, 2), keepdims=True)
+        a_dot_b = (e.sum(axis=2) * e.sum(axis=1)).sum(axis=1)
+        trace = np.einsum("bii->b", e)
+        return (trace - a_dot_b) / (1 - a_dot_b)
+
+def run_homophily(graph: nx.DiGraph, attr: str, permutations: int = 0, seed: int = 1,
+                  batch_size: int | None = None):
+    """
+    Categorical homophily of a node attribute, with an optional permutation test for the assortativity.
+
+    The attribute is encoded as integer codes over a fixed edge array, permuted codings are scored in batches
+    with bincount mixing matrices, so the graph is never mutated and 10k+ permutations are cheap.
+    batch_size defaults to as many permutations as fit in about 4M edge cells.
+    """
+    categories, codes, source, target = _encode_attribute(graph, attr)
+    n_categories = len(categories)
+
+    # 1) Assortativity (categorical) on directed graph
     # 2) Mixing matrices
-    M = assortativity.attribute_mixing_matrix(graph, attr, normalized=False)
-    M_norm = assortativity.attribute_mixing_matrix(graph, attr, normalized=True)
+    M = _mixing_matrices(codes[None, :], source, target, n_categories)
+    r = float(_assortativity_from_mixing(M)[0])
+    M = M[0]
+    M_norm = M / M.sum() if M.sum() > 0 else M.astype(float)
 
     # 3) Edgewise homophily & E–I index
-    same = 0.0
-    total = 0.0
-    for u, v, d in graph.edges(data=True):
-        w = 1.0
-        total += w
-        if graph.nodes[u][attr] == graph.nodes[v][attr]:
-            same += w
+    total = float(len(source))
+    # two missing values are not the same attribute, as NaN != NaN
+    missing = np.asarray(pd.isna(pd.Index(categories, dtype=object)), dtype=bool)
+    same = float(np.count_nonzero((codes[source] == codes[target]) & ~missing[codes[source]]))
     edgewise_hom = same / total if total > 0 else float("nan")
     E_minus_I = ((total - same) - same) / total if total > 0 else float("nan")
 
     # 4) Optional permutation test
     p_value = None
     if permutations and permutations > 0:
-        rng = random.Random(1)
-        orig_vals = {n: graph.nodes[n][attr] for n in graph.nodes()}
-        vals = list(orig_vals.values())
-        null_stats = []
-        for _ in range(permutations):
-            rng.shuffle(vals)
-            for n, v in zip(graph.nodes(), vals):
-                graph.nodes[n][attr] = v
-            rr = assortativity.attribute_assortativity_coefficient(graph, attr)
-            null_stats.append(rr)
-        # restore
-        for n, v in orig_vals.items():
-            graph.nodes[n][attr] = v
-        ge = sum(1 for z in null_stats if abs(z) >= abs(r))
+        rng = np.random.default_rng(seed)
+        if batch_size is None:
+            batch_size = max(1, min(permutations, 2 ** 22 // max(len(source), 1)))
+        ge = 0
+        for start in range(0, permutations, batch_size):
+            batch = min(batch_size, permutations - start)
+            permuted = rng.permuted(np.tile(codes, (batch, 1)), axis=1)
+            null_stats = _assortativity_from_mixing(_mixing_matrices(permuted, source, target, n_categories))
+            ge += int(np.count_nonzero(np.abs(null_stats) >= abs(r)))
         p_value = (ge + 1) / (permutations + 1)
 
     return {
@@ -123,6 +165,7 @@ def run_homophily(graph: nx.DiGraph, attr: str, permutations: int = 0):
         "assortativity_p_value": p_value,
         "edgewise_homophily": edgewise_hom,
         "E_minus_I_index": E_minus_I,
+        "categories": categories,
         "mixing_matrix": M.tolist(),
         "mixing_matrix_norm": M_norm.tolist(),
     }
@@ -140,16 +183,89 @@ def run_bridges(graph: nx.DiGraph, graph_und: nx.Graph):
         Edges (u, v) that are bridges in the undirected sense: removing the edge increases the number of connected components.
     """
     weak_articulation = list(nx.articulation_points(graph_und))
-    scc = nx.number_strongly_connected_components(graph)
-    strong_articulation = []
-    for v in graph.nodes():
-        new_graph = graph.copy()
-        new_graph.remove_node(v)
-        if nx.number_strongly_connected_components(new_graph) > scc:
-            strong_articulation.append(v)
+    strong_articulation = run_strong_articulation_points(graph)
     weak_bridges = list(nx.bridges(graph_und))
     return weak_articulation, strong_articulation, weak_bridges
 
+def _dominator_tree(graph: nx.DiGraph, root):
+    """
+    Dominator tree of the flow graph (graph, root), as preorder numbers and subtree sizes.
+    u dominates v  <=>  pre[u] <= pre[v] < pre[u] + size[u]
+    """
+    idom = nx.immediate_dominators(graph, root)
+    children = {}
+    for v, parent in idom.items():
+        if v != root:
+            children.setdefault(parent, []).append(v)
+
+    pre, size = {}, {}
+    order = []
+    stack = [root]
+    while stack:
+        v = stack.pop()
+        pre[v] = len(order)
+        order.append(v)
+        stack.extend(children.get(v, []))
+    for v in reversed(order):
+        size[v] = 1 + sum(size[c] for c in children.get(v, []))
+    return pre, size
+
+def _flow_graph_bridges(graph: nx.DiGraph, root, pre: dict, size: dict) -> list[tuple]:
+    """
+    Edges (u, v) that lie on every path from root to v.
+    That is the case when u is the only predecessor of v that is not dominated by v.
+    """
+    bridges = []
+    for v in graph.nodes():
+        if v == root:
+            continue
+        entries = [w for w in graph.predecessors(v) if not pre[v] <= pre[w] < pre[v] + size[v]]
+        if len(entries) == 1:
+            bridges.append((entries[0], v))
+    return bridges
+
+def _strongly_connected_subgraphs(graph: nx.DiGraph, min_size: int):
+    for component in nx.strongly_connected_components(graph):
+        if len(component) >= min_size:
+            yield graph.subgraph(component), next(iter(component))
+
+def run_strong_articulation_points(graph: nx.DiGraph) -> list:
+    """
+    Nodes whose removal increases the number of strongly connected components.
+
+    Linear-time algorithm of Italiano, Laura and Santaroni (2012): within a strongly connected component
+    with an arbitrary root r, a node v != r is a strong articulation point iff it is a non-trivial dominator
+    of the flow graph G(r) or of the reversed flow graph G^R(r). Only r itself needs an explicit check.
+    """
+    strong_articulation = set()
+    # removing a node from a component of size 1 or 2 never leaves a component that falls apart
+    for component, root in _strongly_connected_subgraphs(graph, min_size=3):
+        for flow_graph in (component, component.reverse(copy=False)):
+            idom = nx.immediate_dominators(flow_graph, root)
+            strong_articulation.update(d for v, d in idom.items() if v != root and d != root)
+        without_root = component.subgraph(set(component) - {root})
+        if not nx.is_strongly_connected(without_root):
+            strong_articulation.add(root)
+    return [v for v in graph.nodes() if v in strong_articulation]
+
+def run_strong_bridges(graph: nx.DiGraph) -> list[tuple]:
+    """
+    Edges whose removal increases the number of strongly connected components.
+
+    Linear-time algorithm of Italiano, Laura and Santaroni (2012): within a strongly connected component
+    with an arbitrary root r, the strong bridges are the bridges of the flow graph G(r) together with
+    the (reversed) bridges of the reversed flow graph G^R(r).
+    """
+    strong_bridges = set()
+    for component, root in _strongly_connected_subgraphs(graph, min_size=2):
+        pre, size = _dominator_tree(component, root)
+        strong_bridges.update(_flow_graph_bridges(component, root, pre, size))
+
+        reversed_component = component.reverse(copy=False)
+        pre, size = _dominator_tree(reversed_component, root)
+        strong_bridges.update((u, v) for v, u in _flow_graph_bridges(reversed_component, root, pre, size))
+    return [edge for edge in graph.edges() if edge in strong_bridges]
+
 
 def _mv_edge_weighted(weight_attr):
     """Return a most_valuable_edge function that uses weighted edge betweenness."""
@@ -158,7 +274,8 @@ def _mv_edge_weighted(weight_attr):
         return max(eb, key=eb.get)
     return _inner
 
-def run_partition_girvan(graph: nx.Graph, k: int | None = None, target_n: int | None = None):
+def run_partition_girvan(graph: nx.Graph, k: int | None = None, target_n: int | None = None,
+                         patience: int | None = None, use_cache: bool = True):
     """
         Girvan–Newman partition algorithm.
         DG : nx.DiGraph
@@ -166,53 +283,32 @@ def run_partition_girvan(graph: nx.Graph, k: int | None = None, target_n: int |
         k : int | None
             If set, return the partition after k splits.
             If None, returns the partition with the highest modularity encountered during the sequence.
+        target_n : int | None
+            If set, return the first partition with at least target_n communities.
+        patience : int | None
+            Stop the scan for the highest modularity once it has stayed below the best level for
+            this many levels (only used when k and target_n are None)
+        use_cache : bool
+            Reuse the dendrogram of earlier runs on the same graph (kept in memory and on disk)
 
         communities : list[set]
             List of node sets (one set per community).
         labels : dict
             Mapping node -> community_id
         """
-    #comp_gen = girvan_newman(graph, most_valuable_edge=_mv_edge_weighted("weight"))
-    comp_gen = girvan_newman(graph)
-    best = None
-    best_Q = float("-inf")
+    # the whole dendrogram is computed once per graph, every mode is a lookup of one of its levels
+    dendrogram = get_dendrogram(graph, weight="weight", use_cache=use_cache)
     if k is not None:
-        # advance generator to the k-th split (k+1 communities)
-        for i, part in enumerate(comp_gen):
-            if i == k:
-                communities = [set(c) for c in part]
-                labels = {n: idx for idx, c in enumerate(communities) for n in c}
-                return communities, labels
-        # if ended early, fall back to last
-        communities = [set(c) for c in part]
-        labels = {n: idx for idx, c in enumerate(communities) for n in c}
-        return communities, labels
-
-    # 2) stop when hitting target_n communities
-    if target_n is not None:
-        for part in comp_gen:
-            communities = [set(c) for c in part]
-            if len(communities) >= target_n:
-                labels = {n: idx for idx, c in enumerate(communities) for n in c}
-                return communities, labels
-        # return last if never hit
-        communities = [set(c) for c in part]
-        labels = {n: idx for idx, c in enumerate(communities) for n in c}
-        return communities, labels
-
-    else:
+        communities = dendrogram.communities_at(dendrogram.level_after_splits(k))
+    elif target_n is not None:
+        communities = dendrogram.communities_at(dendrogram.level_with_at_least(target_n))
+    elif dendrogram.n_levels:
         # scan and pick max modularity level
-        for part in comp_gen:
-            communities = [set(c) for c in part]
-            Q = modularity(graph, communities, weight="weight")
-            if Q > best_Q:
-                best_Q = Q
-                best = communities
-            if len(communities) >= graph.number_of_nodes():
-                break
-        communities = best if best is not None else [set(graph.nodes())]
-        labels = {n: idx for idx, c in enumerate(communities) for n in c}
-        return communities, labels
+        communities = dendrogram.communities_at(dendrogram.best_level_within(patience))
+    else:
+        communities = [set(graph.nodes())]
+    labels = {n: idx for idx, c in enumerate(communities) for n in c}
+    return communities, labels
 
 def run_partition_louvain(graph: nx.Graph, resolution: float = 1.0, random_state: int | None = None,):
     """
@@ -236,7 +332,8 @@ def run_partition_louvain(graph: nx.Graph, resolution: float = 1.0, random_state
         communities[cid].add(n)
     return communities, labels
 
-def run_partition_leiden(graph: nx.Graph, resolution: float = 1.0, n_iterations: int = -1, random_state: int | None = None,):
+def run_partition_leiden(graph: nx.Graph, resolution: float = 1.0, n_iterations: int = -1, random_state: int | None = None,
+                         initial_membership: dict | None = None):
     """
         Leiden community detection (requires `igraph` and `leidenalg`).
 
@@ -245,6 +342,8 @@ def run_partition_leiden(graph: nx.Graph, resolution: float = 1.0, n_iterations:
         - Converts to an undirected igraph with summed weights for reciprocity.
         - Uses RBConfigurationVertexPartition (Leiden with resolution parameter).
         - Set `n_iterations=-1` to let the algorithm run until convergence.
+        - `initial_membership` (node -> community id) warm-starts the optimization, e.g. from the
+          partition of a previous episode. Nodes without a community start as singletons.
 
         Returns
         -------
@@ -259,14 +358,23 @@ def run_partition_leiden(graph: nx.Graph, resolution: float = 1.0, n_iterations:
     ig_graph.vs["name"] = list(graph.nodes())
     ig_graph.es["weight"] = weights
 
-    rng = la.RNG(random_state) if random_state is not None else None
+    membership = None
+    if initial_membership is not None:
+        # leidenalg expects consecutive community ids, nodes without a community get one of their own
+        community_ids = {}
+        membership = []
+        for n in graph.nodes():
+            key = ("community", initial_membership[n]) if n in initial_membership else ("node", n)
+            membership.append(community_ids.setdefault(key, len(community_ids)))
+
     part = la.find_partition(
         ig_graph,
         la.RBConfigurationVertexPartition,
         weights="weight",
         resolution_parameter=resolution,
         n_iterations=n_iterations,
-        seed=rng,
+        seed=random_state,
+        initial_membership=membership,
     )
     # Convert back
     communities = [set(ig_graph.vs[idx]["name"] for idx in comm) for comm in part]
@@ -320,17 +428,17 @@ def analyze_pagerank(data: pd.DataFrame, name: str, alpha: float = 0.85,
     save_pagerank_results(pr_scores, f"pagerank_{name}.csv")
     return pr_scores
 
-def analyze_cliques(data: pd.DataFrame, name: str, reciprocal: bool = True):
-    graph = build_graph(data, use_weights=False)
-    graph = graph.to_undirected(reciprocal=reciprocal) # remove directions from graph, keeps only bidirectional edges
-    n_biggest, all_cliques = run_cliques(graph)
-    return n_biggest, all_cliques
+def analyze_cliques(data: pd.DataFrame, name: str, reciprocal: bool = True, mode: str = "maximum"):
+    # remove directions from graph, reciprocal keeps only bidirectional edges
+    graph = dyads_to_graph(build_dyad_table(data), nodes=node_order(data), reciprocal_only=reciprocal, weight=None)
+    n_biggest, cliques = run_cliques(graph, mode=mode)
+    return n_biggest, cliques
 
 def analyze_homophily(data: pd.DataFrame, character_data: pd.DataFrame, name: str):
     graph = build_graph_with_attributes(data, character_data)
-    results_gender = run_homophily(graph=graph, attr="gender", permutations = 100)
-    results_bending = run_homophily(graph=graph, attr="bending", permutations = 100)
-    results_origin = run_homophily(graph=graph, attr="origin", permutations = 100)
+    results_gender = run_homophily(graph=graph, attr="gender", permutations=10_000)
+    results_bending = run_homophily(graph=graph, attr="bending", permutations=10_000)
+    results_origin = run_homophily(graph=graph, attr="origin", permutations=10_000)
     return results_gender, results_bending, results_origin
 
 def analyze_bridges(data: pd.DataFrame, reciprocal: bool = True):
@@ -338,6 +446,10 @@ def analyze_bridges(data: pd.DataFrame, reciprocal: bool = True):
     graph_und = graph.to_undirected(reciprocal=reciprocal)  # remove directions from graph, keeps only bidirectional edges
     return run_bridges(graph, graph_und)
 
+def analyze_strong_bridges(data: pd.DataFrame):
+    graph = build_graph(data)
+    return run_strong_bridges(graph)
+
 def analyse_partitioning(data: pd.DataFrame):
     graph = build_undirected_weighted(data)
     g_communities, g_labels = run_partition_girvan(graph)
@@ -354,21 +466,12 @@ def analyse_partitioning(data: pd.DataFrame):
         "leiden": le_labels
     }
     nodes = list(graph.nodes())  # keep graph’s native order (or sorted(graph.nodes()))
-
-    def to_array(label_dict):
-        # if any node is missing, raise a clear error
-        missing = [n for n in nodes if n not in label_dict]
-        if missing:
-            raise KeyError(f"Labeling missing {len(missing)} nodes, e.g. {missing[:5]}")
-        return np.asarray([label_dict[n] for n in nodes])
-
-    labels_arr = {name: to_array(ldict) for name, ldict in labels.items()}
+    matrices = compare_partitions(labels, nodes=nodes)
 
     ari_nmi_results = {}
-    for a, b in combinations(labels_arr.keys(), 2):
-        la, lb = labels_arr[a], labels_arr[b]
-        ari = adjusted_rand_score(la, lb)
-        nmi = normalized_mutual_info_score(la, lb)
+    for a, b in combinations(labels.keys(), 2):
+        ari = matrices["ari"].at[a, b]
+        nmi = matrices["nmi"].at[a, b]
         ari_nmi_results[f"{a}__{b}"] = {"ari": ari, "nmi": nmi}
 
     def subset_edges_by_community(
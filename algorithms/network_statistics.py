@@ -1,10 +1,20 @@
 from collections import Counter, defaultdict
 
 import networkx as nx
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
+from scipy.linalg import eigh
+from scipy.sparse.csgraph import shortest_path
+from scipy.sparse.linalg import eigs, expm_multiply, spsolve
 
 from model.entities.centrality_scores import CentralityScores
 
+# sources per block of BFS rows (harmonic) or unit vectors (subgraph centrality), bounds memory to block x n
+SOURCE_BLOCK_SIZE = 256
+# up to this many nodes subgraph centrality uses a dense eigendecomposition of A
+DENSE_SUBGRAPH_MAX_NODES = 2_000
+
 def build_graph(data: pd.DataFrame, use_weights: bool = False) -> nx.DiGraph:
     """
     Build a graph from a DataFrame with columns ["x", "y"] or ["x", "y", "weight"].
@@ -82,6 +92,31 @@ class NetworkStatisticsAnalyzer:
             betweenness = nx.betweenness_centrality(self.graph)
         except Exception:
             betweenness = {}
+
+        try:
+            katz = self.get_katz_centrality()
+        except Exception:
+            katz = {}
+
+        try:
+            harmonic = self.get_harmonic_centrality()
+        except Exception:
+            harmonic = {}
+
+        try:
+            pagerank = self.get_pagerank_centrality()
+        except Exception:
+            pagerank = {}
+
+        try:
+            subgraph = self.get_subgraph_centrality()
+        except Exception:
+            subgraph = {}
+
+        try:
+            communicability = self.get_total_communicability()
+        except Exception:
+            communicability = {}
         
         return CentralityScores(
             in_degree=in_degree,
@@ -89,8 +124,100 @@ class NetworkStatisticsAnalyzer:
             eigenvector=eigenvector,
             closeness=closeness,
             betweenness=betweenness,
+            katz=katz,
+            harmonic=harmonic,
+            pagerank=pagerank,
+            subgraph=subgraph,
+            communicability=communicability,
         )
 
+    def _get_adjacency(self, weight: str | None = None, undirected: bool = False):
+        nodes = list(self.graph.nodes())
+        adjacency = nx.to_scipy_sparse_array(self.graph, nodelist=nodes, weight=weight, format="csr", dtype=float)
+        if undirected:
+            # simple graph: an edge in either direction, self-mentions dropped
+            adjacency = ((adjacency + adjacency.T) > 0).astype(float).tolil()
+            adjacency.setdiag(0)
+            adjacency = adjacency.tocsr()
+            adjacency.eliminate_zeros()
+        return nodes, adjacency
+
+    def get_katz_centrality(self, alpha: float | None = None, beta: float = 1.0) -> dict:
+        """
+        Katz centrality x = alpha * A^T x + beta (as networkx, counting incoming walks), with one sparse solve.
+        alpha defaults to 0.85 / spectral radius of A, so the walk series always converges.
+        """
+        nodes, adjacency = self._get_adjacency()
+        if alpha is None:
+            radius = 0.0
+            if adjacency.nnz:
+                if len(nodes) > 2:
+                    radius = abs(eigs(adjacency, k=1, which="LM", return_eigenvectors=False)[0])
+                else:
+                    radius = max(abs(np.linalg.eigvals(adjacency.toarray())))
+            alpha = 0.85 / radius if radius > 1e-9 else 0.1
+        system = sp.identity(len(nodes), format="csc") - alpha * adjacency.T.tocsc()
+        katz = np.atleast_1d(spsolve(system, np.full(len(nodes), beta)))
+        katz /= np.sign(katz.sum()) * np.linalg.norm(katz)
+        return dict(zip(nodes, katz.tolist()))
+
+    def get_harmonic_centrality(self) -> dict:
+        """
+        Sum of the reciprocal distances from all other nodes (as networkx), from BFS in scipy.
+        The BFS rows of SOURCE_BLOCK_SIZE sources at a time are added up, so no n x n distance matrix is built.
+        """
+        nodes, adjacency = self._get_adjacency()
+        harmonic = np.zeros(len(nodes))
+        for start in range(0, len(nodes), SOURCE_BLOCK_SIZE):
+            sources = np.arange(start, min(start + SOURCE_BLOCK_SIZE, len(nodes)))
+            distances = shortest_path(adjacency, directed=True, unweighted=True, indices=sources)
+            with np.errstate(divide="ignore"):
+                reciprocal = np.where(np.isfinite(distances) & (distances > 0), 1.0 / distances, 0.0)
+            harmonic += reciprocal.sum(axis=0)
+        return dict(zip(nodes, harmonic.tolist()))
+
+    def get_pagerank_centrality(self, alpha: float = 0.85) -> dict:
+        """
+        Weighted PageRank as the normalized solution of (I - alpha P^T) x = 1 / n, one sparse solve.
+        Dangling nodes jump uniformly, as in networkx.
+        """
+        nodes, adjacency = self._get_adjacency(weight="weight")
+        out_strength = np.asarray(adjacency.sum(axis=1)).ravel()
+        scale = np.divide(1.0, out_strength, out=np.zeros_like(out_strength), where=out_strength > 0)
+        transition = sp.diags(scale) @ adjacency
+        system = sp.identity(len(nodes), format="csc") - alpha * transition.T.tocsc()
+        pagerank = np.atleast_1d(spsolve(system, np.full(len(nodes), 1.0 / len(nodes))))
+        return dict(zip(nodes, (pagerank / pagerank.sum()).tolist()))
+
+    def get_subgraph_centrality(self) -> dict:
+        """
+        Subgraph centrality diag(exp(A)) of the undirected graph: the weighted count of closed walks
+        through every node. Up to DENSE_SUBGRAPH_MAX_NODES nodes from the spectral decomposition of A, for
+        larger graphs as the diagonal of sparse exp(A) E products over blocks E of SOURCE_BLOCK_SIZE unit vectors.
+        """
+        nodes, adjacency = self._get_adjacency(undirected=True)
+        if len(nodes) <= DENSE_SUBGRAPH_MAX_NODES:
+            eigenvalues, eigenvectors = eigh(adjacency.toarray())
+            return dict(zip(nodes, ((eigenvectors ** 2) @ np.exp(eigenvalues)).tolist()))
+
+        adjacency = adjacency.tocsc()
+        subgraph = np.empty(len(nodes))
+        for start in range(0, len(nodes), SOURCE_BLOCK_SIZE):
+            block = np.arange(start, min(start + SOURCE_BLOCK_SIZE, len(nodes)))
+            unit_vectors = np.zeros((len(nodes), len(block)))
+            unit_vectors[block, np.arange(len(block))] = 1.0
+            subgraph[block] = expm_multiply(adjacency, unit_vectors)[block, np.arange(len(block))]
+        return dict(zip(nodes, subgraph.tolist()))
+
+    def get_total_communicability(self) -> dict:
+        """
+        Total communicability exp(A) 1 of the undirected graph: how well every node communicates with
+        all others, from a sparse matrix exponential times vector product.
+        """
+        nodes, adjacency = self._get_adjacency(undirected=True)
+        communicability = expm_multiply(adjacency.tocsc(), np.ones(len(nodes)))
+        return dict(zip(nodes, np.atleast_1d(communicability).tolist()))
+
     def get_clustering_coefficient(self):
         return nx.clustering(self.graph)
 
@@ -100,6 +227,16 @@ class NetworkStatisticsAnalyzer:
     def get_transitivity(self):
         return nx.transitivity(self.graph)
 
+    def get_reciprocity(self):
+        return nx.reciprocity(self.graph)
+
+    def get_modularity(self, seed: int | None = None):
+        """
+        Modularity of the (directed, weighted) Louvain partition of the graph.
+        """
+        communities = nx.community.louvain_communities(self.graph, weight="weight", seed=seed)
+        return nx.community.modularity(self.graph, communities, weight="weight")
+
     def get_diameters_of_strongly_connected_components(self):
         strongly_connected_components = nx.strongly_connected_components(self.graph)
         component_to_diameter = {}
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+from algorithms.network_statistics import NetworkStatisticsAnalyzer
+from algorithms.worker_pool import map_with_shared_data, shared
+from model.constants import *
+
+# statistics that can be compared against the null model, by name
+NULL_MODEL_STATISTICS = {
+    "average_clustering": lambda analyzer, seed: analyzer.get_average_clustering(),
+    "transitivity": lambda analyzer, seed: analyzer.get_transitivity(),
+    "reciprocity": lambda analyzer, seed: analyzer.get_reciprocity(),
+    "modularity": lambda analyzer, seed: analyzer.get_modularity(seed=seed),
+    "strongly_connected_components_count": lambda analyzer, seed: analyzer.get_strongly_connected_components_count(),
+}
+
+
+def rewire_degree_preserving(sources: np.ndarray, targets: np.ndarray, weights: np.ndarray,
+                             rng: np.random.Generator, swaps_per_edge: int = 10):
+    """
+    Directed double edge swaps: (a -> b), (c -> d) become (a -> d), (c -> b).
+
+    Every node keeps its in- and out-degree, self-loops and duplicate edges are never created.
+    Weights travel with the source of their edge, so out-strengths are kept as well.
+    """
+    sources, targets = sources.copy(), targets.copy()
+    n_edges = len(sources)
+    if n_edges < 2:
+        return sources, targets, weights
+    edge_set = set(zip(sources.tolist(), targets.tolist()))
+
+    n_attempts = swaps_per_edge * n_edges
+    first = rng.integers(0, n_edges, size=n_attempts)
+    second = rng.integers(0, n_edges, size=n_attempts)
+    for i, j in zip(first.tolist(), second.tolist()):
+        a, b, c, d = sources[i], targets[i], sources[j], targets[j]
+        if a == d or c == b or (a, d) in edge_set or (c, b) in edge_set:
+            continue
+        edge_set.difference_update(((a, b), (c, d)))
+        edge_set.update(((a, d), (c, b)))
+        targets[i], targets[j] = d, b
+    return sources, targets, weights
+
+
+def _edges_to_data_frame(names: np.ndarray, sources: np.ndarray, targets: np.ndarray,
+                         weights: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame({COL_X: names[sources], COL_Y: names[targets], WEIGHT: weights})
+
+
+def _sample_statistics(seed_sequence: np.random.SeedSequence, statistics: list[str], swaps_per_edge: int) -> dict:
+    names, sources, targets, weights = shared("edges")
+    rng = np.random.default_rng(seed_sequence)
+    sample = _edges_to_data_frame(names, *rewire_degree_preserving(sources, targets, weights, rng, swaps_per_edge))
+    analyzer = NetworkStatisticsAnalyzer(sample)
+    statistic_seed = int(seed_sequence.generate_state(1)[0])
+    return {name: NULL_MODEL_STATISTICS[name](analyzer, statistic_seed) for name in statistics}
+
+
+def run_null_model_ensemble(data: pd.DataFrame, statistics: list[str] = None, n_samples: int = 100,
+                            swaps_per_edge: int = 10, seed: int = 42, n_jobs: int | None = None,
+                            return_samples: bool = False):
+    """
+    Compare statistics of a network with an ensemble of degree-preserving rewired networks.
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        DataFrame with columns ["x", "y", "weight"]
+    statistics : list[str]
+        Names from NULL_MODEL_STATISTICS, defaults to clustering, reciprocity and modularity
+    n_samples : int
+        Size of the ensemble
+    swaps_per_edge : int
+        Number of swap attempts per edge for every sample
+    seed : int
+        Every sample gets its own child of SeedSequence(seed), so the ensemble is the same for any n_jobs
+    n_jobs : int | None
+        Number of worker processes, None uses all cores and 1 runs in this process
+    return_samples : bool
+        Also return the statistic of every sample
+
+    Returns:
+    --------
+    summary : pd.DataFrame
+        One row per statistic with observed, null_mean, null_std, z_score and the two-sided empirical p_value
+    samples : pd.DataFrame
+        Only if return_samples, one row per sample
+    """
+    statistics = statistics or ["average_clustering", "transitivity", "reciprocity", "modularity"]
+    unknown = [name for name in statistics if name not in NULL_MODEL_STATISTICS]
+    if unknown:
+        raise ValueError(f"Unknown statistics {unknown}, choose from {list(NULL_MODEL_STATISTICS)}")
+
+    names, codes = np.unique(np.concatenate([data[COL_X].to_numpy(), data[COL_Y].to_numpy()]),
+                             return_inverse=True)
+    edges = (names, codes[:len(data)], codes[len(data):], data[WEIGHT].to_numpy())
+
+    seed_sequences = np.random.SeedSequence(seed).spawn(n_samples)
+    rows = map_with_shared_data(_sample_statistics, seed_sequences, [statistics] * n_samples,
+                                [swaps_per_edge] * n_samples, shared_data={"edges": edges}, n_jobs=n_jobs,
+                                chunksize=max(1, n_samples // 32))
+    samples = pd.DataFrame(rows, columns=statistics)
+
+    analyzer = NetworkStatisticsAnalyzer(data)
+    observed = pd.Series({name: NULL_MODEL_STATISTICS[name](analyzer, seed) for name in statistics})
+    null_mean = samples.mean()
+    null_std = samples.std(ddof=1)
+    deviations = (samples - null_mean).abs()
+    as_extreme = (deviations >= (observed - null_mean).abs()).sum()
+
+    summary = pd.DataFrame({
+        "observed": observed,
+        "null_mean": null_mean,
+        "null_std": null_std,
+        "z_score": (observed - null_mean) / null_std,
+        "p_value": (as_extreme + 1) / (n_samples + 1),
+    })
+    if return_samples:
+        return summary, samples
+    return summary
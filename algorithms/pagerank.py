@@ -0,0 +1,191 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.linalg import svds
+from scipy.stats import kendalltau
+
+from algorithms.network_statistics import build_graph
+
+
+def transition_matrix(graph: nx.DiGraph, nodes: list, weight: str | None = "weight"):
+    """
+    Row-stochastic transition matrix of the random walk over out-edges, and the mask of dangling nodes.
+
+    Edges without the weight attribute count as 1, weight=None ignores weights.
+    """
+    adjacency = nx.to_scipy_sparse_array(graph, nodelist=nodes, weight=weight, format="csr", dtype=float)
+    out_strength = np.asarray(adjacency.sum(axis=1)).ravel()
+    dangling = out_strength == 0
+    scale = np.divide(1.0, out_strength, out=np.zeros_like(out_strength), where=~dangling)
+    return sp.diags(scale) @ adjacency, dangling
+
+
+def batched_pagerank(transition, dangling: np.ndarray, personalization: np.ndarray, alpha=0.85,
+                     max_iter: int = 1000, tol: float = 1e-8) -> np.ndarray:
+    """
+    Power iteration for a block of PageRank vectors at once.
+
+    Every column of `personalization` (nodes x block) is its own teleport distribution, and as in networkx
+    the mass of dangling nodes is redistributed with it. `alpha` is a scalar or one damping factor per
+    column. One iteration is a single sparse x dense product for the whole block, columns stop changing
+    once they converged (L1 change below nodes * tol, the networkx criterion).
+
+    Returns
+    -------
+    scores : np.ndarray
+        (nodes x block), every column sums to 1
+    """
+    n_nodes, n_columns = personalization.shape
+    personalization = personalization / personalization.sum(axis=0, keepdims=True)
+    alpha = np.broadcast_to(np.asarray(alpha, dtype=float), (n_columns,))
+    transposed = transition.T.tocsr()
+    scores = np.full((n_nodes, n_columns), 1.0 / n_nodes)
+    active = np.arange(n_columns)
+    for _ in range(max_iter):
+        current = scores[:, active]
+        dangling_mass = current[dangling].sum(axis=0)
+        updated = alpha[active] * (transposed @ current) \
+            + (alpha[active] * dangling_mass + 1 - alpha[active]) * personalization[:, active]
+        change = np.abs(updated - current).sum(axis=0)
+        scores[:, active] = updated
+        active = active[change >= n_nodes * tol]
+        if len(active) == 0:
+            return scores
+    raise nx.PowerIterationFailedConvergence(max_iter)
+
+
+def run_personalized_pagerank(graph: nx.DiGraph, sources: list | None = None, alpha: float = 0.85,
+                              weight: str | None = "weight", top_k: int | None = None,
+                              min_score: float | None = None, block_size: int = 256,
+                              max_iter: int = 1000, tol: float = 1e-8):
+    """
+    Personalized PageRank from the point of view of every source character.
+
+    Row s is the stationary distribution of a random walk that always restarts at s, so it ranks the
+    characters by their relevance to s. Sources are processed in blocks of `block_size` columns.
+
+    Parameters:
+    -----------
+    graph : nx.DiGraph
+    sources : list | None
+        Characters to personalize on, defaults to every node
+    alpha : float
+        Damping factor
+    weight : str | None
+        Edge attribute used as transition weight, None for an unweighted walk
+    top_k : int | None
+        Only keep the k most relevant characters per source (the source itself included)
+    min_score : float | None
+        Drop scores below this value, the matrix is then returned sparse
+    block_size : int
+        Number of personalization vectors iterated together
+
+    Returns:
+    --------
+    relevance : pd.DataFrame
+        Without top_k: a (sources x nodes) matrix, sparse if min_score is set.
+        With top_k: one row per (source, rank) with columns source, rank, target, score
+    """
+    nodes = list(graph.nodes())
+    sources = nodes if sources is None else list(sources)
+    index = {n: i for i, n in enumerate(nodes)}
+    transition, dangling = transition_matrix(graph, nodes, weight=weight)
+
+    blocks = []
+    for start in range(0, len(sources), block_size):
+        block = sources[start:start + block_size]
+        personalization = np.zeros((len(nodes), len(block)))
+        personalization[[index[s] for s in block], np.arange(len(block))] = 1
+        blocks.append(batched_pagerank(transition, dangling, personalization, alpha, max_iter, tol).T)
+    scores = np.vstack(blocks) if blocks else np.zeros((0, len(nodes)))
+
+    if top_k is not None:
+        k = min(top_k, len(nodes))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k] if k else np.zeros((len(sources), 0), dtype=int)
+        top = np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+        return pd.DataFrame({
+            "source": np.repeat(sources, k),
+            "rank": np.tile(np.arange(1, k + 1), len(sources)),
+            "target": np.asarray(nodes, dtype=object)[top.ravel()],
+            "score": np.take_along_axis(scores, top, axis=1).ravel(),
+        })
+    if min_score is not None:
+        sparse_scores = sp.csr_matrix(np.where(scores >= min_score, scores, 0.0))
+        return pd.DataFrame.sparse.from_spmatrix(sparse_scores, index=sources, columns=nodes)
+    return pd.DataFrame(scores, index=sources, columns=nodes)
+
+
+def hits_scores(graph: nx.DiGraph, nodes: list, weight: str | None = "weight") -> tuple[np.ndarray, np.ndarray]:
+    """
+    HITS hubs and authorities from the leading singular vectors of the adjacency matrix, as networkx does.
+    """
+    adjacency = nx.to_scipy_sparse_array(graph, nodelist=nodes, weight=weight, format="csr", dtype=float)
+    if min(adjacency.shape) < 3 or adjacency.nnz == 0:
+        _, _, vt = np.linalg.svd(adjacency.toarray())
+    else:
+        _, _, vt = svds(adjacency, k=1)
+    authorities = vt[0].real
+    hubs = adjacency @ authorities
+    if hubs.sum() == 0:
+        return np.full(len(nodes), 1 / len(nodes)), np.full(len(nodes), 1 / len(nodes))
+    return hubs / hubs.sum(), authorities / authorities.sum()
+
+
+def run_ranking_sensitivity(graph: nx.DiGraph, alphas: list[float] = None, weight: str = "weight",
+                            max_iter: int = 1000, tol: float = 1e-8):
+    """
+    PageRank for many damping factors, weighted and unweighted, plus HITS, and how much their rankings agree.
+
+    All damping factors of one weighting are iterated as one block (see batched_pagerank), so the sweep
+    costs two batched power iterations instead of one full run per configuration.
+
+    Parameters:
+    -----------
+    graph : nx.DiGraph
+    alphas : list[float]
+        Damping factors, defaults to 0.5 .. 0.95
+    weight : str
+        Edge attribute of the weighted variants
+
+    Returns:
+    --------
+    scores : pd.DataFrame
+        nodes x configurations, e.g. "pagerank_weighted_0.85", "hits_hubs_unweighted"
+    kendall_tau : pd.DataFrame
+        Kendall rank correlation between every pair of configurations
+    """
+    alphas = alphas or [0.5, 0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95]
+    nodes = list(graph.nodes())
+    columns = {}
+    for weighting, edge_weight in [("weighted", weight), ("unweighted", None)]:
+        transition, dangling = transition_matrix(graph, nodes, weight=edge_weight)
+        uniform = np.ones((len(nodes), len(alphas)))
+        ranks = batched_pagerank(transition, dangling, uniform, alpha=np.asarray(alphas), max_iter=max_iter, tol=tol)
+        for alpha, column in zip(alphas, ranks.T):
+            columns[f"pagerank_{weighting}_{alpha:g}"] = column
+        hubs, authorities = hits_scores(graph, nodes, weight=edge_weight)
+        columns[f"hits_hubs_{weighting}"] = hubs
+        columns[f"hits_authorities_{weighting}"] = authorities
+    scores = pd.DataFrame(columns, index=nodes)
+
+    names = list(scores.columns)
+    kendall_tau = pd.DataFrame(np.eye(len(names)), index=names, columns=names)
+    for i, a in enumerate(names):
+        for b in names[i + 1:]:
+            kendall_tau.loc[a, b] = kendall_tau.loc[b, a] = kendalltau(scores[a], scores[b]).statistic
+    return scores, kendall_tau
+
+
+def analyze_personalized_pagerank(sections: list[pd.DataFrame], top_k: int = 10, alpha: float = 0.85,
+                                  use_weights: bool = True) -> pd.DataFrame:
+    """
+    Top-k personalized PageRank of every character in every section (sections are numbered from 1).
+    """
+    tables = []
+    for section, data in enumerate(sections, start=1):
+        graph = build_graph(data, use_weights=use_weights)
+        table = run_personalized_pagerank(graph, alpha=alpha, weight="weight" if use_weights else None, top_k=top_k)
+        table.insert(0, "section", section)
+        tables.append(table)
+    return pd.concat(tables, ignore_index=True)
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+from algorithms.worker_pool import map_with_shared_data, shared
+
+PARTITION_METRICS = ["ari", "nmi", "vi"]
+
+
+def encode_partitions(labelings: list, nodes: list | None = None) -> np.ndarray:
+    """
+    Integer-encode partitions over a shared node order.
+
+    Parameters:
+    -----------
+    labelings : list
+        Partitions as dicts (node -> community) or as arrays that already follow the node order
+    nodes : list | None
+        Node order for dict partitions, defaults to the nodes of the first partition
+
+    Returns:
+    --------
+    labels : np.ndarray
+        (partitions x nodes) matrix, every row numbers its communities 0 .. k-1
+    """
+    if nodes is None and labelings and isinstance(labelings[0], dict):
+        nodes = list(labelings[0])
+    rows = []
+    for labeling in labelings:
+        if isinstance(labeling, dict):
+            missing = [n for n in nodes if n not in labeling]
+            if missing:
+                raise KeyError(f"Labeling missing {len(missing)} nodes, e.g. {missing[:5]}")
+            labeling = [labeling[n] for n in nodes]
+        rows.append(pd.factorize(np.asarray(labeling))[0])
+    if len({len(row) for row in rows}) > 1:
+        raise ValueError("All partitions must label the same nodes")
+    return np.vstack(rows) if rows else np.empty((0, 0), dtype=int)
+
+
+def _entropy_terms(labels: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Per partition: sum of C(a_i, 2) and sum of a_i log a_i over its community sizes."""
+    pairs, x_log_x = [], []
+    for row in labels:
+        sizes = np.bincount(row).astype(float)
+        pairs.append((sizes * (sizes - 1) / 2).sum())
+        x_log_x.append((sizes * np.log(sizes)).sum())
+    return np.asarray(pairs), np.asarray(x_log_x)
+
+
+def _contingency_terms(labels: np.ndarray, i: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sum of C(n_ij, 2) and of n_ij log n_ij over the contingency table of partition i and every partition j >= i.
+
+    Only the non-empty cells are built: every node gets the key (j, label_i, label_j), and the counts of
+    the unique keys are the cells of all the sparse contingency tables at once.
+    """
+    others = labels[i:]
+    n_labels = int(labels.max()) + 1
+    cells = (np.arange(len(others))[:, None] * n_labels + labels[i][None, :]) * n_labels + others
+    if len(others) * n_labels * n_labels <= 16 * cells.size:
+        # few labels: count every possible cell directly, which is faster than sorting the keys
+        counts = np.bincount(cells.ravel(), minlength=len(others) * n_labels * n_labels)
+        keys = np.flatnonzero(counts)
+        counts = counts[keys]
+    else:
+        keys, counts = np.unique(cells, return_counts=True)
+    table = keys // (n_labels * n_labels)
+    counts = counts.astype(float)
+    pairs = np.bincount(table, weights=counts * (counts - 1) / 2, minlength=len(others))
+    x_log_x = np.bincount(table, weights=counts * np.log(counts), minlength=len(others))
+    return pairs, x_log_x
+
+
+def _shared_contingency_terms(i: int):
+    return _contingency_terms(shared("labels"), i)
+
+
+def compare_partitions(labelings, nodes: list | None = None, n_jobs: int | None = 1,
+                       parallel_threshold: int = 500) -> dict[str, pd.DataFrame]:
+    """
+    Adjusted Rand index, normalized mutual information and variation of information between all partitions.
+
+    The entropies and pair counts of every partition are computed once, and the contingency table of
+    every pair only through its non-empty cells, so hundreds of partitions can be compared at once.
+    NMI uses the arithmetic mean of the entropies (as sklearn), VI is in nats.
+
+    Parameters:
+    -----------
+    labelings : dict | list
+        Partitions (node -> community dicts or label arrays), a dict name -> partition names the rows
+    nodes : list | None
+        Shared node order, see encode_partitions
+    n_jobs : int | None
+        Number of worker processes for many partitions, None uses all cores and 1 runs in this process
+    parallel_threshold : int
+        Only use worker processes from this many partitions on
+
+    Returns:
+    --------
+    matrices : dict
+        "ari", "nmi" and "vi" -> symmetric (partitions x partitions) DataFrame
+    """
+    names = list(labelings) if isinstance(labelings, dict) else list(range(len(labelings)))
+    labels = encode_partitions(list(labelings.values()) if isinstance(labelings, dict) else list(labelings), nodes)
+    n_partitions, n_nodes = labels.shape
+    pairs, x_log_x = _entropy_terms(labels)
+
+    rows = range(n_partitions)
+    if n_jobs == 1 or n_partitions < parallel_threshold:
+        terms = [_contingency_terms(labels, i) for i in rows]
+    else:
+        terms = map_with_shared_data(_shared_contingency_terms, rows, shared_data={"labels": labels}, n_jobs=n_jobs,
+                                     chunksize=max(1, n_partitions // 64))
+
+    joint_pairs = np.zeros((n_partitions, n_partitions))
+    joint_x_log_x = np.zeros((n_partitions, n_partitions))
+    for i, (cell_pairs, cell_x_log_x) in enumerate(terms):
+        joint_pairs[i, i:] = joint_pairs[i:, i] = cell_pairs
+        joint_x_log_x[i, i:] = joint_x_log_x[i:, i] = cell_x_log_x
+
+    # ARI from pair counts: (index - expected) / (max - expected)
+    total_pairs = n_nodes * (n_nodes - 1) / 2
+    expected = np.outer(pairs, pairs) / total_pairs if total_pairs else np.zeros_like(joint_pairs)
+    maximum = (pairs[:, None] + pairs[None, :]) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ari = np.where(maximum == expected, 1.0, (joint_pairs - expected) / (maximum - expected))
+
+    # entropies from sum(x log x): H = log n - sum(a log a) / n, MI = H_i + H_j - H_ij
+    log_n = np.log(n_nodes) if n_nodes else 0.0
+    entropy = log_n - x_log_x / max(n_nodes, 1)
+    joint_entropy = log_n - joint_x_log_x / max(n_nodes, 1)
+    mutual_information = np.clip(entropy[:, None] + entropy[None, :] - joint_entropy, 0, None)
+    mean_entropy = (entropy[:, None] + entropy[None, :]) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        nmi = np.where(mean_entropy > 0, mutual_information / mean_entropy, 1.0)
+    vi = np.clip(2 * joint_entropy - entropy[:, None] - entropy[None, :], 0, None)
+
+    return {metric: pd.DataFrame(matrix, index=names, columns=names)
+            for metric, matrix in zip(PARTITION_METRICS, [ari, nmi, vi])}
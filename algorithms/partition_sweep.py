@@ -0,0 +1,136 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+from networkx.algorithms.community.quality import modularity
+
+from algorithms.graph_algorithms import run_partition_leiden, run_partition_louvain
+from algorithms.partition_comparison import compare_partitions
+from algorithms.worker_pool import map_with_shared_data, shared
+
+# community detection methods that can be swept, by name
+PARTITION_METHODS = {
+    "louvain": lambda graph, resolution, seed: run_partition_louvain(graph, resolution=resolution, random_state=seed),
+    "leiden": lambda graph, resolution, seed: run_partition_leiden(graph, resolution=resolution, random_state=seed),
+}
+
+def _run_partition(method: str, resolution: float, seed: int) -> np.ndarray:
+    graph = shared("graph")
+    _, labels = PARTITION_METHODS[method](graph, resolution, seed)
+    return np.asarray([labels[n] for n in graph.nodes()])
+
+
+def _labels_to_communities(nodes: list, labels: np.ndarray) -> list[set]:
+    communities = [set() for _ in range(labels.max() + 1)] if len(labels) else []
+    for n, cid in zip(nodes, labels):
+        communities[cid].add(n)
+    return communities
+
+
+def co_assignment_matrix(label_runs: np.ndarray) -> np.ndarray:
+    """
+    Fraction of the runs in which every pair of nodes ends up in the same community.
+
+    label_runs has one row of community labels per run, over the same node order.
+    """
+    n_runs, n_nodes = label_runs.shape
+    co_assignment = np.zeros((n_nodes, n_nodes))
+    for labels in label_runs:
+        one_hot = np.zeros((n_nodes, labels.max() + 1))
+        one_hot[np.arange(n_nodes), labels] = 1
+        co_assignment += one_hot @ one_hot.T
+    return co_assignment / n_runs
+
+
+def consensus_labels(label_runs: np.ndarray, threshold: float = 0.5) -> np.ndarray:
+    """
+    Consensus partition: nodes are together if they share a community in more than `threshold` of the runs.
+
+    The communities are the connected components of the thresholded co-assignment matrix,
+    numbered by their first node.
+    """
+    co_assignment = co_assignment_matrix(label_runs)
+    together = nx.from_numpy_array(co_assignment > threshold)
+    labels = np.empty(label_runs.shape[1], dtype=int)
+    components = sorted(nx.connected_components(together), key=min)
+    for cid, component in enumerate(components):
+        labels[list(component)] = cid
+    return labels
+
+
+def run_resolution_sweep(graph: nx.Graph, method: str = "louvain", resolutions: list[float] = None,
+                         n_seeds: int = 10, seed: int = 42, consensus_threshold: float = 0.5,
+                         n_jobs: int | None = None, return_runs: bool = False):
+    """
+    Run a community detection method over a grid of resolutions and seeds, in a process pool.
+
+    Parameters:
+    -----------
+    graph : nx.Graph
+        Undirected weighted graph, see build_undirected_weighted
+    method : str
+        Name from PARTITION_METHODS
+    resolutions : list[float]
+        Resolutions to sweep, defaults to 0.5 .. 10
+    n_seeds : int
+        Number of runs per resolution, every resolution uses the same seeds
+    seed : int
+        Seed from which the run seeds are generated, so the sweep is the same for any n_jobs
+    consensus_threshold : float
+        Minimum co-assignment fraction for two nodes to share a consensus community
+    n_jobs : int | None
+        Number of worker processes, None uses all cores and 1 runs in this process
+    return_runs : bool
+        Also return the modularity and number of communities of every single run
+
+    Returns:
+    --------
+    summary : pd.DataFrame
+        One row per resolution: mean and std modularity, mean/min/max number of communities,
+        mean and min adjusted Rand index between all pairs of runs, and the number of communities
+        and modularity of the consensus partition
+    consensus : dict
+        resolution -> (communities, labels) of the consensus partition
+    runs : pd.DataFrame
+        Only if return_runs, one row per (resolution, seed)
+    """
+    if method not in PARTITION_METHODS:
+        raise ValueError(f"Unknown method {method}, choose from {list(PARTITION_METHODS)}")
+    resolutions = resolutions or [0.5, 1, 2, 3, 5, 7.5, 10]
+    seeds = [int(s) for s in np.random.SeedSequence(seed).generate_state(n_seeds)]
+    tasks = [(resolution, run_seed) for resolution in resolutions for run_seed in seeds]
+
+    label_runs = map_with_shared_data(_run_partition, [method] * len(tasks), *zip(*tasks),
+                                      shared_data={"graph": graph}, n_jobs=n_jobs,
+                                      chunksize=max(1, len(tasks) // 32))
+
+    nodes = list(graph.nodes())
+    run_rows, summary_rows = [], []
+    consensus = {}
+    for i, resolution in enumerate(resolutions):
+        runs = np.vstack(label_runs[i * n_seeds:(i + 1) * n_seeds])
+        qualities = [modularity(graph, _labels_to_communities(nodes, labels), weight="weight") for labels in runs]
+        counts = runs.max(axis=1) + 1
+        run_rows += [{"resolution": resolution, "seed": s, "modularity": q, "n_communities": c}
+                     for s, q, c in zip(seeds, qualities, counts)]
+
+        aris = compare_partitions(list(runs))["ari"].to_numpy()[np.triu_indices(n_seeds, k=1)]
+        agreed = consensus_labels(runs, consensus_threshold)
+        communities = _labels_to_communities(nodes, agreed)
+        consensus[resolution] = (communities, {n: int(cid) for n, cid in zip(nodes, agreed)})
+        summary_rows.append({
+            "resolution": resolution,
+            "modularity_mean": np.mean(qualities),
+            "modularity_std": np.std(qualities, ddof=1) if n_seeds > 1 else 0.0,
+            "n_communities_mean": counts.mean(),
+            "n_communities_min": counts.min(),
+            "n_communities_max": counts.max(),
+            "ari_mean": aris.mean() if len(aris) else 1.0,
+            "ari_min": aris.min() if len(aris) else 1.0,
+            "consensus_n_communities": len(communities),
+            "consensus_modularity": modularity(graph, communities, weight="weight"),
+        })
+
+    summary = pd.DataFrame(summary_rows).set_index("resolution")
+    if return_runs:
+        return summary, consensus, pd.DataFrame(run_rows)
+    return summary, consensus
@@ -0,0 +1,146 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.linalg import eigh
+from scipy.sparse.linalg import eigsh
+from sklearn.cluster import KMeans
+
+from algorithms.graph_algorithms import build_undirected_weighted
+
+# graphs smaller than this are solved densely, ARPACK only pays off for bigger graphs
+DENSE_THRESHOLD = 100
+
+
+def laplacian_matrix(graph: nx.Graph, nodes: list, weight: str | None = "weight", normalized: bool = False):
+    """
+    Sparse Laplacian D - A, or the normalized Laplacian I - D^-1/2 A D^-1/2, of the undirected graph.
+    Self-loops are ignored, isolated nodes get a zero row.
+    """
+    adjacency = nx.to_scipy_sparse_array(graph, nodelist=nodes, weight=weight, format="csr", dtype=float)
+    adjacency = adjacency - sp.diags(adjacency.diagonal())
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    if not normalized:
+        return (sp.diags(degree) - adjacency).tocsc()
+    scale = np.divide(1.0, np.sqrt(degree), out=np.zeros_like(degree), where=degree > 0)
+    identity = sp.diags((degree > 0).astype(float))
+    return (identity - sp.diags(scale) @ adjacency @ sp.diags(scale)).tocsc()
+
+
+def _smallest_eigenpairs(laplacian, k: int, return_vectors: bool = False):
+    n_nodes = laplacian.shape[0]
+    k = min(k, n_nodes)
+    if n_nodes < DENSE_THRESHOLD or k >= n_nodes - 1:
+        values, vectors = eigh(laplacian.toarray(), subset_by_index=[0, k - 1])
+    else:
+        # shift-invert just below 0: the eigenvalues closest to the shift converge first
+        values, vectors = eigsh(laplacian, k=k, sigma=-1e-3, which="LM")
+        order = np.argsort(values)
+        values, vectors = values[order], vectors[:, order]
+    values = np.clip(values, 0, None)
+    return (values, vectors) if return_vectors else values
+
+
+def _largest_eigenvalues(laplacian, k: int) -> np.ndarray:
+    n_nodes = laplacian.shape[0]
+    k = min(k, n_nodes)
+    if n_nodes < DENSE_THRESHOLD or k >= n_nodes - 1:
+        values = eigh(laplacian.toarray(), eigvals_only=True, subset_by_index=[n_nodes - k, n_nodes - 1])
+    else:
+        values = eigsh(laplacian, k=k, which="LA", return_eigenvectors=False)
+    return np.sort(values)[::-1]
+
+
+def laplacian_spectrum(graph: nx.Graph, k: int = 6, normalized: bool = False,
+                       weight: str | None = "weight") -> tuple[np.ndarray, np.ndarray]:
+    """
+    The k smallest (ascending) and k largest (descending) eigenvalues of the (normalized) Laplacian.
+    """
+    if graph.number_of_nodes() == 0:
+        return np.empty(0), np.empty(0)
+    laplacian = laplacian_matrix(graph, list(graph.nodes()), weight=weight, normalized=normalized)
+    return _smallest_eigenpairs(laplacian, k), _largest_eigenvalues(laplacian, k)
+
+
+def spectral_embedding(graph: nx.Graph, dimensions: int = 2, weight: str | None = "weight") -> pd.DataFrame:
+    """
+    Spectral embedding from the eigenvectors of the normalized Laplacian with the smallest non-trivial
+    eigenvalues, scaled by D^-1/2 (the random walk eigenvectors of Shi and Malik).
+
+    Returns
+    -------
+    embedding : pd.DataFrame
+        One row per node, columns dim_1 .. dim_d
+    """
+    nodes = list(graph.nodes())
+    laplacian = laplacian_matrix(graph, nodes, weight=weight, normalized=True)
+    _, vectors = _smallest_eigenpairs(laplacian, dimensions + 1, return_vectors=True)
+    degree = np.asarray(nx.to_scipy_sparse_array(graph, nodelist=nodes, weight=weight).sum(axis=1)).ravel()
+    scale = np.divide(1.0, np.sqrt(degree), out=np.zeros_like(degree, dtype=float), where=degree > 0)
+    embedding = vectors[:, 1:dimensions + 1] * scale[:, None]
+    columns = [f"dim_{i}" for i in range(1, embedding.shape[1] + 1)]
+    return pd.DataFrame(embedding, index=nodes, columns=columns)
+
+
+def run_spectral_clustering(graph: nx.Graph, n_clusters: int, weight: str | None = "weight",
+                            random_state: int | None = 42):
+    """
+    k-means on the spectral embedding with n_clusters - 1 dimensions.
+
+    Returns
+    -------
+    communities : list[set], labels : dict
+    """
+    embedding = spectral_embedding(graph, dimensions=max(1, n_clusters - 1), weight=weight)
+    k_means = KMeans(n_clusters=n_clusters, n_init=10, random_state=random_state)
+    cluster_labels = k_means.fit_predict(embedding.to_numpy())
+    labels = dict(zip(embedding.index, cluster_labels.tolist()))
+    communities = [set() for _ in range(n_clusters)]
+    for n, cid in labels.items():
+        communities[cid].add(n)
+    return communities, labels
+
+
+def get_spectral_statistics(graph: nx.Graph, k: int = 6, weight: str | None = "weight") -> dict:
+    """
+    Connectivity and robustness signals from the Laplacian spectra of one graph.
+
+    algebraic_connectivity is the second smallest Laplacian eigenvalue (0 for a disconnected graph),
+    it is also given for the largest connected component. spectral_gap is the second smallest eigenvalue
+    of the normalized Laplacian, one minus the second largest eigenvalue of the random walk:
+    the larger, the faster a random walk mixes.
+    """
+    statistics = {"n_nodes": graph.number_of_nodes(), "n_edges": graph.number_of_edges()}
+    if graph.number_of_nodes() < 2:
+        return statistics
+
+    smallest, largest = laplacian_spectrum(graph, k=k, weight=weight)
+    normalized_smallest, normalized_largest = laplacian_spectrum(graph, k=k, normalized=True, weight=weight)
+    largest_component = graph.subgraph(max(nx.connected_components(graph), key=len))
+    component_smallest = laplacian_spectrum(largest_component, k=2, weight=weight)[0] \
+        if largest_component.number_of_nodes() > 1 else np.zeros(1)
+
+    statistics.update({
+        "n_components": nx.number_connected_components(graph),
+        "algebraic_connectivity": smallest[1],
+        "algebraic_connectivity_largest_component": component_smallest[-1],
+        "spectral_gap": normalized_smallest[1],
+        "largest_laplacian_eigenvalue": largest[0],
+        "largest_normalized_laplacian_eigenvalue": normalized_largest[0],
+    })
+    for i, value in enumerate(smallest, start=1):
+        statistics[f"laplacian_smallest_{i}"] = value
+    for i, value in enumerate(normalized_smallest, start=1):
+        statistics[f"normalized_laplacian_smallest_{i}"] = value
+    return statistics
+
+
+def analyze_spectra(sections: list[pd.DataFrame], k: int = 6, weight: str | None = "weight") -> pd.DataFrame:
+    """
+    Spectral statistics of every section graph (sections are numbered from 1), one row per section.
+    """
+    rows = []
+    for section, data in enumerate(sections, start=1):
+        statistics = get_spectral_statistics(build_undirected_weighted(data), k=k, weight=weight)
+        rows.append({"section": section, **statistics})
+    return pd.DataFrame(rows).set_index("section")
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+from algorithms.graph_algorithms import build_undirected_weighted, run_partition_leiden
+
+
+def run_temporal_leiden(sections: list[pd.DataFrame], resolution: float = 1.0, seed: int | None = 42,
+                        warm_start: bool = True) -> list[tuple[list[set], dict]]:
+    """
+    Leiden on every section (episode or book) in order.
+
+    With warm_start, every run starts from the membership of the previous section, so characters keep
+    their community unless the new section gives a reason to move them, and runs converge faster.
+    Characters that were not in the previous section start as singletons.
+
+    Returns
+    -------
+    list of (communities, labels), one per section
+    """
+    partitions = []
+    previous_labels = None
+    for data in sections:
+        graph = build_undirected_weighted(data)
+        communities, labels = run_partition_leiden(
+            graph, resolution=resolution, random_state=seed,
+            initial_membership=previous_labels if warm_start else None,
+        )
+        partitions.append((communities, labels))
+        previous_labels = labels
+    return partitions
+
+
+def jaccard_matrix(previous: list[set], current: list[set]) -> np.ndarray:
+    """
+    Jaccard overlap |A ∩ B| / |A ∪ B| between every previous (rows) and current (columns) community.
+    """
+    nodes = {n: i for i, n in enumerate(set().union(*previous, *current))}
+
+    def incidence(communities):
+        matrix = np.zeros((len(nodes), len(communities)))
+        for cid, community in enumerate(communities):
+            matrix[[nodes[n] for n in community], cid] = 1
+        return matrix
+
+    a, b = incidence(previous), incidence(current)
+    intersection = a.T @ b
+    union = a.sum(axis=0)[:, None] + b.sum(axis=0)[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+def track_community_lifecycles(partitions: list[list[set]], threshold: float = 0.3):
+    """
+    Match communities of consecutive sections by Jaccard overlap and follow them as dynamic communities.
+
+    Communities of consecutive sections match if their Jaccard overlap is at least `threshold`.
+    Matches are claimed in order of decreasing overlap: a community continues the dynamic community
+    of its best unclaimed match, otherwise a new dynamic community starts.
+
+    Events per section (sections are numbered from 1):
+        birth     a community without a match in the previous section
+        death     a community without a match in the next section
+        merge     several previous communities match one current community
+        split     one previous community matches several current communities
+        continue  a one-to-one match
+
+    Returns
+    -------
+    events : pd.DataFrame
+        Columns section, event, before, after (tuples of dynamic community ids) and jaccard,
+        the highest overlap involved (below the threshold for births and deaths)
+    dynamic_labels : list[dict]
+        Per section, node -> dynamic community id
+    """
+    events = []
+    dynamic_labels = []
+    previous, previous_ids = [], []
+    next_id = 0
+    for section, communities in enumerate(partitions, start=1):
+        overlap = jaccard_matrix(previous, communities) if previous and communities \
+            else np.zeros((len(previous), len(communities)))
+        matches = overlap >= threshold
+
+        ids = [None] * len(communities)
+        claimed = set()
+        for p, c in sorted(zip(*np.nonzero(matches)), key=lambda pair: -overlap[pair]):
+            if ids[c] is None and p not in claimed:
+                ids[c] = previous_ids[p]
+                claimed.add(p)
+        for c in range(len(communities)):
+            if ids[c] is None:
+                ids[c], next_id = next_id, next_id + 1
+
+        for c in range(len(communities)):
+            predecessors = np.flatnonzero(matches[:, c])
+            if len(predecessors) == 0:
+                events.append((section, "birth", (), (ids[c],), overlap[:, c].max(initial=0.0)))
+            elif len(predecessors) > 1:
+                events.append((section, "merge", tuple(previous_ids[p] for p in predecessors), (ids[c],),
+                               overlap[predecessors, c].max()))
+        for p in range(len(previous)):
+            successors = np.flatnonzero(matches[p])
+            if len(successors) == 0:
+                events.append((section, "death", (previous_ids[p],), (), overlap[p].max(initial=0.0)))
+            elif len(successors) > 1:
+                events.append((section, "split", (previous_ids[p],), tuple(ids[c] for c in successors),
+                               overlap[p, successors].max()))
+            elif matches[:, successors[0]].sum() == 1:
+                c = successors[0]
+                events.append((section, "continue", (previous_ids[p],), (ids[c],), overlap[p, c]))
+
+        dynamic_labels.append({n: ids[c] for c, community in enumerate(communities) for n in community})
+        previous, previous_ids = communities, ids
+
+    events = pd.DataFrame(events, columns=["section", "event", "before", "after", "jaccard"])
+    return events, dynamic_labels
+
+
+def analyze_temporal_communities(sections: list[pd.DataFrame], resolution: float = 1.0, seed: int | None = 42,
+                                 threshold: float = 0.3):
+    """
+    Warm-started Leiden per section followed by lifecycle tracking.
+
+    Returns
+    -------
+    events : pd.DataFrame
+        See track_community_lifecycles
+    memberships : pd.DataFrame
+        One row per (section, character) with its community in the section and its dynamic community
+    """
+    partitions = run_temporal_leiden(sections, resolution=resolution, seed=seed)
+    events, dynamic_labels = track_community_lifecycles([communities for communities, _ in partitions], threshold)
+    memberships = pd.DataFrame([
+        (section, n, labels[n], dynamic[n])
+        for section, ((_, labels), dynamic) in enumerate(zip(partitions, dynamic_labels), start=1)
+        for n in labels
+    ], columns=["section", "character", "community", "dynamic_community"])
+    return events, memberships
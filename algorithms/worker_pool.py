@@ -0,0 +1,51 @@
+from concurrent.futures import ProcessPoolExecutor
+
+# data of the running map_with_shared_data, by name, set once per worker process by _set_shared
+_shared = {}
+
+
+def _set_shared(data: dict):
+    _shared.update(data)
+
+
+def shared(name: str):
+    """Data passed to map_with_shared_data as shared_data[name], for the tasks it runs."""
+    return _shared[name]
+
+
+def map_with_shared_data(function, *iterables, shared_data: dict, n_jobs: int | None = None,
+                         chunksize: int = 1) -> list:
+    """
+    list(map(function, *iterables)) in a process pool, with data every task needs sent once per worker.
+
+    Large inputs (a graph, an edge array, a label matrix) are given as shared_data and read by the tasks with
+    shared(name), so they are not pickled for every task.
+
+    Parameters:
+    -----------
+    function : Callable
+        A module-level function, so it can be pickled
+    *iterables
+        Arguments of the tasks, as for map
+    shared_data : dict
+        name -> data available to every task through shared(name)
+    n_jobs : int | None
+        Number of worker processes, None uses all cores and 1 runs in this process
+    chunksize : int
+        Tasks sent to a worker at once
+
+    Returns:
+    --------
+    results : list
+        The result of every task, in order
+    """
+    if n_jobs == 1:
+        previous = dict(_shared)
+        _shared.update(shared_data)
+        try:
+            return list(map(function, *iterables))
+        finally:
+            _shared.clear()
+            _shared.update(previous)
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_set_shared, initargs=(shared_data,)) as executor:
+        return list(executor.map(function, *iterables, chunksize=chunksize))
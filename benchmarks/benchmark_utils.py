@@ -0,0 +1,62 @@
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+import pandas as pd
+
+RESULTS_DIR = "results/benchmarks"
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_run_metadata(**extra) -> dict:
+    """
+    Metadata stored next to the results, so runs on different machines or commits can be told apart.
+    """
+    metadata = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+    metadata.update(extra)
+    return metadata
+
+
+def save_results(results: dict, benchmark_name: str, path: str = None) -> str:
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(RESULTS_DIR, f"{benchmark_name}_{stamp}.json")
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2)
+    return path
+
+
+def load_results(path: str, key: list[str], value: str) -> pd.Series:
+    with open(path) as file:
+        frame = pd.DataFrame(json.load(file)["results"])
+    return frame[frame["status"] == "ok"].set_index(key)[value]
+
+
+def compare_results(baseline_path: str, current_path: str, key: list[str], value: str,
+                    higher_is_better: bool = False) -> pd.DataFrame:
+    """
+    Compare two result files, a speedup > 1 means the current run is faster than the baseline.
+    """
+    baseline = load_results(baseline_path, key, value)
+    current = load_results(current_path, key, value)
+    comparison = pd.concat([baseline, current], axis=1, keys=["baseline", "current"]).dropna()
+    if higher_is_better:
+        comparison["speedup"] = comparison["current"] / comparison["baseline"]
+    else:
+        comparison["speedup"] = comparison["baseline"] / comparison["current"]
+    return comparison
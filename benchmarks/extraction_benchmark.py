@@ -0,0 +1,121 @@
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from benchmarks.benchmark_utils import compare_results, get_run_metadata, save_results
+from benchmarks.synthetic_scripts import SyntheticScript, generate_script
+from model.create_datasets import x_mentions_y_row_generator, x_mentions_y_with_sentiment, x_speaks_before_y
+from model.utils.utils import get_valid_names
+
+DEFAULT_LINE_COUNTS = [1_000, 10_000, 100_000]
+
+
+@dataclass
+class ExtractionBenchmark:
+    """
+    A single extraction step, `run` gets the synthetic script and its valid names.
+    Scripts with more than `max_lines` lines are skipped.
+    """
+    name: str
+    run: Callable
+    max_lines: int | None = None
+
+
+def _consume_mentions(synthetic: SyntheticScript, valid_names: tuple[list, dict]):
+    for _ in x_mentions_y_row_generator(synthetic.script, valid_names, synthetic.double_character_names_map):
+        pass
+
+
+EXTRACTION_BENCHMARKS = [
+    ExtractionBenchmark(
+        name="x_mentions_y_row_generator",
+        run=_consume_mentions,
+    ),
+    ExtractionBenchmark(
+        name="x_speaks_before_y",
+        run=lambda synthetic, valid_names: x_speaks_before_y(synthetic.script,
+                                                             synthetic.double_character_names_map),
+    ),
+    ExtractionBenchmark(
+        name="x_mentions_y_with_sentiment",
+        run=lambda synthetic, valid_names: x_mentions_y_with_sentiment(synthetic.script, valid_names,
+                                                                       synthetic.double_character_names_map),
+        max_lines=10_000,
+    ),
+]
+
+
+def run_extraction_benchmarks(line_counts: list[int] = None, names: list[str] = None, cast_size: int = 185,
+                              alias_density: float = 1.2, multi_speaker_share: float = 0.005, seed: int = 42,
+                              ignore_limits: bool = False) -> dict:
+    """
+    Measure the throughput (lines/second) of the dataset extraction on synthetic scripts of several sizes.
+
+    Parameters:
+    -----------
+    line_counts : list[int]
+        Number of lines of the synthetic scripts
+    names : list[str]
+        Only run the benchmarks with these names, runs all of them if None
+    cast_size, alias_density, multi_speaker_share : see generate_script
+    seed : int
+        Seed for the synthetic scripts, use the same seed to compare runs
+    ignore_limits : bool
+        Also run benchmarks on scripts longer than their `max_lines`
+
+    Returns:
+    --------
+    results : dict
+        {"metadata": {...}, "results": [{"benchmark", "lines", "status", "seconds", "lines_per_second"}, ...]}
+    """
+    line_counts = line_counts or DEFAULT_LINE_COUNTS
+    benchmarks = [b for b in EXTRACTION_BENCHMARKS if names is None or b.name in names]
+
+    rows = []
+    for n_lines in line_counts:
+        synthetic = generate_script(n_lines, cast_size=cast_size, alias_density=alias_density,
+                                    multi_speaker_share=multi_speaker_share, seed=seed)
+        valid_names = get_valid_names(synthetic.characters, synthetic.alias_map)
+        for benchmark in benchmarks:
+            row = {"benchmark": benchmark.name, "lines": n_lines, "valid_names": len(valid_names[0])}
+            if not ignore_limits and benchmark.max_lines is not None and n_lines > benchmark.max_lines:
+                row.update(status="skipped", seconds=None, lines_per_second=None)
+            else:
+                start = time.perf_counter()
+                benchmark.run(synthetic, valid_names)
+                seconds = time.perf_counter() - start
+                row.update(status="ok", seconds=seconds, lines_per_second=n_lines / seconds)
+            throughput = "" if row["seconds"] is None else f"{row['lines_per_second']:.0f} lines/s"
+            print(f"{benchmark.name:>28} lines={n_lines:<7} {row['status']:>8} {throughput}")
+            rows.append(row)
+
+    metadata = get_run_metadata(seed=seed, cast_size=cast_size, alias_density=alias_density,
+                                multi_speaker_share=multi_speaker_share)
+    return {"metadata": metadata, "results": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dataset extraction on synthetic scripts.")
+    parser.add_argument("--lines", type=int, nargs="+", default=DEFAULT_LINE_COUNTS)
+    parser.add_argument("--only", nargs="+", default=None, help="names of the benchmarks to run")
+    parser.add_argument("--cast-size", type=int, default=185)
+    parser.add_argument("--alias-density", type=float, default=1.2)
+    parser.add_argument("--multi-speaker-share", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--ignore-limits", action="store_true")
+    parser.add_argument("--output", default=None, help="path of the JSON result file")
+    parser.add_argument("--compare", default=None, help="baseline JSON result file to compare against")
+    args = parser.parse_args()
+
+    results = run_extraction_benchmarks(args.lines, args.only, args.cast_size, args.alias_density,
+                                        args.multi_speaker_share, args.seed, args.ignore_limits)
+    path = save_results(results, "extraction", args.output)
+    print(f"Saved benchmark results to {path}")
+    if args.compare:
+        print(compare_results(args.compare, path, key=["benchmark", "lines"], value="lines_per_second",
+                              higher_is_better=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import networkx as nx
+import pandas as pd
+
+from algorithms.egocentric_networks import _extract_ego_network
+from algorithms.graph_algorithms import *
+from algorithms.network_statistics import NetworkStatisticsAnalyzer, build_graph
+from benchmarks.benchmark_utils import compare_results, get_run_metadata, save_results
+from benchmarks.synthetic_networks import generate_characters, generate_mention_network
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+
+
+@dataclass
+class Benchmark:
+    """
+    A single timed operation.
+
+    `setup` turns the synthetic (data, characters) pair into the arguments of `run`, it is not timed.
+    Graphs bigger than `max_nodes` are skipped, because the algorithm would not finish in reasonable time.
+    """
+    name: str
+    setup: Callable
+    run: Callable
+    max_nodes: int | None = None
+
+
+def _hub(graph: nx.DiGraph):
+    return max(graph.degree, key=lambda item: item[1])[0]
+
+
+def _setup_bridges(data: pd.DataFrame, characters: pd.DataFrame):
+    graph = build_graph(data)
+    return graph, graph.to_undirected(reciprocal=True)
+
+
+BENCHMARKS = [
+    Benchmark(
+        name="get_centrality_scores",
+        setup=lambda data, characters: (NetworkStatisticsAnalyzer(data),),
+        run=lambda analyzer: analyzer.get_centrality_scores(),
+        max_nodes=1_000,
+    ),
+    Benchmark(
+        name="run_bridges",
+        setup=_setup_bridges,
+        run=run_bridges,
+        max_nodes=1_000,
+    ),
+    Benchmark(
+        name="run_cliques",
+        setup=lambda data, characters: (build_graph(data).to_undirected(reciprocal=True),),
+        run=run_cliques,
+        max_nodes=10_000,
+    ),
+    Benchmark(
+        name="run_cliques_maximum",
+        setup=lambda data, characters: (build_graph(data).to_undirected(reciprocal=True), "maximum"),
+        run=run_cliques,
+    ),
+    Benchmark(
+        name="run_homophily",
+        setup=lambda data, characters: (build_graph_with_attributes(data, characters), "origin", 100),
+        run=run_homophily,
+        max_nodes=10_000,
+    ),
+    Benchmark(
+        name="run_partition_girvan",
+        setup=lambda data, characters: (build_undirected_weighted(data),),
+        # without the dendrogram cache, otherwise every repeat after the first only times a lookup
+        run=lambda graph: run_partition_girvan(graph, use_cache=False),
+        max_nodes=100,
+    ),
+    Benchmark(
+        name="run_partition_louvain",
+        setup=lambda data, characters: (build_undirected_weighted(data), 1.0, 42),
+        run=run_partition_louvain,
+    ),
+    Benchmark(
+        name="run_partition_leiden",
+        setup=lambda data, characters: (build_undirected_weighted(data), 1.0, -1, 42),
+        run=run_partition_leiden,
+    ),
+    Benchmark(
+        name="_extract_ego_network",
+        setup=lambda data, characters: (data, _hub(build_graph(data)), 1, 1.5),
+        run=_extract_ego_network,
+    ),
+]
+
+
+def _time_benchmark(benchmark: Benchmark, data: pd.DataFrame, characters: pd.DataFrame, repeats: int) -> list[float]:
+    timings = []
+    for _ in range(repeats):
+        # setup again on every repeat, some algorithms mutate their input graph
+        args = benchmark.setup(data, characters)
+        start = time.perf_counter()
+        benchmark.run(*args)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_benchmarks(sizes: list[int] = None, names: list[str] = None, repeats: int = 3, seed: int = 42,
+                   ignore_limits: bool = False) -> dict:
+    """
+    Time every benchmark on a synthetic mention network of every size.
+
+    Parameters:
+    -----------
+    sizes : list[int]
+        Number of nodes of the synthetic networks, defaults to 10^2 .. 10^5
+    names : list[str]
+        Only run the benchmarks with these names, runs all of them if None
+    repeats : int
+        How many times each benchmark is timed, the minimum is reported as `seconds`
+    seed : int
+        Seed for the synthetic networks, use the same seed to compare runs
+    ignore_limits : bool
+        Also run benchmarks on networks bigger than their `max_nodes`
+
+    Returns:
+    --------
+    results : dict
+        {"metadata": {...}, "results": [{"benchmark", "n_nodes", "n_edges", "status", "seconds", "timings"}, ...]}
+    """
+    sizes = sizes or DEFAULT_SIZES
+    benchmarks = [b for b in BENCHMARKS if names is None or b.name in names]
+
+    rows = []
+    for size in sizes:
+        data = generate_mention_network(size, seed=seed)
+        characters = generate_characters(data, seed=seed)
+        n_nodes = len(pd.unique(pd.concat([data["x"], data["y"]])))
+        n_edges = len(data)
+        for benchmark in benchmarks:
+            row = {"benchmark": benchmark.name, "size": size, "n_nodes": n_nodes, "n_edges": n_edges}
+            if not ignore_limits and benchmark.max_nodes is not None and size > benchmark.max_nodes:
+                row.update(status="skipped", seconds=None, timings=[])
+            else:
+                timings = _time_benchmark(benchmark, data, characters, repeats)
+                row.update(status="ok", seconds=min(timings), timings=timings)
+            seconds = "" if row["seconds"] is None else f"{row['seconds']:.4f}s"
+            print(f"{benchmark.name:>24} n={size:<7} {row['status']:>8} {seconds}")
+            rows.append(row)
+
+    metadata = get_run_metadata(networkx=nx.__version__, seed=seed, repeats=repeats)
+    return {"metadata": metadata, "results": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark graph algorithms on synthetic mention networks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--only", nargs="+", default=None, help="names of the benchmarks to run")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--ignore-limits", action="store_true")
+    parser.add_argument("--output", default=None, help="path of the JSON result file")
+    parser.add_argument("--compare", default=None, help="baseline JSON result file to compare against")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.only, args.repeats, args.seed, args.ignore_limits)
+    path = save_results(results, "graph_algorithms", args.output)
+    print(f"Saved benchmark results to {path}")
+    if args.compare:
+        print(compare_results(args.compare, path, key=["benchmark", "size"], value="seconds"))
+
+
+if __name__ == "__main__":
+    main()
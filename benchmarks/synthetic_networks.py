@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+from model.constants import *
+
+GENDERS = ["male", "female"]
+BENDINGS = [None, "fire", "earth", "water", "air"]
+ORIGINS = ["earth kingdom", "fire nation", "water tribe", "air nomads", "spirit world"]
+
+# roughly the category frequencies in characters.csv
+GENDER_WEIGHTS = [0.74, 0.26]
+BENDING_WEIGHTS = [0.66, 0.15, 0.09, 0.05, 0.05]
+ORIGIN_WEIGHTS = [0.45, 0.38, 0.10, 0.05, 0.02]
+
+
+def _heavy_tailed_fitness(rng: np.random.Generator, n_nodes: int, exponent: float) -> np.ndarray:
+    """
+    Pareto distributed node fitness, gives a power-law degree sequence with the given exponent.
+    """
+    fitness = rng.pareto(exponent - 1, size=n_nodes) + 1
+    return fitness / fitness.sum()
+
+
+def generate_mention_network(n_nodes: int, mean_degree: float = 3.75, reciprocity: float = 0.33,
+                             exponent: float = 2.1, seed: int | None = None) -> pd.DataFrame:
+    """
+    Generate a directed weighted network shaped like our x_mentions_y networks.
+
+    Sources and targets are drawn from heavy-tailed fitness distributions (a directed Chung-Lu model),
+    then a fraction of the edges gets a reverse edge so the network has reciprocal mentions.
+    The defaults are measured on x_mentions_y.csv (159 nodes, 595 edges, reciprocity 0.33).
+
+    Parameters:
+    -----------
+    n_nodes : int
+        Number of characters in the network
+    mean_degree : float
+        Average out-degree of a character
+    reciprocity : float
+        Fraction of edges that are part of a reciprocal pair
+    exponent : float
+        Power-law exponent of the degree distribution
+    seed : int | None
+        Seed for the random generator
+
+    Returns:
+    --------
+    data : pd.DataFrame
+        DataFrame with columns ["x", "y", "weight"], the same format as get_x_mentions_y()
+    """
+    rng = np.random.default_rng(seed)
+    out_fitness = _heavy_tailed_fitness(rng, n_nodes, exponent)
+    in_fitness = _heavy_tailed_fitness(rng, n_nodes, exponent)
+
+    # a reciprocal pair adds two edges, so draw fewer one-way edges to end up near mean_degree
+    n_edges = int(n_nodes * mean_degree / (1 + reciprocity / (2 - reciprocity)))
+    sources = rng.choice(n_nodes, size=n_edges, p=out_fitness)
+    targets = rng.choice(n_nodes, size=n_edges, p=in_fitness)
+    edges = np.unique(np.stack([sources, targets], axis=1), axis=0)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+
+    # add reverse edges, so that about `reciprocity` of all edges are reciprocated
+    reverse_share = reciprocity / (2 - reciprocity)
+    reversed_edges = edges[rng.random(len(edges)) < reverse_share][:, ::-1]
+    edges = np.unique(np.concatenate([edges, reversed_edges]), axis=0)
+
+    # mention counts are heavy tailed as well: most pairs are mentioned once or twice
+    weights = rng.zipf(2.2, size=len(edges))
+
+    names = np.array([f"character_{i}" for i in range(n_nodes)])
+    return pd.DataFrame({
+        COL_X: names[edges[:, 0]],
+        COL_Y: names[edges[:, 1]],
+        WEIGHT: weights,
+    })
+
+
+def generate_characters(data: pd.DataFrame, seed: int | None = None) -> pd.DataFrame:
+    """
+    Generate a characters table for every character in `data`, in the format of get_characters().
+    """
+    rng = np.random.default_rng(seed)
+    names = pd.unique(pd.concat([data[COL_X], data[COL_Y]]))
+    n_names = len(names)
+    return pd.DataFrame({
+        COL_NAME: names,
+        COL_GENDER: rng.choice(GENDERS, size=n_names, p=GENDER_WEIGHTS),
+        COL_BENDING: rng.choice(np.array(BENDINGS, dtype=object), size=n_names, p=BENDING_WEIGHTS),
+        COL_ORIGIN: rng.choice(ORIGINS, size=n_names, p=ORIGIN_WEIGHTS),
+    })
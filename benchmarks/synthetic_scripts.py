@@ -0,0 +1,152 @@
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from model.constants import *
+
+SYLLABLES = [
+    "ka", "ta", "ra", "zu", "ko", "so", "ph", "ai", "ro", "ku", "mi", "ng", "ha", "ru", "yu",
+    "ji", "ne", "lo", "to", "pa", "sh", "ki", "an", "ba", "do", "fe", "ga", "hi", "ma", "ty",
+]
+TITLES = ["master", "captain", "general", "lady", "prince", "princess", "uncle", "sifu", "great", "little"]
+FILLER_WORDS = [
+    "the", "we", "have", "to", "go", "now", "where", "is", "you", "what", "I", "can't", "believe",
+    "this", "water", "fire", "earth", "air", "ship", "village", "tribe", "spirit", "hurry", "look",
+    "out", "it's", "not", "over", "yet", "come", "on", "let's", "find", "them", "never", "again",
+]
+STAGE_DIRECTIONS = ["Angrily.", "Smiling.", "Turns away.", "Points ahead.", "Whispering.", "Looks at"]
+
+
+@dataclass
+class SyntheticScript:
+    """
+    A generated script plus everything the extraction needs to recognize its cast.
+    """
+    script: pd.DataFrame
+    characters: pd.DataFrame
+    alias_map: dict[str, str]
+    double_character_names_map: dict[str, list[str]]
+
+
+def _make_names(rng: np.random.Generator, count: int, taken: set[str]) -> list[str]:
+    names = []
+    while len(names) < count:
+        name = "".join(rng.choice(SYLLABLES, size=rng.integers(2, 4)))
+        if name not in taken:
+            taken.add(name)
+            names.append(name)
+    return names
+
+
+def _make_line(rng: np.random.Generator, mentioned: list[str], n_words: int) -> str:
+    words = list(rng.choice(FILLER_WORDS, size=n_words))
+    for name in mentioned:
+        words.insert(rng.integers(0, len(words) + 1), name.title())
+    line = " ".join(words)
+    line = line[0].upper() + line[1:] + "."
+    # stage directions are removed before names are matched, but still cost time to parse
+    if rng.random() < 0.3:
+        line = f"[{rng.choice(STAGE_DIRECTIONS)}] {line}"
+    return line
+
+
+def generate_script(n_lines: int, cast_size: int = 185, alias_density: float = 1.2,
+                    multi_speaker_share: float = 0.005, narration_share: float = 0.2,
+                    mentions_per_line: float = 0.5, n_books: int = 3, n_episodes: int = 61,
+                    seed: int | None = None) -> SyntheticScript:
+    """
+    Generate a script in the format of ATLA-episodes-scripts.csv.
+
+    Parameters:
+    -----------
+    n_lines : int
+        Number of lines in the script (ATLA has about 13k)
+    cast_size : int
+        Number of characters
+    alias_density : float
+        Average number of aliases per character, mentions use an alias as often as the official name
+    multi_speaker_share : float
+        Fraction of the spoken lines that are spoken by two characters ("Katara and Sokka")
+    narration_share : float
+        Fraction of the lines without a speaker
+    mentions_per_line : float
+        Average number of characters mentioned in a line
+    n_books, n_episodes : int
+        The lines are spread evenly over the episodes, and the episodes evenly over the books
+    seed : int | None
+        Seed for the random generator
+
+    Returns:
+    --------
+    SyntheticScript
+        The script, a characters table and the alias and double name maps of the generated cast
+    """
+    rng = np.random.default_rng(seed)
+    taken = set()
+    names = _make_names(rng, cast_size, taken)
+
+    alias_map = {}
+    official_aliases = {name: [name] for name in names}
+    for name, n_aliases in zip(names, rng.poisson(alias_density, size=cast_size)):
+        for _ in range(n_aliases):
+            if rng.random() < 0.5:
+                alias = f"{rng.choice(TITLES)} {name}"
+            else:
+                alias = _make_names(rng, 1, taken)[0]
+            if alias not in alias_map:
+                alias_map[alias] = name.title()
+                official_aliases[name].append(alias)
+
+    # a few main characters speak and get mentioned most of the lines
+    popularity = 1 / np.arange(1, cast_size + 1)
+    popularity /= popularity.sum()
+
+    n_doubles = max(1, cast_size // 20)
+    double_character_names_map = {}
+    for first, second in rng.choice(cast_size, size=(n_doubles, 2), p=popularity):
+        if first != second:
+            pair = [names[first].title(), names[second].title()]
+            double_character_names_map[" and ".join(pair)] = pair
+    double_speakers = list(double_character_names_map)
+
+    speakers = rng.choice(cast_size, size=n_lines, p=popularity)
+    mention_counts = rng.poisson(mentions_per_line, size=n_lines)
+    is_narration = rng.random(n_lines) < narration_share
+    is_double = rng.random(n_lines) < multi_speaker_share
+    episodes = np.arange(n_lines) * n_episodes // n_lines + 1
+    episodes_per_book = -(-n_episodes // n_books)
+
+    rows = []
+    for i in range(n_lines):
+        mentioned_ids = rng.choice(cast_size, size=mention_counts[i], p=popularity)
+        mentioned = [rng.choice(official_aliases[names[m]]) for m in mentioned_ids]
+        line = _make_line(rng, mentioned, n_words=int(rng.integers(4, 25)))
+        if is_narration[i]:
+            character = None
+        elif is_double[i] and double_speakers:
+            character = double_speakers[rng.integers(len(double_speakers))]
+        else:
+            character = names[speakers[i]].title()
+        episode = int(episodes[i])
+        book = (episode - 1) // episodes_per_book + 1
+        rows.append([character, line, episode - (book - 1) * episodes_per_book, book, episode])
+
+    script = pd.DataFrame(rows, columns=[COL_CHARACTER, COL_SCRIPT, COL_EPISODE_NUMBER, COL_BOOK,
+                                         COL_TOTAL_EPISODE_NUMBER])
+    characters = pd.DataFrame({COL_NAME: names})
+    return SyntheticScript(script, characters, alias_map, double_character_names_map)
+
+
+def write_script(synthetic: SyntheticScript, directory: str) -> str:
+    """
+    Write the script, characters table and aliases as CSVs, returns the path of the script.
+    """
+    os.makedirs(directory, exist_ok=True)
+    script_path = os.path.join(directory, "synthetic-episodes-scripts.csv")
+    synthetic.script.to_csv(script_path, index=False)
+    synthetic.characters.to_csv(os.path.join(directory, "characters.csv"), index=False)
+    aliases = pd.DataFrame(list(synthetic.alias_map.items()), columns=["alias", COL_NAME])
+    aliases.to_csv(os.path.join(directory, "aliases.csv"), index=False)
+    return script_path
@@ -1,12 +1,23 @@
 from algorithms.character_analysis import *
 from algorithms.egocentric_networks import *
+from algorithms.ego_metrics import analyze_ego_metrics
+from algorithms.ego_timeline import run_ego_timeline
 from algorithms.graph_algorithms import *
 from algorithms.network_statistics import NetworkStatisticsAnalyzer
+from algorithms.null_models import run_null_model_ensemble
+from algorithms.pagerank import analyze_personalized_pagerank, run_ranking_sensitivity
+from algorithms.partition_sweep import run_resolution_sweep
+from algorithms.spectral_analysis import analyze_spectra
+from algorithms.temporal_communities import analyze_temporal_communities
 from model.read_data import *
 from view.degree_distribution import plot_degree_distribution
 from view.visualize_graphs import *
 from view.visualize_sentiment import *
 from view.partition_histograms import *
+from view.render_pool import FigureSpec, render_figures, rerender_figures
+from view.render_quality import QUALITY_PROFILES, get_render_quality, save_figure, set_render_quality
+from view.layout_cache import stable_layouts
+import argparse
 import os
 
 def compute_network_statistics():
@@ -27,8 +38,8 @@ def compute_network_statistics():
     
     in_degree, _ = plot_degree_distribution(in_degree_distribution, title="In-Degree Distribution", xlabel="In-Degree")
     out_degree, _ = plot_degree_distribution(out_degree_distribution, title="Out-Degree Distribution", xlabel="Out-Degree")
-    in_degree.savefig("results/degree/in_degree_distribution.png")
-    out_degree.savefig("results/degree/out_degree_distribution.png")
+    save_figure(in_degree, "results/degree/in_degree_distribution.png", vector=True)
+    save_figure(out_degree, "results/degree/out_degree_distribution.png", vector=True)
     
     print(
         f"""
@@ -44,6 +55,27 @@ def compute_network_statistics():
         """
     )
 
+def compare_books_with_null_models():
+    """Compare clustering, reciprocity and modularity of every book with degree-preserving rewired networks."""
+    results_dir = "results/null_models"
+    os.makedirs(results_dir, exist_ok=True)
+    n_samples = 500
+    for book_number, book_data in enumerate(get_x_mentions_y_per_book(), start=1):
+        summary = run_null_model_ensemble(book_data, n_samples=n_samples)
+        summary.to_csv(os.path.join(results_dir, f"null_model_book_{book_number}.csv"))
+        print(f"\nBook {book_number} compared with {n_samples} rewired networks:")
+        print(summary)
+
+def analyze_spectra_per_section():
+    """Laplacian spectra, algebraic connectivity and spectral gap of every book and episode."""
+    results_dir = "results/spectral"
+    os.makedirs(results_dir, exist_ok=True)
+    for section_type, sections in [("books", get_x_mentions_y_per_book()), ("episodes", get_x_mentions_y_per_episode())]:
+        spectra = analyze_spectra(sections)
+        spectra.to_csv(os.path.join(results_dir, f"spectra_{section_type}.csv"))
+        print(f"\nSpectral statistics per {section_type[:-1]}:")
+        print(spectra[["n_components", "algebraic_connectivity_largest_component", "spectral_gap"]].describe())
+
 def visualize_graphs():
     characters = get_characters()
 
@@ -66,11 +98,26 @@ def visualize_graphs():
     analyze_hits(data, "x_mentions_y")
     analyze_pagerank(data, " x_mentions_y")
 
+def visualize_graphs_per_book():
+    """Draw the mention network of every book with stable layouts, so characters keep their place across books."""
+    characters = get_characters()
+    sections = get_x_mentions_y_per_book()
+    filters = dict(min_weight=3, min_degree=1, directed=True)
+    layouts = stable_layouts([build_layout_graph(book_data, **filters) for book_data in sections],
+                             algorithm="kamada_kawai")
+    specs = [FigureSpec(visualize_all_layouts, f"results/layouts/x_mentions_y_book_{book_number}.png",
+                        path_argument="save_path",
+                        kwargs=dict(df=book_data, characters=characters, color_by="origin", positions=positions,
+                                    show_labels=True, label_top_k=20, title=f"Book {book_number}: "
+                                    f"{BOOK_NAMES[book_number]}", **filters))
+             for book_number, (book_data, positions) in enumerate(zip(sections, layouts), start=1)]
+    render_figures(specs, cache_name="layouts_per_book")
+
 def run_cliques_homophily_bridges_analysis():
     data = get_x_mentions_y()
     character_data = get_characters()
     # cliques:
-    n_biggest, all_cliques = analyze_cliques(data, "x_mentions_y")
+    n_biggest, biggest_cliques = analyze_cliques(data, "x_mentions_y")
     print("""
     ======================================================================
     Homophily, Cliques and Bridges
@@ -79,9 +126,8 @@ def run_cliques_homophily_bridges_analysis():
     print("Size of biggest cliques:")
     print(n_biggest)
     print("Biggest cliques:")
-    for x in all_cliques:
-        if len(x) == n_biggest:
-            print(x)
+    for x in biggest_cliques:
+        print(x)
     # homophily:
     results_gender, results_bending, results_origin = analyze_homophily(data, character_data, "x_mentions_y")
     print("Homophily Gender:")
@@ -98,6 +144,9 @@ def run_cliques_homophily_bridges_analysis():
     print(sorted(strong_articulation))
     print("Weak briges:")
     print(weak_bridges)
+    strong_bridges = analyze_strong_bridges(data)
+    print("Strong bridges:")
+    print(strong_bridges)
 
 def visualize_sentiment():
     data = get_x_speaks_to_y_sentiment()
@@ -112,13 +161,35 @@ def partition_graph():
     print("clustering coefficients of largest community per partition algorithm")
     print(coefficients_largest_communities)
     graph = build_undirected_weighted(data)
+    specs = [FigureSpec(visualize_partition, f"results/partitioning/graph_{alg_name}_tuned.png",
+                        kwargs=dict(G=graph, labels=label, min_comm_size=4, show_labels=True))
+             for alg_name, label in labels.items()]
+    specs += [FigureSpec(plot_community_size_hist, f"results/partitioning/{alg_name}_tuned.png",
+                         kwargs=dict(communities=community), vector=True)
+              for alg_name, community in communities.items()]
+    render_figures(specs, cache_name="partitions")
+
+
+def sweep_partition_resolutions():
+    """Sweep Louvain and Leiden over resolutions and seeds, to find resolutions that give stable partitions."""
+    graph = build_undirected_weighted(get_x_mentions_y())
     os.makedirs("results/partitioning", exist_ok=True)
-    for alg_name, label in labels.items():
-        fig, _ = visualize_partition(graph, labels=label, min_comm_size=4, show_labels=True)
-        fig.savefig(f"results/partitioning/graph_{alg_name}_tuned.png")
-    for alg_name, community in communities.items():
-        fig, ax = plot_community_size_hist(community)
-        fig.savefig(f"results/partitioning/{alg_name}_tuned")
+    for method in ["louvain", "leiden"]:
+        summary, consensus = run_resolution_sweep(graph, method=method, n_seeds=20)
+        summary.to_csv(f"results/partitioning/resolution_sweep_{method}.csv")
+        print(f"\n{method} resolution sweep:")
+        print(summary)
+
+
+def track_communities_over_time():
+    """Follow Leiden communities from episode to episode and from book to book."""
+    os.makedirs("results/partitioning", exist_ok=True)
+    for section_type, sections in [("episodes", get_x_mentions_y_per_episode()), ("books", get_x_mentions_y_per_book())]:
+        events, memberships = analyze_temporal_communities(sections)
+        events.to_csv(f"results/partitioning/community_lifecycles_{section_type}.csv", index=False)
+        memberships.to_csv(f"results/partitioning/community_memberships_{section_type}.csv", index=False)
+        print(f"\nCommunity events across {section_type}:")
+        print(events["event"].value_counts())
 
 
 def analyze_ego_networks():
@@ -128,12 +199,52 @@ def analyze_ego_networks():
         "katara",
         "sokka",
     ]
+    # the books are indexed once, every ego network is extracted once for its statistics and figure
+    indexes = [EgoIndex(book_data) for book_data in get_x_mentions_y_per_book()]
+    specs = []
     for ego in egos:
         min_weight = 10
-        analyze_character_ego_network_per_book(ego, degree=1.0)
-        analyze_character_ego_network_per_book(ego, degree=1.5)
-        visualize_character_ego_networks_per_book(ego, min_weight=min_weight, degree=1.0, save=True)
-        visualize_character_ego_networks_per_book(ego, min_weight=min_weight, degree=1.5, save=True)
+        analyze_character_ego_networks_per_book(ego, min_weight=min_weight, degrees=[1.0, 1.5], save=True,
+                                                indexes=indexes, specs=specs)
+    render_figures(specs, cache_name="ego_networks")
+
+
+def rank_ego_networks():
+    """Ego network metrics of every character, per book and per episode."""
+    results_dir = "results/ego"
+    os.makedirs(results_dir, exist_ok=True)
+    for section_type, sections in [("book", get_x_mentions_y_per_book()), ("episode", get_x_mentions_y_per_episode())]:
+        metrics = analyze_ego_metrics(sections, section_type=section_type)
+        metrics.to_csv(os.path.join(results_dir, f"ego_metrics_{section_type}s.csv"), index=False)
+
+    print("Ego network metrics completed for all books and episodes")
+
+
+def track_ego_networks_over_episodes():
+    """Ego networks of the main characters episode by episode and over a sliding window of 5 episodes."""
+    results_dir = "results/ego"
+    os.makedirs(results_dir, exist_ok=True)
+    episodes = get_x_mentions_y_per_episode()
+    specs = []
+    for ego in ["aang", "zuko", "katara", "sokka"]:
+        for window, label in [(1, "episode"), (5, "5 episode window")]:
+            metrics, partner_weights = run_ego_timeline(episodes, ego, window=window)
+            suffix = f"{ego}_window_{window}"
+            metrics.to_csv(os.path.join(results_dir, f"ego_timeline_{suffix}.csv"))
+            partner_weights.to_csv(os.path.join(results_dir, f"ego_partners_timeline_{suffix}.csv"))
+
+            size_plotter = MetricsProgressionPlotter(metrics_name=f"{ego} ego network size", section_type=label,
+                                                     folder_name="ego")
+            size_plotter.add_data_frame(metrics[["ego_size", "in_degree", "out_degree"]].fillna(0))
+            specs.append(size_plotter.figure_spec())
+
+            partner_plotter = MetricsProgressionPlotter(metrics_name=f"{ego} mentions with partners",
+                                                        section_type=label, folder_name="ego", top_n=3)
+            partner_plotter.add_data_frame(partner_weights)
+            specs.append(partner_plotter.figure_spec())
+    render_figures(specs, cache_name="ego_timelines")
+
+    print("Ego network timelines completed for all episodes")
 
 
 def analyze_hits_per_book():
@@ -204,22 +315,72 @@ def analyze_pagerank_per_book():
     print("PageRank analysis completed for all books")
 
 
-def main():
+def analyze_personalized_pagerank_per_section():
+    """Top 10 most relevant characters from the point of view of every character, per book and per episode."""
+    results_dir = "results/pagerank"
+    os.makedirs(results_dir, exist_ok=True)
+    for section_type, sections in [("books", get_x_mentions_y_per_book()), ("episodes", get_x_mentions_y_per_episode())]:
+        relevance = analyze_personalized_pagerank(sections, top_k=10)
+        relevance.to_csv(os.path.join(results_dir, f"personalized_pagerank_{section_type}.csv"), index=False)
+
+    print("Personalized PageRank analysis completed for all books and episodes")
+
+
+def analyze_ranking_sensitivity():
+    """Compare PageRank rankings for different damping factors and weightings, and with HITS."""
+    results_dir = "results/pagerank"
+    os.makedirs(results_dir, exist_ok=True)
+    sections = [("all_books", get_x_mentions_y())]
+    sections += [(f"book_{book_num}", data) for book_num, data in enumerate(get_x_mentions_y_per_book(), start=1)]
+    for section_name, data in sections:
+        scores, kendall_tau = run_ranking_sensitivity(build_graph(data, use_weights=True))
+        scores.to_csv(os.path.join(results_dir, f"ranking_sensitivity_scores_{section_name}.csv"))
+        kendall_tau.to_csv(os.path.join(results_dir, f"ranking_sensitivity_kendall_tau_{section_name}.csv"))
+
+    print("Ranking sensitivity analysis completed for all books")
+
+
+def render_figures_for_print():
+    """Render the figures of the last run again at print quality, from their cached data."""
+    for cache_name in ["partitions", "layouts_per_book", "ego_networks", "ego_timelines", "centralities_per_book",
+                       "centralities_per_episode", "clustering_per_book", "clustering_per_episode"]:
+        rerender_figures(cache_name, quality="print")
+
+
+def main(render_quality: str | None = None, vector_format: str | None = None):
+    if render_quality is not None or vector_format is not None:
+        set_render_quality(render_quality or get_render_quality(), vector_format=vector_format)
     compute_network_statistics()
+    compare_books_with_null_models()
+    analyze_spectra_per_section()
     partition_graph()
+    sweep_partition_resolutions()
+    track_communities_over_time()
     run_cliques_homophily_bridges_analysis()
     # visualize_graphs()
+    visualize_graphs_per_book()
     analyze_hits_per_book()
     analyze_pagerank_per_book()
+    analyze_personalized_pagerank_per_section()
+    analyze_ranking_sensitivity()
     analyze_ego_networks()
+    rank_ego_networks()
+    track_ego_networks_over_episodes()
     analyze_clustering_full_script()
     analyze_clustering_per_book()
     analyze_clustering_per_episode()
     analyze_full_script_centralities()
     analyze_each_book_centralities()
     analyze_each_episode_centralities()
+    # render_figures_for_print()
 
     return
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Run all analyses and write their results to results/.")
+    parser.add_argument("--render-quality", choices=list(QUALITY_PROFILES), default=None,
+                        help="Figure quality profile (default: the RENDER_QUALITY environment variable or standard)")
+    parser.add_argument("--vector-format", choices=["svg", "pdf"], default=None,
+                        help="Write line plots, histograms and tables as vector files in this format")
+    args = parser.parse_args()
+    main(render_quality=args.render_quality, vector_format=args.vector_format)
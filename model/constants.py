@@ -1,6 +1,7 @@
 # ATLA-episodes-script.csv
 COL_CHARACTER = "Character"
 COL_SCRIPT = "script"
+COL_EPISODE_NUMBER = "ep_number"
 COL_TOTAL_EPISODE_NUMBER = "total_number"
 COL_BOOK = "Book"
 
@@ -2,7 +2,7 @@ from algorithms.sentiment_analysis import *
 from model.entities.x_mentions_y_row_data import XMentionsYRowData
 from model.utils.dataset_utils import *
 from model.utils.utils import *
-from read_data import *
+from model.read_data import *
 
 SENTIMENT_COLUMNS = [
     COL_X,
@@ -15,12 +15,14 @@ SENTIMENT_COLUMNS = [
     COL_SCRIPT
 ]
 
-def x_speaks_before_y():
+def x_speaks_before_y(script: pd.DataFrame = None, double_names: dict = None):
     """
     Simple connection where a character x spoke their line before character y
     Gives a rough "x speaks to y" relationship network, but will have false edges
+    By default the ATLA script is used, pass `script` and `double_names` to run on another script
     """
-    script = get_script()
+    script = get_script() if script is None else script
+    double_names = double_character_names_map if double_names is None else double_names
     previous_character = None
     x_speaks_to_y = []  # we will add edges to this list
     for index, row in script.iterrows():
@@ -36,9 +38,8 @@ def x_speaks_before_y():
             continue
         # Sometimes there are characters in the script called "Sokka and Katara" in this case we awant to
         # split these names and add an edge for "Sokka" and an edge for "Katara"
-        x = double_character_names_map[character] if character in double_character_names_map else [character]
-        y = double_character_names_map[previous_character] if previous_character in double_character_names_map else [
-            previous_character]
+        x = double_names[character] if character in double_names else [character]
+        y = double_names[previous_character] if previous_character in double_names else [previous_character]
         for i in x:
             for j in y:
                 i = i.lower()
@@ -48,14 +49,18 @@ def x_speaks_before_y():
         previous_character = character
     return pd.DataFrame(x_speaks_to_y, columns=[COL_X, COL_Y])
 
-def x_mentions_y_row_generator():
+def x_mentions_y_row_generator(script: pd.DataFrame = None, valid_names: tuple[list, dict] = None,
+                               double_names: dict = None):
     """
     x mentions y in a line, uses the official character names as well as many aliases as I could find specified
     in the alias map
+    By default the ATLA script is used, pass `script`, `valid_names` (see get_valid_names) and `double_names`
+    to run on another script
     """
-    script = get_script()
+    script = get_script() if script is None else script
+    double_names = double_character_names_map if double_names is None else double_names
     # we retrieve all possible names in name_set and a dict to get their official name_map
-    name_set, name_map = get_valid_names()
+    name_set, name_map = get_valid_names() if valid_names is None else valid_names
     # iterate over all lines in the script
     for index, row in script.iterrows():
         speakers = row[COL_CHARACTER]
@@ -66,7 +71,7 @@ def x_mentions_y_row_generator():
         # get the character(s) that is speaking, ignoring the narrator
         if pd.isna(speakers):
             continue
-        speakers = double_character_names_map[speakers] if speakers in double_character_names_map else [speakers]
+        speakers = double_names[speakers] if speakers in double_names else [speakers]
         # get the character(s) mentioned in the line
         addressed_characters_saved = []
         for character_addressed in name_set:
@@ -89,9 +94,10 @@ def x_mentions_y():
     x_mentions_y_data_frame = pd.DataFrame(x_mentions_y_rows, columns=[COL_X, COL_Y])
     return x_mentions_y_data_frame
 
-def x_mentions_y_with_sentiment():
+def x_mentions_y_with_sentiment(script: pd.DataFrame = None, valid_names: tuple[list, dict] = None,
+                                double_names: dict = None):
     x_mentions_y_with_sentiment_rows = []
-    row_generator = x_mentions_y_row_generator()
+    row_generator = x_mentions_y_row_generator(script, valid_names, double_names)
     for row in row_generator:
         sentiment = get_sentiment(row.full_line)
         x_mentions_y_with_sentiment_rows.append([
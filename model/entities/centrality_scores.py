@@ -6,9 +6,19 @@ class CentralityScores:
             eigenvector: dict,
             closeness: dict,
             betweenness: dict,
+            katz: dict = None,
+            harmonic: dict = None,
+            pagerank: dict = None,
+            subgraph: dict = None,
+            communicability: dict = None,
     ):
         self.in_degree = in_degree
         self.out_degree = out_degree
         self.eigenvector = eigenvector
         self.closeness = closeness
         self.betweenness = betweenness
+        self.katz = katz if katz is not None else {}
+        self.harmonic = harmonic if harmonic is not None else {}
+        self.pagerank = pagerank if pagerank is not None else {}
+        self.subgraph = subgraph if subgraph is not None else {}
+        self.communicability = communicability if communicability is not None else {}
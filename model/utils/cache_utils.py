@@ -0,0 +1,42 @@
+import hashlib
+import os
+
+import networkx as nx
+
+# Base path of the on-disk caches (relative to model/utils/)
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "results", "cache")
+
+
+def graph_fingerprint(graph: nx.Graph, weight: str | None = "weight") -> str:
+    """
+    Content hash of a graph: its nodes, edges and edge weights, independent of insertion order.
+
+    Two graphs with the same fingerprint give the same results for every deterministic algorithm,
+    so the fingerprint can be used as a cache key.
+    """
+    directed = graph.is_directed()
+    edges = []
+    for u, v, d in graph.edges(data=True):
+        u, v = repr(u), repr(v)
+        if not directed and v < u:
+            u, v = v, u
+        w = d.get(weight, 1) if weight else 1
+        edges.append(f"{u}\t{v}\t{w!r}")
+
+    digest = hashlib.sha256()
+    digest.update(b"directed" if directed else b"undirected")
+    for node in sorted(repr(n) for n in graph.nodes()):
+        digest.update(node.encode() + b"\n")
+    digest.update(b"--\n")
+    for edge in sorted(edges):
+        digest.update(edge.encode() + b"\n")
+    return digest.hexdigest()
+
+
+def cache_path(namespace: str, key: str, extension: str) -> str:
+    """
+    Path of a cache entry, the namespace directory is created if needed.
+    """
+    directory = os.path.join(CACHE_DIR, namespace)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{key}.{extension}")
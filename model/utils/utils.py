@@ -22,16 +22,19 @@ def get_line_without_square_brackets(full_line: str):
     return re.sub(r"\[.*?\]", "", full_line)
 
 
-def get_valid_names():
+def get_valid_names(characters: pd.DataFrame = None, aliases: dict = None):
     """
+    :param characters: table with a name column, defaults to characters.csv
+    :param aliases: dict that maps aliases to official character names, defaults to alias_map
     :return:
     name_set : set
         set of all character names that might appear in the script, including aliases
     name_map : dict
         dict that maps all character names in name_set to their official character names
     """
-    official_character_names = get_characters()[COL_NAME]
-    name_map = alias_map.copy()
+    characters = get_characters() if characters is None else characters
+    official_character_names = characters[COL_NAME]
+    name_map = (alias_map if aliases is None else aliases).copy()
     for official_character_name in official_character_names:
         official_character_name = official_character_name.lower()
         name_map[official_character_name] = official_character_name
@@ -0,0 +1,34 @@
+import networkx as nx
+import pandas as pd
+import pytest
+
+from algorithms.ego_metrics import run_ego_metrics
+from model.read_data import get_x_mentions_y_per_book
+
+
+def test_effective_size_of_small_network():
+    # mutual weights a-b 3, a-c 1, b-c 1: e(a) = 2 - p_ac m_bc - p_ab m_cb = 2 - 1/4 * 1/3 - 3/4 * 1
+    data = pd.DataFrame({"x": ["a", "b", "a", "b", "c"], "y": ["b", "a", "c", "c", "c"],
+                         "weight": [2, 1, 1, 1, 5]})
+    metrics = run_ego_metrics(data).set_index("character")
+
+    assert metrics.loc["a", "effective_size"] == pytest.approx(7 / 6)
+    assert metrics.loc["a", "constraint"] == pytest.approx((3 / 4 + 1 / 4 * 1 / 2) ** 2 + (1 / 4 + 3 / 4 * 1 / 4) ** 2)
+
+
+@pytest.mark.parametrize("book", [0, 1, 2])
+def test_burt_measures_match_networkx_per_node_definition(book):
+    data = get_x_mentions_y_per_book()[book]
+    metrics = run_ego_metrics(data).set_index("character")
+    graph = nx.DiGraph()
+    graph.add_nodes_from(pd.concat([data["x"], data["y"]]))
+    graph.add_weighted_edges_from((x, y, w) for x, y, w in zip(data["x"], data["y"], data["weight"]) if x != y)
+
+    effective_size = nx.effective_size(graph, nodes=list(graph), weight="weight")
+    constraint = nx.constraint(graph, weight="weight")
+    for node in graph:
+        assert metrics.loc[node, "constraint"] == pytest.approx(constraint[node], nan_ok=True)
+        # networkx only looks at successors to find nodes without ties, and gives characters that are only
+        # mentioned an effective size of nan
+        if graph.out_degree(node):
+            assert metrics.loc[node, "effective_size"] == pytest.approx(effective_size[node], nan_ok=True)
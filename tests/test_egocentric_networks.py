@@ -0,0 +1,38 @@
+import pandas as pd
+
+from algorithms.ego_index import EgoIndex
+from algorithms.egocentric_networks import _analyze_ego_network_stats, analyze_character_ego_networks_per_book
+
+
+def _reciprocal_lines(output: str) -> list[str]:
+    return [line.strip() for line in output.split("Reciprocal relationships")[1].splitlines() if line.startswith("    ")]
+
+
+def test_reciprocal_relationships_list_the_self_mention(capsys):
+    data = pd.DataFrame({"x": ["aang", "aang", "katara", "aang", "sokka"],
+                         "y": ["aang", "katara", "aang", "sokka", "katara"],
+                         "weight": [3, 4, 1, 2, 5]})
+    index = EgoIndex(data)
+    ego_data = index.ego_network("aang", radius=1, degree=1.5)[0]
+
+    _analyze_ego_network_stats("aang", ego_data, "Book 1", dyads=index.dyads)
+    shared = _reciprocal_lines(capsys.readouterr().out)
+    _analyze_ego_network_stats("aang", ego_data, "Book 1")
+    per_ego = _reciprocal_lines(capsys.readouterr().out)
+
+    # sokka never mentions aang, the self-mention counts as both out and in
+    assert shared == ["aang: 6 (out: 3, in: 3)", "katara: 5 (out: 4, in: 1)"]
+    assert per_ego == shared
+
+
+def test_no_figure_specs_for_ego_networks_without_edges_to_draw(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    index = EgoIndex(pd.DataFrame({"x": ["aang", "katara"], "y": ["katara", "sokka"], "weight": [1, 5]}))
+    specs = []
+
+    analyze_character_ego_networks_per_book("aang", min_weight=3, indexes=[index], specs=specs)
+    analyze_character_ego_networks_per_book("toph", indexes=[index], specs=specs)
+    analyze_character_ego_networks_per_book("sokka", min_weight=3, indexes=[index], specs=specs)
+
+    # only sokka's networks have an edge of weight 3 or more
+    assert [spec.kwargs["ego_character"] for spec in specs] == ["sokka", "sokka"]
@@ -0,0 +1,24 @@
+import networkx as nx
+import pytest
+from networkx.algorithms.community.quality import modularity
+
+from algorithms.girvan_newman import girvan_newman_levels
+from algorithms.graph_algorithms import build_undirected_weighted
+from model.read_data import get_x_mentions_y_per_book
+
+
+@pytest.fixture(scope="module")
+def book_graphs() -> list[nx.Graph]:
+    return [build_undirected_weighted(book) for book in get_x_mentions_y_per_book()]
+
+
+@pytest.mark.parametrize("book", [0, 1, 2])
+def test_levels_match_networkx(book_graphs, book):
+    graph = book_graphs[book]
+    levels = list(girvan_newman_levels(graph))
+    expected = list(nx.community.girvan_newman(graph))
+
+    assert len(levels) == len(expected)
+    for level, ((communities, q), expected_communities) in enumerate(zip(levels, expected)):
+        assert communities == list(expected_communities), f"level {level}"
+        assert q == pytest.approx(modularity(graph, expected_communities, weight="weight"))
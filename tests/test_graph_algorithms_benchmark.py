@@ -0,0 +1,26 @@
+import os
+
+import algorithms.girvan_newman as girvan_newman
+import model.utils.cache_utils as cache_utils
+from benchmarks.graph_algorithms_benchmark import run_benchmarks
+
+
+def test_girvan_newman_benchmark_does_not_use_the_dendrogram_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_utils, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(girvan_newman, "_dendrograms", {})
+    computed = []
+    from_graph = girvan_newman.GirvanNewmanDendrogram.from_graph
+
+    def counted_from_graph(cls, graph, weight="weight"):
+        computed.append(graph)
+        return from_graph(graph, weight=weight)
+
+    monkeypatch.setattr(girvan_newman.GirvanNewmanDendrogram, "from_graph", classmethod(counted_from_graph))
+
+    results = run_benchmarks(sizes=[100], names=["run_partition_girvan"], repeats=2)
+
+    assert [row["status"] for row in results["results"]] == ["ok"]
+    # every repeat computes the dendrogram, and none is kept in memory or on disk
+    assert len(computed) == 2
+    assert not girvan_newman._dendrograms
+    assert not os.listdir(tmp_path)
@@ -0,0 +1,30 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from algorithms.graph_algorithms import build_graph_with_attributes, run_homophily
+from model.read_data import get_characters, get_x_mentions_y
+
+
+def test_missing_attributes_are_not_the_same_attribute():
+    graph = nx.DiGraph([("a", "b"), ("c", "d"), ("a", "c"), ("b", "e")])
+    nx.set_node_attributes(graph, {"a": "fire", "b": "fire", "c": np.nan, "d": np.nan, "e": "water"}, "origin")
+
+    result = run_homophily(graph, "origin")
+
+    # only a -> b has the same origin, c -> d joins two missing values
+    assert result["edgewise_homophily"] == pytest.approx(1 / 4)
+    assert result["E_minus_I_index"] == pytest.approx((3 - 1) / 4)
+    # missing values still have their own row and column in the mixing matrix
+    assert len(result["categories"]) == 3
+    assert np.asarray(result["mixing_matrix"]).sum() == 4
+
+
+def test_edgewise_homophily_of_gender():
+    graph = build_graph_with_attributes(get_x_mentions_y(), get_characters())
+    same = sum(graph.nodes[u]["gender"] == graph.nodes[v]["gender"] for u, v in graph.edges())
+
+    result = run_homophily(graph, "gender")
+
+    assert result["edgewise_homophily"] == pytest.approx(same / graph.number_of_edges())
+    assert result["edgewise_homophily"] == pytest.approx(0.6319327731092437)
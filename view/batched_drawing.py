@@ -0,0 +1,198 @@
+import matplotlib.colors as mcolors
+import numpy as np
+from matplotlib.collections import LineCollection, PathCollection, PolyCollection
+from matplotlib.font_manager import FontProperties
+from matplotlib.path import Path
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import IdentityTransform
+
+# points of a curved edge, enough for a smooth arc at poster size
+CURVE_SAMPLES = 16
+
+
+def _per_item(value, items: list, default) -> np.ndarray:
+    """A scalar, a list in the order of items or a dict item -> value, as an array aligned with items."""
+    if value is None:
+        value = default
+    if isinstance(value, dict):
+        return np.asarray([value.get(item, default) for item in items], dtype=float)
+    return np.broadcast_to(np.asarray(value, dtype=float), (len(items),))
+
+
+def _node_radii(ax, node_size, nodes: list) -> np.ndarray:
+    """Radius of the scatter marker of every node in display pixels (node sizes are in points^2)."""
+    return np.sqrt(_per_item(node_size, nodes, 0.0)) / 2 * ax.figure.dpi / 72
+
+
+def draw_nodes(ax, pos: dict, nodes: list = None, node_size=300, node_color="#1f78b4", alpha: float = None,
+               zorder: int = 2):
+    """
+    All nodes as a single scatter.
+
+    node_size and node_color are a scalar, a list in the order of nodes or a dict node -> value.
+    """
+    nodes = list(pos) if nodes is None else list(nodes)
+    if not nodes:
+        return None
+    xy = np.asarray([pos[n] for n in nodes], dtype=float)
+    colors = [node_color.get(n) for n in nodes] if isinstance(node_color, dict) else node_color
+    sizes = _per_item(node_size, nodes, 300.0)
+    return ax.scatter(xy[:, 0], xy[:, 1], s=sizes, c=colors, alpha=alpha, edgecolors="none", zorder=zorder)
+
+
+def draw_edges(ax, pos: dict, edges: list, width=1.0, edge_color="k", alpha: float = None, arrows: bool = False,
+               arrowstyle: str = "-|>", arrowsize: float = 10, rad: float = 0.0, node_size=300, zorder: int = 1):
+    """
+    All edges as one LineCollection, and their arrowheads as one more collection.
+
+    The geometry follows nx.draw_networkx_edges with connectionstyle "arc3,rad=<rad>": edges curve to the
+    right of their direction by rad times their length, and directed edges end at the border of the target
+    node. The curves are computed in display space like matplotlib's connection styles, so call this once the
+    axes limits and size are final (after set_xlim/set_ylim and tight_layout), as the FancyArrowPatches of
+    networkx are not used. Arrowheads are sized in points and stay exact when the figure is saved at another dpi.
+
+    Parameters:
+    -----------
+    ax : matplotlib.axes.Axes
+    pos : dict
+        node -> (x, y)
+    edges : list
+        (u, v) pairs
+    width : float | list | dict
+        Line width in points, per edge when a list or a dict (u, v) -> width
+    edge_color : color | list
+        One color or one per edge
+    alpha : float
+    arrows : bool
+        Draw arrowheads at the targets
+    arrowstyle : str
+        "-|>" for filled heads or "->" for open heads
+    arrowsize : float
+        Size of the heads, as mutation_scale of matplotlib's arrow styles
+    rad : float
+        Curvature, 0 for straight edges
+    node_size : float | list | dict
+        Marker sizes of the nodes (points^2), to end the edges at the node border
+    zorder : int
+
+    Returns:
+    --------
+    lines : LineCollection
+    heads : PolyCollection | PathCollection | None
+    """
+    edges = list(edges)
+    if not edges:
+        return None, None
+    to_display, to_data = ax.transData.transform, ax.transData.inverted().transform
+    nodes = list(pos)
+    radius = dict(zip(nodes, _node_radii(ax, node_size, nodes)))
+    source = to_display(np.asarray([pos[u] for u, _ in edges], dtype=float))
+    target = to_display(np.asarray([pos[v] for _, v in edges], dtype=float))
+    chord = target - source
+    length = np.hypot(chord[:, 0], chord[:, 1])
+    safe_length = np.where(length > 0, length, 1.0)
+
+    # parameter range of every edge outside its two nodes, measured along the chord
+    start, end = np.zeros(len(edges)), np.ones(len(edges))
+    if arrows:
+        start = np.minimum(np.asarray([radius[u] for u, _ in edges]) / safe_length, 0.5)
+        end = np.maximum(1 - np.asarray([radius[v] for _, v in edges]) / safe_length, 0.5)
+
+    # quadratic Bezier curve with the control point of arc3
+    control = (source + target) / 2 + rad * np.column_stack([chord[:, 1], -chord[:, 0]])
+    samples = CURVE_SAMPLES if rad else 2
+    t = start[:, None] + (end - start)[:, None] * np.linspace(0, 1, samples)[None, :]
+    t = t[:, :, None]
+    curves = (1 - t) ** 2 * source[:, None] + 2 * t * (1 - t) * control[:, None] + t ** 2 * target[:, None]
+
+    curves = list(to_data(curves.reshape(-1, 2)).reshape(curves.shape))
+
+    # self-loops as circles touching the top of their node, without a head
+    loops = np.asarray([u == v for u, v in edges])
+    for i in np.flatnonzero(loops):
+        node_radius = radius[edges[i][0]]
+        loop_radius = max(node_radius * 0.5, 4.0)
+        angles = np.linspace(-np.pi / 2, 1.5 * np.pi, 2 * CURVE_SAMPLES)
+        circle = source[i] + [0.0, node_radius + loop_radius * 0.8] \
+            + loop_radius * np.column_stack([np.cos(angles), np.sin(angles)])
+        curves[i] = to_data(circle)
+
+    widths = _per_item(width, edges, 1.0)
+    lines = LineCollection(curves, linewidths=widths, colors=edge_color, alpha=alpha, zorder=zorder,
+                           capstyle="butt")
+    ax.add_collection(lines)
+    if not arrows or loops.all():
+        return lines, None
+
+    # direction of the curve at the tip, then the head in points around the tip
+    keep = ~loops
+    tip = np.asarray([curve[-1] for curve in curves])[keep]
+    end = end[keep, None]
+    tangent = 2 * (1 - end) * (control - source)[keep] + 2 * end * (target - control)[keep]
+    angle = np.arctan2(tangent[:, 1], tangent[:, 0])
+    head_length, head_width = 0.4 * arrowsize, 0.2 * arrowsize
+    outline = np.asarray([[-head_length, head_width], [0.0, 0.0], [-head_length, -head_width]])
+    cos, sin = np.cos(angle)[:, None], np.sin(angle)[:, None]
+    heads = np.stack([cos * outline[:, 0] - sin * outline[:, 1], sin * outline[:, 0] + cos * outline[:, 1]], axis=-1)
+
+    colors = edge_color if mcolors.is_color_like(edge_color) else [c for c, k in zip(edge_color, keep) if k]
+    style = dict(linewidths=widths[keep], alpha=alpha, zorder=zorder, offsets=tip, offset_transform=ax.transData,
+                 sizes=[1.0])
+    if arrowstyle == "->":
+        collection = PathCollection([Path(head) for head in heads], facecolors="none", edgecolors=colors, **style)
+    else:
+        collection = PolyCollection(heads, facecolors=colors, edgecolors=colors, **style)
+    # the sizes of the collection scale the heads from points to pixels at the dpi of every draw
+    collection.set_transform(IdentityTransform())
+    ax.add_collection(collection, autolim=False)
+    return lines, collection
+
+
+def draw_labels(ax, positions: list, texts: list, fontsize: float = 10, color="black", fontweight: str = "normal",
+                path_effects: list = None, zorder: int = 3):
+    """
+    All labels as one PathCollection of text outlines, centred on their positions.
+
+    Every distinct text is laid out once, the labels are then a single artist instead of one Text per label,
+    so the cost of drawing them does not grow with the number of artists. Sizes are in points, like Text.
+
+    Parameters:
+    -----------
+    ax : matplotlib.axes.Axes
+    positions : list
+        (x, y) of every label in data coordinates
+    texts : list
+        The labels
+    fontsize : float
+    color : color | list
+        One color or one per label
+    fontweight : str
+    path_effects : list
+        e.g. [patheffects.withStroke(linewidth=2, foreground="white")] for a halo
+    zorder : int
+    """
+    texts = [str(text) for text in texts]
+    if not texts:
+        return None
+    font = FontProperties(size=fontsize, weight=fontweight)
+    outlines = {}
+    for text in set(texts):
+        path = TextPath((0, 0), text, prop=font)
+        if len(path.vertices):
+            (x0, y0), (x1, y1) = path.vertices.min(axis=0), path.vertices.max(axis=0)
+            path = Path(path.vertices - [(x0 + x1) / 2, (y0 + y1) / 2], path.codes)
+        outlines[text] = path
+    collection = PathCollection([outlines[text] for text in texts], facecolors=color, edgecolors="none",
+                                offsets=np.asarray(positions, dtype=float), offset_transform=ax.transData,
+                                sizes=[1.0], zorder=zorder)
+    collection.set_transform(IdentityTransform())
+    if path_effects:
+        collection.set_path_effects(path_effects)
+    ax.add_collection(collection, autolim=False)
+    return collection
+
+
+def draw_node_labels(ax, pos: dict, labels: dict = None, **kwargs):
+    """Labels of nodes (node -> text, defaults to the node names) at their positions, see draw_labels."""
+    labels = {n: n for n in pos} if labels is None else labels
+    return draw_labels(ax, [pos[n] for n in labels], list(labels.values()), **kwargs)
@@ -2,58 +2,105 @@ import os
 
 import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
 from matplotlib.ticker import MaxNLocator
 
+from view.render_pool import FigureSpec
+from view.render_quality import save_figure
+
+COLORS = [
+    "#e6194b", "#3cb44b", "#ffe119", "#4363d8", "#f58231",
+    "#911eb4", "#46f0f0", "#f032e6", "#bcf60c", "#fabebe",
+    "#008080", "#e6beff", "#9a6324", "#fffac8", "#800000"
+]
+
+
 class MetricsProgressionPlotter:
+    """
+    Scores of keys (characters or metrics) per section, plotted for the keys that were in the top n of a section.
+
+    The scores are kept as a sections x keys matrix that grows by doubling, so adding a section costs time
+    proportional to its own scores and the scores of a key are a column slice. Keys missing from a section
+    score 0.
+    """
+
     def __init__(self, metrics_name: str, section_type: str, folder_name: str, top_n: int = 5, ):
         self.metrics_name = metrics_name
         self.section_type = section_type
         self.top_n = top_n
-        self.data_points = []
         self.keys_in_top_n = set()
         self.folder_name = folder_name
-        self.colors = [
-            "#e6194b", "#3cb44b", "#ffe119", "#4363d8", "#f58231",
-            "#911eb4", "#46f0f0", "#f032e6", "#bcf60c", "#fabebe",
-            "#008080", "#e6beff", "#9a6324", "#fffac8", "#800000"
-        ]
+        self.colors = list(COLORS)
+        self._key_columns = {}
+        self._scores = np.zeros((8, 8))
+        self._section_count = 0
+
+    @property
+    def keys(self) -> list[str]:
+        return list(self._key_columns)
+
+    @property
+    def scores(self) -> np.ndarray:
+        """The sections x keys matrix, in the order of keys."""
+        return self._scores[:self._section_count, :len(self._key_columns)]
+
+    @property
+    def data_points(self) -> list[dict]:
+        return self.to_frame().to_dict(orient="records")
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.scores, columns=self.keys,
+                            index=pd.RangeIndex(1, self._section_count + 1, name=self.section_type))
 
     def add_data_point(self, key_value_items: dict):
-        self.data_points.append(key_value_items)
+        keys = list(key_value_items)
+        values = np.fromiter(key_value_items.values(), dtype=float, count=len(keys))
+        self._append_rows(keys, values[None, :])
 
-        top_keys = self._get_top_n_keys(key_value_items, self.top_n)
+        top_keys = self._get_top_n_keys(keys, values, self.top_n)
         self.keys_in_top_n.update(top_keys)
 
     def add_data_point_with_kwargs(self, **key_value_items):
-        self.data_points.append(key_value_items)
+        self.add_data_point(key_value_items)
 
-        top_keys = self._get_top_n_keys(key_value_items, self.top_n)
-        self.keys_in_top_n.update(top_keys)
+    def add_data_frame(self, frame: pd.DataFrame):
+        """
+        Add one section per row of a sections x keys DataFrame, NaN marks a key missing from a section.
+        Ties at the n-th value of a section go to the keys in the first columns.
+        """
+        keys = list(frame.columns)
+        values = frame.to_numpy(dtype=float)
+        self._append_rows(keys, np.nan_to_num(values))
+        for row in values:
+            present = ~np.isnan(row)
+            self.keys_in_top_n.update(self._get_top_n_keys([key for key, p in zip(keys, present) if p],
+                                                           row[present], self.top_n))
+
+    def _append_rows(self, keys: list[str], values: np.ndarray):
+        for key in keys:
+            self._key_columns.setdefault(key, len(self._key_columns))
+        rows = self._section_count + len(values)
+        if rows > self._scores.shape[0] or len(self._key_columns) > self._scores.shape[1]:
+            grown = np.zeros((max(rows, 2 * self._scores.shape[0]),
+                              max(len(self._key_columns), 2 * self._scores.shape[1])))
+            grown[:self._scores.shape[0], :self._scores.shape[1]] = self._scores
+            self._scores = grown
+        columns = [self._key_columns[key] for key in keys]
+        self._scores[self._section_count:rows, columns] = values
+        self._section_count = rows
 
     def draw(self, key_filter: list[str] = None, trend_lines: list[str] = None, save_plot: bool = True):
-        if not self.data_points:
+        if not self._section_count:
             return
 
         figure, axis = plt.subplots(figsize=(12, 6))
-        sections = list(range(1, len(self.data_points) + 1))
 
         key_list = self._filter_keys(key_filter)
         if not key_list:
             return
 
-        keys_with_trends = set()
-        if trend_lines:
-            keys_with_trends = {char.lower() for char in trend_lines
-                                if char.lower() in self.keys_in_top_n}
-
-        for index, key in enumerate(key_list):
-            color = self.colors[index % len(self.colors)]
-            scores = self._get_key_scores(key)
-
-            self._plot_key_line(axis, sections, key, color, scores)
-
-            if key.lower() in keys_with_trends:
-                self._plot_trend_line(axis, sections, scores, color)
+        colors = {key: self.colors[index % len(self.colors)] for index, key in enumerate(key_list)}
+        self._plot_keys(axis, key_list, colors, trend_lines)
 
         self._configure_axes(axis)
         plt.tight_layout()
@@ -63,47 +110,78 @@ class MetricsProgressionPlotter:
         else:
             plt.show()
 
+    def _plot_keys(self, axis, key_list: list[str], colors: dict, trend_lines: list[str] = None):
+        sections = list(range(1, self._section_count + 1))
+        keys_with_trends = set()
+        if trend_lines:
+            keys_with_trends = {char.lower() for char in trend_lines
+                                if char.lower() in self.keys_in_top_n}
+
+        scores = self.scores[:, [self._key_columns[key] for key in key_list]]
+        for index, key in enumerate(key_list):
+            self._plot_key_line(axis, sections, key, colors[key], scores[:, index])
+
+            if key.lower() in keys_with_trends:
+                self._plot_trend_line(axis, sections, scores[:, index], colors[key])
+
     def _filter_keys(self, key_filter: list[str] = None) -> list[str]:
         if key_filter:
             filtered = [key for key in key_filter if key.lower() in self.keys_in_top_n]
             return sorted(filtered)
         return sorted(self.keys_in_top_n)
 
-    def _get_top_n_keys(self, key_centralities: dict, top_n: int) -> list[str]:
-        sorted_keys = sorted(key_centralities.items(), 
-                                  key=lambda item: item[1], 
-                                  reverse=True)
-        return [key for key, score in sorted_keys[:top_n]]
+    @staticmethod
+    def _get_top_n_keys(keys: list[str], values: np.ndarray, top_n: int) -> list[str]:
+        """
+        The top_n keys by value, found with argpartition instead of sorting all of them.
+
+        Ties at the n-th value go to the keys that come first, as with a stable sort.
+        """
+        if len(keys) <= top_n:
+            return list(keys)
+        if top_n <= 0:
+            return []
+        threshold = values[np.argpartition(values, -top_n)[-top_n:]].min()
+        above = values > threshold
+        tied = np.flatnonzero(values == threshold)[:top_n - above.sum()]
+        selected = np.flatnonzero(above).tolist() + tied.tolist()
+        return [keys[index] for index in selected]
+
+    def _get_key_scores(self, key: str) -> np.ndarray:
+        if key not in self._key_columns:
+            return np.zeros(self._section_count)
+        return self.scores[:, self._key_columns[key]]
+
+    def figure_spec(self, key_filter: list[str] = None, trend_lines: list[str] = None) -> FigureSpec:
+        """The saved plot of draw as a FigureSpec, to render it in a process pool with render_figures."""
+        return FigureSpec(self.draw, self.plot_path(key_filter),
+                          kwargs=dict(key_filter=key_filter, trend_lines=trend_lines), vector=True)
 
-    def _get_key_scores(self, key: str) -> list[float]:
-        scores = []
-        for data_point in self.data_points:
-            scores.append(data_point.get(key, 0))
-        return scores
+    def plot_path(self, key_filter: list[str] = None) -> str:
+        return os.path.join(f"results/{self.folder_name}", self._make_plot_filename(key_filter))
 
     def _save_plot(self, figure, key_filter: list[str] = None):
         save_dir = f"results/{self.folder_name}"
         os.makedirs(save_dir, exist_ok=True)
-        filename = self._make_plot_filename(key_filter)
-
-        filepath = os.path.join(save_dir, filename)
-        figure.savefig(filepath, dpi=500, bbox_inches='tight')
+        # line plots are cheap as vector files, print quality keeps the former 500 dpi for PNG
+        save_figure(figure, self.plot_path(key_filter), vector=True, print_dpi=500, bbox_inches='tight')
 
     def _make_plot_filename(self, key_filter: list[str] = None):
         plot_title = self._get_plot_title()
-        plot_title = plot_title.replace(":", "").replace(" ", "_").replace("/", "_").lower()
+        plot_title = _to_filename(plot_title)
         if key_filter:
             plot_title += f"_{'_'.join(map(lambda x: x.lower(), key_filter))}"
         return f"{plot_title}.png"
 
-    def _configure_axes(self, axis):
+    def _configure_axes(self, axis, legend: bool = True, title: str = None):
         axis.set_xlabel(f"{self.section_type}", fontsize=12)
         axis.set_ylabel(f"{self.metrics_name.capitalize()}", fontsize=12)
-        axis.set_title(self._get_plot_title(), fontsize=12, fontweight="bold")
+        axis.set_title(title or self._get_plot_title(), fontsize=12, fontweight="bold")
         axis.xaxis.set_major_locator(MaxNLocator(integer=True))
         axis.grid(True, alpha=0.3)
-        axis.legend(loc="center left", bbox_to_anchor=(1, 0.5),
-                    frameon=True, fontsize=9)
+        if legend:
+            axis.legend(loc="center left", bbox_to_anchor=(1, 0.5),
+                        frameon=True, fontsize=9)
 
     def _get_plot_title(self):
         return f"{self.metrics_name.capitalize()} per {self.section_type.capitalize()}"
@@ -127,3 +205,75 @@ class MetricsProgressionPlotter:
 
         axis.plot(smooth_x_values, smooth_y_values, linestyle="--",
                   color=color, linewidth=1.5, alpha=0.7)
+
+
+def _to_filename(title: str) -> str:
+    return title.replace(":", "").replace(" ", "_").replace("/", "_").lower()
+
+
+def small_multiples_path(plotters: list[MetricsProgressionPlotter], key_filter: list[str] = None) -> str:
+    title = "_".join(_to_filename(plotter.metrics_name) for plotter in plotters)
+    title += f"_per_{_to_filename(plotters[0].section_type)}"
+    if key_filter:
+        title += f"_{'_'.join(map(lambda x: x.lower(), key_filter))}"
+    return os.path.join(f"results/{plotters[0].folder_name}", f"{title}.png")
+
+
+def draw_small_multiples(plotters: list[MetricsProgressionPlotter], key_filter: list[str] = None,
+                         trend_lines: list[str] = None, n_cols: int = 1, save_plot: bool = True):
+    """
+    Several metrics of the same sections as small multiples, one panel per plotter in a single figure.
+
+    Every key has the same color in all panels, with one legend for the figure.
+
+    Parameters:
+    -----------
+    plotters : list[MetricsProgressionPlotter]
+        One plotter per metric, e.g. in-degree, eigenvector and betweenness centrality per episode
+    key_filter : list[str]
+        Only plot these keys, as in MetricsProgressionPlotter.draw
+    trend_lines : list[str]
+        Keys with a quadratic trend line
+    n_cols : int
+        Number of panel columns
+    save_plot : bool
+        Save to results/<folder of the first plotter>, otherwise show the figure
+    """
+    plotters = [plotter for plotter in plotters if plotter._section_count]
+    if not plotters:
+        return
+
+    key_lists = [plotter._filter_keys(key_filter) for plotter in plotters]
+    all_keys = sorted(set().union(*key_lists))
+    if not all_keys:
+        return
+    colors = {key: COLORS[index % len(COLORS)] for index, key in enumerate(all_keys)}
+
+    n_rows = -(-len(plotters) // n_cols)
+    figure, axes = plt.subplots(n_rows, n_cols, figsize=(12 * n_cols, 4 * n_rows), sharex=True, squeeze=False)
+    for axis, plotter, key_list in zip(axes.flat, plotters, key_lists):
+        plotter._plot_keys(axis, key_list, colors, trend_lines)
+        plotter._configure_axes(axis, legend=False, title=plotter.metrics_name.capitalize())
+        axis.label_outer()
+    for axis in axes.flat[len(plotters):]:
+        axis.set_visible(False)
+
+    handles = [plt.Line2D([], [], color=colors[key], marker="o", linewidth=1, markersize=6, label=key)
+               for key in all_keys]
+    figure.legend(handles=handles, loc="center left", bbox_to_anchor=(1, 0.5), frameon=True, fontsize=9)
+    figure.suptitle(f"Per {plotters[0].section_type.capitalize()}", fontsize=12, fontweight="bold")
+    plt.tight_layout()
+
+    if save_plot:
+        path = small_multiples_path(plotters, key_filter)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        save_figure(figure, path, vector=True, print_dpi=500, bbox_inches='tight')
+    else:
+        plt.show()
+
+
+def small_multiples_spec(plotters: list[MetricsProgressionPlotter], key_filter: list[str] = None,
+                         trend_lines: list[str] = None, n_cols: int = 1) -> FigureSpec:
+    """The saved figure of draw_small_multiples as a FigureSpec, to render it with render_figures."""
+    return FigureSpec(draw_small_multiples, small_multiples_path(plotters, key_filter), vector=True,
+                      kwargs=dict(plotters=plotters, key_filter=key_filter, trend_lines=trend_lines, n_cols=n_cols))
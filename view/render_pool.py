@@ -0,0 +1,119 @@
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Callable
+
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+from model.utils.cache_utils import cache_path
+from view.render_quality import RenderQuality, get_render_quality, output_path, render_quality, \
+    save_figure
+
+
+@dataclass
+class FigureSpec:
+    """
+    Everything needed to render one figure in another process.
+
+    plot is called as plot(**kwargs), so it and the kwargs must be picklable: a module-level function or the
+    bound method of a picklable object, with plain data, DataFrames or networkx graphs as arguments.
+    If plot returns a figure (or a tuple starting with one, like plt.subplots) it is saved to path with
+    savefig_kwargs. Plotting functions that save the figure themselves return None, path is then passed as
+    the keyword path_argument (e.g. "save_path") when given.
+    The figure is rendered with quality, a profile or its name (the current one if None), vector marks
+    figures that are written as vector files by profiles with a vector format (see view.render_quality).
+    """
+    plot: Callable
+    path: str
+    kwargs: dict = field(default_factory=dict)
+    savefig_kwargs: dict = field(default_factory=dict)
+    path_argument: str | None = None
+    quality: str | RenderQuality | None = None
+    vector: bool = False
+
+
+def _init_worker():
+    # no display in the workers, and no window may open
+    plt.switch_backend("Agg")
+
+
+def render_figure(spec: FigureSpec) -> str:
+    """
+    Render and save a single figure, all figures it opened are closed afterwards.
+
+    Returns
+    -------
+    path : str
+        The written file
+    """
+    directory = os.path.dirname(spec.path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    kwargs = dict(spec.kwargs)
+    if spec.path_argument:
+        kwargs[spec.path_argument] = spec.path
+    open_before = set(plt.get_fignums())
+    with render_quality(spec.quality):
+        path = output_path(spec.path, vector=spec.vector)
+        try:
+            result = spec.plot(**kwargs)
+            figure = result[0] if isinstance(result, tuple) else result
+            if isinstance(figure, Figure):
+                save_figure(figure, spec.path, vector=spec.vector, **spec.savefig_kwargs)
+        finally:
+            for number in set(plt.get_fignums()) - open_before:
+                plt.close(number)
+    if not os.path.exists(path):
+        raise RuntimeError(f"{getattr(spec.plot, '__name__', spec.plot)} did not write {path}")
+    return path
+
+
+def render_figures(specs: list[FigureSpec], n_jobs: int | None = None, cache_name: str | None = None) -> list[str]:
+    """
+    Render figures in a process pool with the non-interactive Agg backend.
+
+    Parameters:
+    -----------
+    specs : list[FigureSpec]
+        Figures to render, independent of each other
+    n_jobs : int | None
+        Number of worker processes, None uses all cores and 1 renders in this process
+    cache_name : str | None
+        If given, the specs (with the data of the figures) are stored under results/cache/figures,
+        so rerender_figures can render them again at another quality without recomputing them
+
+    Returns:
+    --------
+    paths : list[str]
+        The written files, in the order of the specs, once all of them are written
+    """
+    if not specs:
+        return []
+    # the workers render with the quality of this process
+    specs = [replace(spec, quality=spec.quality or get_render_quality()) for spec in specs]
+    if cache_name:
+        with open(cache_path("figures", cache_name, "pkl"), "wb") as file:
+            pickle.dump(specs, file)
+    if n_jobs == 1:
+        return [render_figure(spec) for spec in specs]
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker) as executor:
+        return list(executor.map(render_figure, specs))
+
+
+def rerender_figures(cache_name: str, quality: str | RenderQuality = "print", n_jobs: int | None = None) -> list[str]:
+    """
+    Render the figures stored by render_figures(..., cache_name=cache_name) again, at another quality.
+
+    Returns
+    -------
+    paths : list[str]
+        The written files
+    """
+    path = cache_path("figures", cache_name, "pkl")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No cached figures named {cache_name}, render them with render_figures first")
+    with open(path, "rb") as file:
+        specs = pickle.load(file)
+    return render_figures([replace(spec, quality=quality) for spec in specs], n_jobs=n_jobs)
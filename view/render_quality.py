@@ -0,0 +1,102 @@
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+
+
+@dataclass(frozen=True)
+class RenderQuality:
+    """
+    How figures are written.
+
+    dpi is the resolution of raster output. Writers can ask for their own print_dpi (see save_figure), which
+    profiles with use_print_dpi use instead. With a vector_format ("svg" or "pdf") figures saved with vector=True, like
+    line plots, histograms and tables, are written as vector files: a few hundred paths are cheaper to write
+    than a print-resolution PNG. Dense network figures stay raster.
+    """
+    name: str
+    dpi: int
+    use_print_dpi: bool = False
+    vector_format: str | None = None
+
+
+# standard keeps the resolutions of the writers from before the profiles: their own print_dpi (500 for the
+# progression plots, 300 for the ego networks) and matplotlib's 100 dpi for all others
+QUALITY_PROFILES = {
+    "preview": RenderQuality("preview", dpi=72),
+    "standard": RenderQuality("standard", dpi=100, use_print_dpi=True),
+    "print": RenderQuality("print", dpi=300, use_print_dpi=True),
+    "vector": RenderQuality("vector", dpi=100, use_print_dpi=True, vector_format="pdf"),
+}
+
+_quality = QUALITY_PROFILES[os.environ.get("RENDER_QUALITY", "standard")]
+
+
+def get_render_quality() -> RenderQuality:
+    return _quality
+
+
+def set_render_quality(quality: str | RenderQuality, vector_format: str | None = None) -> RenderQuality:
+    """
+    Set the profile of all following figures, by name from QUALITY_PROFILES or as a RenderQuality.
+
+    The default is "standard", or the RENDER_QUALITY environment variable. vector_format ("svg" or "pdf")
+    overrides the vector format of the profile.
+    """
+    global _quality
+    if isinstance(quality, str):
+        if quality not in QUALITY_PROFILES:
+            raise ValueError(f"Unknown render quality {quality}, choose from {list(QUALITY_PROFILES)}")
+        quality = QUALITY_PROFILES[quality]
+    if vector_format is not None:
+        quality = replace(quality, vector_format=vector_format)
+    _quality = quality
+    return _quality
+
+
+@contextmanager
+def render_quality(quality: str | RenderQuality | None, vector_format: str | None = None):
+    """Temporarily render with another profile, None keeps the current one."""
+    previous = _quality
+    if quality is not None or vector_format is not None:
+        set_render_quality(quality if quality is not None else previous, vector_format=vector_format)
+    try:
+        yield _quality
+    finally:
+        set_render_quality(previous)
+
+
+def output_path(path: str, vector: bool = False) -> str:
+    """The file a figure saved to path is written to, with the extension of the vector format if it applies."""
+    if vector and _quality.vector_format:
+        return f"{os.path.splitext(path)[0]}.{_quality.vector_format}"
+    return path
+
+
+def save_figure(figure, path: str, vector: bool = False, print_dpi: int | None = None, **savefig_kwargs) -> str:
+    """
+    Save a figure with the current render quality.
+
+    Parameters:
+    -----------
+    figure : matplotlib.figure.Figure
+    path : str
+        Raster path, the extension is replaced when the figure is written as a vector file
+    vector : bool
+        The figure is cheap as a vector file (few artists), written in the vector format of the profile if any
+    print_dpi : int | None
+        Resolution of this figure in the print profile, instead of the profile's dpi
+    **savefig_kwargs
+        Passed on to savefig, e.g. bbox_inches
+
+    Returns:
+    --------
+    path : str
+        The written file
+    """
+    path = output_path(path, vector=vector)
+    dpi = print_dpi if _quality.use_print_dpi and print_dpi else _quality.dpi
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    figure.savefig(path, dpi=dpi, **savefig_kwargs)
+    return path
@@ -1,7 +1,6 @@
 import math
 from collections import defaultdict, Counter
 
-import matplotlib.cm as cm
 import matplotlib.colors as mcolors
 import matplotlib.pyplot as plt
 import networkx as nx
@@ -10,6 +9,40 @@ import pandas as pd
 from matplotlib.patches import Patch
 
 from model.entities.label_data import LabelData
+from view.batched_drawing import draw_edges, draw_node_labels, draw_nodes
+from view.layout_cache import compute_layout
+from view.render_quality import save_figure
+
+def build_layout_graph(df: pd.DataFrame, min_weight: int | None = None, min_degree: int = 0,
+                       focus_gcc: bool = False, directed: bool = False) -> nx.Graph | nx.DiGraph:
+    """
+    The graph drawn by visualize_all_layouts, to lay it out beforehand (e.g. with view.layout_cache.stable_layouts).
+    """
+    # --------- prep dataframe ----------
+    d = df.copy()
+    d = d.dropna(subset=["x","y"])
+    d = d[d["x"] != d["y"]]
+    if min_weight is not None and "weight" in d.columns:
+        d = d[d["weight"] >= min_weight]
+
+    # --------- build graph ----------
+    create = nx.DiGraph() if directed else nx.Graph()
+    edge_attr = ["weight"] if "weight" in d.columns else None
+    G = nx.from_pandas_edgelist(d, "x", "y", edge_attr=edge_attr, create_using=create)
+    G.remove_edges_from(nx.selfloop_edges(G))
+
+    # prune by degree (single pass is usually enough for decluttering)
+    if min_degree > 0:
+        keep = [n for n, deg in G.degree() if deg >= min_degree]
+        G = G.subgraph(keep).copy()
+
+    # focus on largest component
+    if focus_gcc and G.number_of_nodes() > 0:
+        comps = (nx.weakly_connected_components(G) if directed else nx.connected_components(G))
+        gcc = max(comps, key=len)
+        G = G.subgraph(gcc).copy()
+    return G
+
 
 def visualize_all_layouts(
     df: pd.DataFrame,
@@ -34,6 +67,14 @@ def visualize_all_layouts(
     label_fontsize: int = 8,
     label_color: str = "black",
     label_bg: bool = True,
+    # layout
+    layout: str = "kamada_kawai",          # name from view.layout_cache.LAYOUTS, e.g. 'forceatlas2' | 'drl' | 'fr'
+    initial_positions: dict | None = None, # warm-start positions of the layout
+    positions: dict | None = None,         # fixed positions instead of a layout, e.g. from view.layout_cache.stable_layouts
+    use_layout_cache: bool = True,         # reuse layouts of identical graphs (results/cache/layouts)
+    # output
+    title: str | None = None,              # axes title, defaults to the layout name
+    save_path: str | None = None,          # save the figure instead of showing it
 ):
     UNKNOWN = "grey"
 
@@ -77,29 +118,8 @@ def visualize_all_layouts(
         if color_by == "gender":  return GENDER_COLORS.get(norm_gender(val), UNKNOWN)
         return UNKNOWN
 
-    # --------- prep dataframe ----------
-    d = df.copy()
-    d = d.dropna(subset=["x","y"])
-    d = d[d["x"] != d["y"]]
-    if min_weight is not None and "weight" in d.columns:
-        d = d[d["weight"] >= min_weight]
-
     # --------- build graph ----------
-    create = nx.DiGraph() if directed else nx.Graph()
-    edge_attr = ["weight"] if "weight" in d.columns else None
-    G = nx.from_pandas_edgelist(d, "x", "y", edge_attr=edge_attr, create_using=create)
-    G.remove_edges_from(nx.selfloop_edges(G))
-
-    # prune by degree (single pass is usually enough for decluttering)
-    if min_degree > 0:
-        keep = [n for n, deg in G.degree() if deg >= min_degree]
-        G = G.subgraph(keep).copy()
-
-    # focus on largest component
-    if focus_gcc and G.number_of_nodes() > 0:
-        comps = (nx.weakly_connected_components(G) if directed else nx.connected_components(G))
-        gcc = max(comps, key=len)
-        G = G.subgraph(gcc).copy()
+    G = build_layout_graph(df, min_weight=min_weight, min_degree=min_degree, focus_gcc=focus_gcc, directed=directed)
 
     # --------- join node attributes for colors ----------
     if color_by:
@@ -150,10 +170,12 @@ def visualize_all_layouts(
         legend_handles = [Patch(facecolor=c, edgecolor="none", label=l) for (l,c) in keys]
 
     # --------- layouts ----------
-    weight_kw = ("weight" if ("weight" in d.columns and use_weight_in_layout) else None)
+    weight_kw = ("weight" if ("weight" in df.columns and use_weight_in_layout) else None)
     layouts = {
         # "spring":       lambda g: nx.spring_layout(g, seed=seed, weight=weight_kw),
-        "kamada_kawai": nx.kamada_kawai_layout,
+        (title or layout): (lambda g: positions) if positions is not None else
+        lambda g: compute_layout(g, layout, seed=seed, initial_positions=initial_positions,
+                                 use_cache=use_layout_cache),
         # "circular":     nx.circular_layout,
         # "shell":        nx.shell_layout,
         # "spectral":     nx.spectral_layout,
@@ -187,8 +209,8 @@ def visualize_all_layouts(
     fig, axes = plt.subplots(rows, cols, figsize=(15, 5 * rows))
     axes = axes.flatten() if isinstance(axes, np.ndarray) else [axes]
 
-    for i, (lname, layout) in enumerate(layouts.items()):
-        pos = layout(G)
+    for i, (lname, layout_function) in enumerate(layouts.items()):
+        pos = layout_function(G)
         ax = axes[i]
         if label_data:
             ax.set_title(label_data.label_name, fontsize=10)
@@ -217,7 +239,11 @@ def visualize_all_layouts(
     else:
         plt.tight_layout()
 
-    plt.show()
+    if save_path:
+        save_figure(fig, save_path, print_dpi=300, bbox_inches="tight")
+        plt.close(fig)
+    else:
+        plt.show()
 
 
 def community_positions(
@@ -228,6 +254,8 @@ def community_positions(
     seed: int = 42,
     inter_scale: float = 5.0,    # spacing between communities
     intra_scale: float = 1.0,    # size of each community “blob”
+    layout: str = "spring",      # layout of the meta-graph and inside communities, see view.layout_cache.LAYOUTS
+    use_layout_cache: bool = True,
 ):
     """
     Compute a 2-level community-aware layout.
@@ -258,7 +286,7 @@ def community_positions(
     if CG.number_of_nodes() <= 1:
         posC = {cid: (0.0, 0.0) for cid in comm_ids}
     else:
-        posC = nx.spring_layout(CG, weight="weight", seed=seed)
+        posC = compute_layout(CG, layout, seed=seed, weight="weight", use_cache=use_layout_cache)
     # scale inter-community spacing
     for cid in posC:
         x, y = posC[cid]
@@ -273,7 +301,7 @@ def community_positions(
         if H.number_of_nodes() == 1:
             local = {nodes[0]: (0.0, 0.0)}
         else:
-            local = nx.spring_layout(H, weight=weight_kw, seed=seed)
+            local = compute_layout(H, layout, seed=seed, weight=weight_kw, use_cache=use_layout_cache)
 
         # normalize local cloud to unit radius, then scale by community size
         # (bigger communities get a slightly larger radius to reduce overlap)
@@ -305,6 +333,8 @@ def visualize_partition(
     inter_scale: float = 5.0,
     intra_scale: float = 1.0,
     show_self_loops: bool = False,    # NEW: draw self-edges (u==v)?
+    layout: str = "spring",           # 'forceatlas2' | 'drl' | 'fr' for large graphs
+    use_layout_cache: bool = True,    # reuse the layouts of identical graphs
 ):
     """
     Plot a community-aware layout:
@@ -326,11 +356,12 @@ def visualize_partition(
     H = G.subgraph(nodes_to_plot).copy()
 
     # positions
-    pos = community_positions(H, labels, seed=seed, inter_scale=inter_scale, intra_scale=intra_scale)
+    pos = community_positions(H, labels, seed=seed, inter_scale=inter_scale, intra_scale=intra_scale,
+                              layout=layout, use_layout_cache=use_layout_cache)
 
     # colors per community
     comm_ids = sorted(keep, key=lambda x: str(x))
-    cmap = cm.get_cmap(cmap_name, max(len(comm_ids), 3))
+    cmap = plt.get_cmap(cmap_name, max(len(comm_ids), 3))
     color_map = {c: mcolors.to_hex(cmap(i)) for i, c in enumerate(comm_ids)}
     node_colors = [color_map[labels[n]] for n in H.nodes()]
 
@@ -345,28 +376,34 @@ def visualize_partition(
     if not show_self_loops:
         edges_to_draw = [(u, v) for (u, v) in edges_to_draw if u != v]
 
-    # draw
+    # draw, the axes are final before the edges are drawn
     fig, ax = plt.subplots(figsize=(9, 7))
-    directed = isinstance(H, nx.DiGraph)
-    if directed:
-        nx.draw_networkx_edges(
-            H, pos, ax=ax, edgelist=edges_to_draw, width=edge_width, alpha=0.6,
-            arrows=True, arrowstyle="-|>", arrowsize=10, connectionstyle="arc3,rad=0.04"
-        )
-    else:
-        nx.draw_networkx_edges(H, pos, ax=ax, edgelist=edges_to_draw, width=edge_width, alpha=0.6)
-
-    nx.draw_networkx_nodes(H, pos, ax=ax, node_color=node_colors, node_size=node_size)
+    xy = np.asarray(list(pos.values()), dtype=float)
+    low, high = xy.min(axis=0), xy.max(axis=0)
+    margin = 0.05 * np.maximum(high - low, 1e-9)
+    ax.set_xlim(low[0] - margin[0], high[0] + margin[0])
+    ax.set_ylim(low[1] - margin[1], high[1] + margin[1])
     ax.axis("off")
     ax.set_title(f"Community-aware layout (≥ {min_comm_size})", fontsize=11)
 
-    if show_labels:
-        nx.draw_networkx_labels(H, pos, font_size=label_fontsize)
-
     ncols = min(len(legend_handles), 4)
     ax.legend(handles=legend_handles, loc="lower center", ncol=ncols, frameon=False,
               fontsize=9, bbox_to_anchor=(0.5, -0.06))
 
     plt.tight_layout()
+
+    # edges, nodes and labels as one artist each
+    directed = isinstance(H, nx.DiGraph)
+    if directed:
+        draw_edges(ax, pos, edges_to_draw, width=edge_width, alpha=0.6,
+                   arrows=True, arrowstyle="-|>", arrowsize=10, rad=0.04, node_size=node_size)
+    else:
+        draw_edges(ax, pos, edges_to_draw, width=edge_width, alpha=0.6)
+
+    draw_nodes(ax, pos, list(H.nodes()), node_color=node_colors, node_size=node_size)
+
+    if show_labels:
+        draw_node_labels(ax, {n: pos[n] for n in H.nodes()}, fontsize=label_fontsize)
+
     return fig, ax
 